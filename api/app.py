@@ -6,6 +6,7 @@ Provides ride and restaurant comparison endpoints.
 
 import sys
 import os
+import re
 
 # Load .env file for local development
 if os.path.exists('.env'):
@@ -19,7 +20,7 @@ sys.path.insert(0, 'src')
 # Add parent directory to path for api module imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 import traceback
@@ -28,8 +29,15 @@ from datetime import timedelta
 from domains.rideshare.handler import RideShareHandler
 from domains.restaurants.handler import RestaurantHandler
 from core import GeocodingService, CacheService, RateLimiter
+from core.cache_backends import create_backend
+from core.gazetteer import default_gazetteer
+from core.location_normalizer import LocationNormalizer
+from core.rate_limit_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.rate_limit_stores import create_bucket_store
+from core.rate_limiter import priority_lane
 from orchestration.domain_router import DomainRouter
-from api.cost_tracker import CostTracker, create_cost_tracker_blueprint
+from orchestration.cache_warmup import CacheWarmer
+from api.cost_tracker import BILLING_TIMEZONE, GOOGLE_PLACES_PRICING, CostTracker, create_cost_tracker_blueprint
 
 # Database imports
 from api.database import SessionLocal, close_db
@@ -60,14 +68,48 @@ CORS(app, resources={r"/api/*": {
 }})
 
 # Initialize services (singleton pattern)
-geocoder = GeocodingService()
-cache = CacheService()
-rate_limiter = RateLimiter()
+# CACHE_BACKEND=sqlite shares one cache between server processes on this host;
+# CACHE_QUERY_LOG records queries for replay (python src/core/cache_keys.py <log>)
+cache = CacheService(
+    backend=create_backend(os.environ.get('CACHE_BACKEND', 'file')),
+    query_log=os.environ.get('CACHE_QUERY_LOG')
+)
+cache.start_sweeper()  # Delete expired entries in the background
+# The default file store keeps bucket and quota state across restarts (so a
+# crash loop cannot reset google_places to a full bucket) and shares it
+# between server processes on this host; RATE_LIMIT_STORE=memory opts out
+rate_limiter = RateLimiter(store=create_bucket_store(os.environ.get('RATE_LIMIT_STORE', 'file')))
+# Well-known landmarks come from the bundled gazetteer; other geocoding results
+# persist in the cache (shared by all handlers and, with a shared backend, all
+# processes) behind an in-memory tier of decoded results. Nominatim calls are
+# paced by the 'nominatim' bucket. Names are normalized before lookup, and
+# learned aliases (e.g. "kennedy airport" -> "jfk") persist in GEOCODE_ALIASES
+geocoder = GeocodingService(
+    cache=cache,
+    gazetteer=default_gazetteer(),
+    rate_limiter=rate_limiter,
+    normalizer=LocationNormalizer(alias_path=os.environ.get('GEOCODE_ALIASES', 'data/geocode_aliases.json'))
+)
 
 # Initialize cost tracker
 cost_tracker = CostTracker(data_dir="./cost_data")
 app.config['COST_TRACKER'] = cost_tracker
 
+# Stay within the monthly free cap of the SKU GooglePlacesClient logs, in
+# step with the cost tracker's billing months (GOOGLE_PLACES_MONTHLY_QUOTA=0
+# removes the cap)
+places_quota = int(os.environ.get(
+    'GOOGLE_PLACES_MONTHLY_QUOTA', GOOGLE_PLACES_PRICING['text_search_pro']['free_cap']
+))
+if places_quota > 0:
+    rate_limiter.add_quota(
+        'google_places',
+        places_quota,
+        period='month',
+        tz=BILLING_TIMEZONE.key,
+        usage=lambda: cost_tracker.monthly_count('text_search_pro')
+    )
+
 # Register cost tracker endpoints
 app.register_blueprint(
     create_cost_tracker_blueprint(cost_tracker),
@@ -86,6 +128,14 @@ restaurant_handler = RestaurantHandler(
     rate_limiter=rate_limiter
 )
 
+# CACHE_WARMUP=<N> replays the top N queries from CACHE_QUERY_LOG in the
+# background, so a fresh deploy does not start with an empty cache
+if os.environ.get('CACHE_WARMUP') and os.environ.get('CACHE_QUERY_LOG'):
+    CacheWarmer(
+        {'restaurants': restaurant_handler, 'rideshare': rideshare_handler},
+        rate_limiter=rate_limiter
+    ).start(os.environ['CACHE_QUERY_LOG'], top_n=int(os.environ['CACHE_WARMUP']))
+
 # Initialize domain router
 domain_router = DomainRouter()
 
@@ -423,13 +473,14 @@ def search_restaurants():
         # Build full query
         full_query = f"{query} near {location}"
 
-        # Process
-        results = restaurant_handler.process(
-            full_query,
-            context={'user_location': location},
-            priority=priority,
-            use_ai=use_ai
-        )
+        # Process (guests yield provider quota to signed-in users)
+        with priority_lane('interactive-auth' if is_authenticated else 'interactive-guest'):
+            results = restaurant_handler.process(
+                full_query,
+                context={'user_location': location},
+                priority=priority,
+                use_ai=use_ai
+            )
 
         # Limit results for guest users (max 5 results)
         if not is_authenticated and results.get('data', {}).get('results'):
@@ -503,18 +554,17 @@ def unified_search():
             origin = location if location else "Times Square, NYC"
             destination = "Central Park, NYC"  # Default
 
-            # Simple destination extraction (can be improved with NLP)
-            query_lower = query.lower()
-            if ' to ' in query_lower:
-                parts = query_lower.split(' to ')
-                if len(parts) == 2:
-                    destination = parts[1].strip().title()
-                    # Check if origin is specified
-                    first_part = parts[0].strip()
-                    if 'from ' in first_part:
-                        origin = first_part.split('from ')[-1].strip().title()
-                    elif location:
-                        origin = location
+            # Simple destination extraction (can be improved with NLP).
+            # Places keep the user's spelling; the geocoder normalizes them
+            parts = re.split(r' to ', query, flags=re.IGNORECASE)
+            if len(parts) == 2:
+                destination = parts[1].strip()
+                # Check if origin is specified
+                first_part = parts[0].strip()
+                if 'from ' in first_part.lower():
+                    origin = re.split(r'from ', first_part, flags=re.IGNORECASE)[-1].strip()
+                elif location:
+                    origin = location
 
             # Build rideshare query
             ride_query = f"ride from {origin} to {destination}"
@@ -570,7 +620,7 @@ def unified_search():
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Get cache and rate limiter statistics."""
+    """Get cache, geocoding and rate limiter statistics."""
     try:
         cache_stats = cache.stats()
         rl_stats = rate_limiter.stats()
@@ -579,6 +629,7 @@ def get_stats():
             'success': True,
             'data': {
                 'cache': cache_stats,
+                'geocoding': geocoder.stats(),
                 'rate_limiter': rl_stats
             }
         })
@@ -590,6 +641,12 @@ def get_stats():
         }), 500
 
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get rate limiter metrics in the Prometheus text format (for scraping)."""
+    return Response(rate_limiter.prometheus_metrics(), mimetype=METRICS_CONTENT_TYPE)
+
+
 # ============================================================================
 # USER FAVORITES ENDPOINTS
 # ============================================================================
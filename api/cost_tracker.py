@@ -22,6 +22,7 @@ from pathlib import Path
 from typing import Dict, Optional, List
 from dataclasses import dataclass, asdict
 from collections import defaultdict
+from zoneinfo import ZoneInfo
 import threading
 
 # ============================================
@@ -62,6 +63,10 @@ STATIC_COSTS = {
 # Monthly credit from Google
 GOOGLE_MONTHLY_CREDIT = 200.00
 
+# Free caps and the credit reset at midnight Pacific on the 1st; months are
+# counted in this timezone so they line up with Google's billing months
+BILLING_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
 # Budget thresholds for alerts
 ALERT_THRESHOLDS = {
     "warning": 0.70,  # 70% of budget
@@ -96,11 +101,12 @@ class CostTracker:
         
         # In-memory cache for current month's data
         self._monthly_cache: Dict[str, int] = defaultdict(int)
+        self._cache_month = self._get_month_key()
         self._load_current_month_cache()
     
     def _get_month_key(self, dt: Optional[datetime] = None) -> str:
-        """Get YYYY-MM key for a datetime"""
-        dt = dt or datetime.now()
+        """Get YYYY-MM key for a datetime (default: now, in the billing timezone)"""
+        dt = dt or datetime.now(BILLING_TIMEZONE)
         return dt.strftime("%Y-%m")
     
     def _get_day_key(self, dt: Optional[datetime] = None) -> str:
@@ -121,11 +127,18 @@ class CostTracker:
         month_key = self._get_month_key()
         summary_file = self._get_monthly_summary_file(month_key)
         
+        self._cache_month = month_key
+        self._monthly_cache = defaultdict(int)
         if summary_file.exists():
             with open(summary_file, 'r') as f:
                 data = json.load(f)
                 self._monthly_cache = defaultdict(int, data.get("api_counts", {}))
     
+    def _roll_month(self):
+        """Start counting from zero (or the saved summary) once a new billing month begins"""
+        if self._get_month_key() != self._cache_month:
+            self._load_current_month_cache()
+    
     def _save_monthly_summary(self):
         """Save current month's summary to file"""
         month_key = self._get_month_key()
@@ -164,6 +177,7 @@ class CostTracker:
             tracker.log_api_call("text_search_pro", "/v1/places:searchText", details={"query": "restaurants"})
         """
         with self._lock:
+            self._roll_month()
             now = datetime.now()
             day_key = self._get_day_key(now)
             
@@ -200,6 +214,17 @@ class CostTracker:
             
             return log_entry
     
+    def monthly_count(self, api_type: str) -> int:
+        """
+        Get the number of calls logged for an API type this billing month.
+
+        Used by the rate limiter's monthly quotas, so quota usage survives
+        restarts (counts are reloaded from the monthly summary).
+        """
+        with self._lock:
+            self._roll_month()
+            return self._monthly_cache.get(api_type, 0)
+    
     def _calculate_call_cost(self, api_type: str, request_count: int) -> float:
         """
         Calculate cost for a specific API call, considering free tier.
@@ -238,7 +263,7 @@ class CostTracker:
         month_key = month_key or self._get_month_key()
         
         # Load data for the month
-        if month_key == self._get_month_key():
+        if month_key == self._cache_month:
             api_counts = dict(self._monthly_cache)
         else:
             summary_file = self._get_monthly_summary_file(month_key)
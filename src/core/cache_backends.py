@@ -0,0 +1,1263 @@
+"""
+Storage backends for CacheService.
+
+A backend stores serialized cache entries (JSON text) by storage key. It
+knows nothing about TTLs, serializers or statistics - those live in
+CacheService, so every backend gets the same expiry semantics.
+
+Storage keys are an MD5 hex digest, optionally prefixed with a namespace
+("restaurants/<md5>"). Entries in different namespaces are counted, sized,
+evicted and cleared independently.
+
+Backends:
+- FileCacheBackend: sharded JSON files (default, single host)
+- SQLiteCacheBackend: one SQLite database in WAL mode, shared by several
+  worker processes on the same host
+- RedisCacheBackend: any client speaking the redis-py API (a real Redis
+  server, or LocalRedis for development and tests)
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Namespace names double as directory names; at least 3 characters so they
+# never collide with the 2-character shard directories.
+NAMESPACE_PATTERN = re.compile(r'^[a-z][a-z0-9_]{2,}$')
+DEFAULT_NAMESPACE = 'default'
+
+
+def validate_namespace(namespace: str) -> str:
+    """
+    Check a namespace name is usable as a storage prefix.
+
+    Raises:
+        ValueError: If the name is malformed or reserved
+    """
+    if not NAMESPACE_PATTERN.match(namespace) or namespace == DEFAULT_NAMESPACE:
+        raise ValueError(f"Invalid cache namespace: {namespace!r}")
+    return namespace
+
+
+def split_key(key: str) -> Tuple[Optional[str], str]:
+    """Split a storage key into (namespace or None, key hash)."""
+    namespace, sep, key_hash = key.rpartition('/')
+    return (namespace if sep else None), key_hash
+
+
+class CacheBackend(ABC):
+    """
+    Interface between CacheService and a storage engine.
+
+    Implementations must be safe to call from several threads. Backends
+    meant for multi-process deployments must also tolerate other processes
+    reading and writing the same store concurrently.
+    """
+
+    name = 'base'
+    last_reconciled: Optional[float] = None
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[str]:
+        """Get an entry's serialized text, or None if there is no entry."""
+
+    @abstractmethod
+    def write(self, key: str, text: str) -> int:
+        """Store an entry (replacing any previous one); return its size in bytes."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete an entry; return True if something was deleted."""
+
+    @abstractmethod
+    def keys(self, namespace: Optional[str] = None) -> Iterator[str]:
+        """Yield storage keys (all namespaces, or just one)."""
+
+    @abstractmethod
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Delete every entry (or every entry in a namespace); return the count."""
+
+    @abstractmethod
+    def evict(
+        self,
+        namespace: Optional[str],
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> List[str]:
+        """Delete least recently used entries until a namespace fits its quota."""
+
+    @abstractmethod
+    def namespace_totals(self) -> Dict[Optional[str], Tuple[int, int]]:
+        """(entries, bytes) per namespace holding entries (None = un-namespaced)."""
+
+    @abstractmethod
+    def reconcile(self, visit: Optional[Callable[[str, int, float], None]] = None) -> Dict:
+        """Correct entry count/size bookkeeping; call visit(key, size, mtime) per entry."""
+
+    def read_many(self, keys: List[str]) -> Dict[str, str]:
+        """Get several entries at once; keys without an entry are left out."""
+        found = {}
+        for key in keys:
+            text = self.read(key)
+            if text is not None:
+                found[key] = text
+        return found
+
+    def write_many(self, items: Dict[str, str]) -> Dict[str, int]:
+        """Store several entries at once; return each entry's size in bytes."""
+        return {key: self.write(key, text) for key, text in items.items()}
+
+    def touch(self, key: str):
+        """Mark an entry as recently used (for LRU eviction)."""
+
+    def touch_many(self, keys: Iterable[str]):
+        """Mark several entries as recently used (best effort)."""
+        for key in keys:
+            self.touch(key)
+
+    def entry_count(self) -> int:
+        """Number of stored entries."""
+        return sum(entries for entries, _ in self.namespace_totals().values())
+
+    def total_bytes(self) -> int:
+        """Total size of stored entries in bytes."""
+        return sum(size for _, size in self.namespace_totals().values())
+
+    def cleanup(self) -> int:
+        """Backend-specific housekeeping; return the number of items removed."""
+        return 0
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    Sharded directory of JSON files.
+
+    Layout:
+        <base_dir>/<first 2 hex chars of hash>/<md5 hash>.json
+        <base_dir>/<namespace>/<first 2 hex chars of hash>/<md5 hash>.json
+
+    Writes go to a temp file in the shard directory and are committed with
+    os.replace(), so readers (and crashes) never see a half-written entry.
+    Entries written by the old flat layout (<base_dir>/<hash>.json) are
+    still found and moved into their shard the first time they are read.
+
+    Entry counts and byte totals are kept in an in-memory index updated on
+    every write and delete, so they are O(1) to read. reconcile() rebuilds
+    the index from disk to correct drift (e.g. other processes writing to
+    the same directory). The index is ordered by last use per namespace,
+    which evict() uses to enforce per-namespace quotas.
+    """
+
+    name = 'file'
+    SHARD_CHARS = 2
+    TEMP_PREFIX = '.tmp-'
+
+    def __init__(self, base_dir: str):
+        """
+        Initialize file backend.
+
+        Args:
+            base_dir: Root directory for cache files
+        """
+        self.base_dir = Path(base_dir)
+
+        # Size index: namespace (None = default) -> key -> bytes on disk,
+        # least recently used first
+        self._lock = Lock()
+        self._sizes: Dict[Optional[str], "OrderedDict[str, int]"] = {}
+        self._namespace_bytes: Dict[Optional[str], int] = {}
+        self._total_bytes = 0
+        self.last_reconciled: Optional[float] = None
+
+    def path_for(self, key: str) -> Path:
+        """Sharded file path for a storage key."""
+        namespace, key_hash = split_key(key)
+        root = self.base_dir / namespace if namespace else self.base_dir
+        return root / key_hash[:self.SHARD_CHARS] / f"{key_hash}.json"
+
+    def legacy_path_for(self, key: str) -> Optional[Path]:
+        """Flat-layout file path used before sharding (never namespaced)."""
+        if '/' in key:
+            return None
+        return self.base_dir / f"{key}.json"
+
+    def read(self, key: str) -> Optional[str]:
+        """
+        Read an entry's serialized text.
+
+        Args:
+            key: Storage key
+
+        Returns:
+            Entry text, or None if there is no entry
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+
+        # Lazily migrate an entry from the old flat layout
+        legacy_path = self.legacy_path_for(key)
+        try:
+            if legacy_path is None or not legacy_path.exists():
+                return None
+            path.parent.mkdir(exist_ok=True)
+            os.replace(legacy_path, path)
+        except FileNotFoundError:
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, text: str) -> int:
+        """
+        Atomically write an entry.
+
+        Args:
+            key: Storage key
+            text: Serialized entry
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            IOError: If the file cannot be written
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=self.TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        # A flat-layout copy would otherwise resurface after a delete
+        legacy_path = self.legacy_path_for(key)
+        if legacy_path is not None:
+            try:
+                os.unlink(legacy_path)
+            except FileNotFoundError:
+                pass
+
+        size = len(text.encode())
+        self._track(key, size)
+        return size
+
+    def delete(self, key: str) -> bool:
+        """
+        Delete an entry (from either layout).
+
+        Returns:
+            True if something was deleted
+        """
+        deleted = False
+        for path in (self.path_for(key), self.legacy_path_for(key)):
+            if path is None:
+                continue
+            try:
+                path.unlink()
+                deleted = True
+            except FileNotFoundError:
+                pass
+
+        self._untrack(key)
+        return deleted
+
+    def iter_entries(self, namespace: Optional[str] = None) -> Iterator[Tuple[str, Path]]:
+        """
+        Yield (storage key, path) for every entry file.
+
+        Args:
+            namespace: Only this namespace (default: every namespace,
+                including un-namespaced and flat-layout entries)
+        """
+        if namespace is not None:
+            root = self.base_dir / namespace
+            if root.is_dir():
+                for shard in root.iterdir():
+                    if shard.is_dir() and len(shard.name) == self.SHARD_CHARS:
+                        for path in shard.glob("*.json"):
+                            yield f"{namespace}/{path.stem}", path
+            return
+
+        if not self.base_dir.exists():
+            return
+
+        for path in self.base_dir.glob("*.json"):
+            yield path.stem, path
+
+        for child in self.base_dir.iterdir():
+            if not child.is_dir():
+                continue
+            if len(child.name) == self.SHARD_CHARS:
+                for path in child.glob("*.json"):
+                    yield path.stem, path
+            elif NAMESPACE_PATTERN.match(child.name):
+                yield from self.iter_entries(child.name)
+
+    def keys(self, namespace: Optional[str] = None) -> Iterator[str]:
+        """Yield storage keys (all namespaces, or just one)."""
+        for key, _ in self.iter_entries(namespace):
+            yield key
+
+    def iter_files(self) -> Iterator[Path]:
+        """Yield every entry file, sharded and legacy."""
+        for _, path in self.iter_entries():
+            yield path
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """
+        Delete every entry, or every entry in one namespace.
+
+        Returns:
+            Number of entries deleted
+        """
+        deleted = 0
+        for _, path in list(self.iter_entries(namespace)):
+            try:
+                path.unlink()
+                deleted += 1
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            if namespace is None:
+                self._sizes.clear()
+                self._namespace_bytes.clear()
+                self._total_bytes = 0
+            else:
+                self._sizes.pop(namespace, None)
+                self._total_bytes -= self._namespace_bytes.pop(namespace, 0)
+        return deleted
+
+    def _track(self, key: str, size: int):
+        """Record an entry's size in the index (as most recently used)."""
+        namespace, _ = split_key(key)
+        with self._lock:
+            sizes = self._sizes.setdefault(namespace, OrderedDict())
+            delta = size - sizes.pop(key, 0)
+            sizes[key] = size
+            self._namespace_bytes[namespace] = self._namespace_bytes.get(namespace, 0) + delta
+            self._total_bytes += delta
+
+    def _untrack(self, key: str):
+        """Drop an entry from the index."""
+        namespace, _ = split_key(key)
+        with self._lock:
+            sizes = self._sizes.get(namespace)
+            if sizes is None or key not in sizes:
+                return
+            size = sizes.pop(key)
+            self._namespace_bytes[namespace] -= size
+            self._total_bytes -= size
+
+    def touch(self, key: str):
+        """Mark an entry as recently used (for LRU eviction)."""
+        namespace, _ = split_key(key)
+        with self._lock:
+            sizes = self._sizes.get(namespace)
+            if sizes is not None and key in sizes:
+                sizes.move_to_end(key)
+
+    def evict(
+        self,
+        namespace: Optional[str],
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> List[str]:
+        """
+        Delete least recently used entries until a namespace fits its quota.
+
+        Args:
+            namespace: Namespace to trim (None = un-namespaced entries)
+            max_entries: Entry quota (None = unlimited)
+            max_bytes: Byte quota (None = unlimited)
+
+        Returns:
+            Storage keys that were evicted
+        """
+        victims = []
+        with self._lock:
+            sizes = self._sizes.get(namespace)
+            if not sizes:
+                return victims
+            count = len(sizes)
+            used = self._namespace_bytes.get(namespace, 0)
+            for key, size in sizes.items():
+                if (max_entries is None or count <= max_entries) and \
+                        (max_bytes is None or used <= max_bytes):
+                    break
+                victims.append(key)
+                count -= 1
+                used -= size
+
+        for key in victims:
+            self.delete(key)
+        return victims
+
+    def namespace_totals(self) -> Dict[Optional[str], Tuple[int, int]]:
+        """(entries, bytes) per namespace holding entries (None = un-namespaced)."""
+        with self._lock:
+            return {
+                namespace: (len(sizes), self._namespace_bytes[namespace])
+                for namespace, sizes in self._sizes.items()
+                if sizes
+            }
+
+    def entry_count(self) -> int:
+        """Number of entries on disk (from the index, without touching disk)."""
+        return sum(len(sizes) for sizes in list(self._sizes.values()))
+
+    def total_bytes(self) -> int:
+        """Total size of entries on disk in bytes (from the index, O(1))."""
+        return self._total_bytes
+
+    def reconcile(self, visit: Optional[Callable[[str, int, float], None]] = None) -> Dict:
+        """
+        Rebuild the size index from the files on disk.
+
+        Only stats files (no reads or parsing). Writes that race with the
+        scan may be missed; the next reconciliation picks them up.
+
+        Args:
+            visit: Optional callback(key, size, mtime) for each entry
+
+        Returns:
+            Dictionary with the reconciled totals and the drift corrected
+        """
+        found: Dict[Optional[str], List[Tuple[float, str, int]]] = {}
+        for key, path in self.iter_entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            found.setdefault(split_key(key)[0], []).append((st.st_mtime, key, st.st_size))
+            if visit is not None:
+                visit(key, st.st_size, st.st_mtime)
+
+        # Modification time stands in for last use until entries are touched
+        sizes = {
+            namespace: OrderedDict((key, size) for _, key, size in sorted(entries))
+            for namespace, entries in found.items()
+        }
+        namespace_bytes = {namespace: sum(s.values()) for namespace, s in sizes.items()}
+        entries = sum(len(s) for s in sizes.values())
+        total = sum(namespace_bytes.values())
+
+        with self._lock:
+            drift_entries = entries - sum(len(s) for s in self._sizes.values())
+            drift_bytes = total - self._total_bytes
+            self._sizes = sizes
+            self._namespace_bytes = namespace_bytes
+            self._total_bytes = total
+            self.last_reconciled = time.time()
+
+        return {
+            'entries': entries,
+            'bytes': total,
+            'drift_entries': drift_entries,
+            'drift_bytes': drift_bytes,
+        }
+
+    def cleanup(self) -> int:
+        """Remove temp files left behind by crashed writers."""
+        return self.remove_orphaned_temp_files()
+
+    def remove_orphaned_temp_files(self, max_age_seconds: float = 60.0) -> int:
+        """
+        Delete temp files left behind by writers that crashed mid-write.
+
+        Args:
+            max_age_seconds: Only remove temp files older than this
+
+        Returns:
+            Number of temp files removed
+        """
+        if not self.base_dir.exists():
+            return 0
+
+        removed = 0
+        cutoff = time.time() - max_age_seconds
+        temp_files = list(self.base_dir.glob(f"*/{self.TEMP_PREFIX}*"))
+        temp_files += self.base_dir.glob(f"*/*/{self.TEMP_PREFIX}*")
+        for path in temp_files:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Entries in a single SQLite database running in WAL mode.
+
+    Several worker processes on one host can open the same database file:
+    WAL lets readers proceed while one writer commits, and per-namespace
+    entry/byte totals are kept by triggers in the same transaction as each
+    write, so every process sees the same counts without scanning.
+
+    Each thread gets its own connection (sqlite3 connections are not
+    shared across threads).
+    """
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            namespace TEXT NOT NULL,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, last_used);
+        CREATE TABLE IF NOT EXISTS namespace_totals (
+            namespace TEXT PRIMARY KEY,
+            entries INTEGER NOT NULL DEFAULT 0,
+            bytes INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+            INSERT OR IGNORE INTO namespace_totals (namespace) VALUES (NEW.namespace);
+            UPDATE namespace_totals SET entries = entries + 1, bytes = bytes + NEW.size
+                WHERE namespace = NEW.namespace;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+            UPDATE namespace_totals SET bytes = bytes + NEW.size - OLD.size
+                WHERE namespace = NEW.namespace;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+            UPDATE namespace_totals SET entries = entries - 1, bytes = bytes - OLD.size
+                WHERE namespace = OLD.namespace;
+        END;
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Initialize SQLite backend.
+
+        Args:
+            path: Database file (created if missing)
+            timeout: Seconds to wait for another process's write lock
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        self.last_reconciled = None
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection (autocommit; transactions are explicit)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _namespace_column(key: str) -> str:
+        """Namespace stored for a key ('' = un-namespaced)."""
+        return split_key(key)[0] or ''
+
+    def read(self, key: str) -> Optional[str]:
+        """
+        Get an entry's serialized text, or None if there is no entry.
+
+        Raises:
+            IOError: If the database cannot be read (e.g. locked too long)
+        """
+        try:
+            row = self._conn().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache read failed: {e}") from e
+        return row[0] if row else None
+
+    def write(self, key: str, text: str) -> int:
+        """
+        Store an entry (replacing any previous one).
+
+        Raises:
+            IOError: If the database cannot be written
+        """
+        size = len(text.encode())
+        try:
+            self._conn().execute(
+                "INSERT INTO entries (key, namespace, value, size, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "last_used = excluded.last_used",
+                (key, self._namespace_column(key), text, size, time.time())
+            )
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache write failed: {e}") from e
+        return size
+
+    # Stay well below SQLite's bound-parameter limit
+    BATCH_SIZE = 500
+
+    def read_many(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Get several entries with one query per BATCH_SIZE keys.
+
+        Raises:
+            IOError: If the database cannot be read
+        """
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        try:
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                batch = keys[i:i + self.BATCH_SIZE]
+                rows = self._conn().execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                found.update(rows)
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache read failed: {e}") from e
+        return found
+
+    def write_many(self, items: Dict[str, str]) -> Dict[str, int]:
+        """
+        Store several entries in a single transaction.
+
+        Raises:
+            IOError: If the database cannot be written
+        """
+        now = time.time()
+        sizes = {key: len(text.encode()) for key, text in items.items()}
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO entries (key, namespace, value, size, last_used) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                    "last_used = excluded.last_used",
+                    [
+                        (key, self._namespace_column(key), text, sizes[key], now)
+                        for key, text in items.items()
+                    ]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache write failed: {e}") from e
+        return sizes
+
+    def delete(self, key: str) -> bool:
+        """
+        Delete an entry; return True if something was deleted.
+
+        Raises:
+            IOError: If the database cannot be written
+        """
+        try:
+            cursor = self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache delete failed: {e}") from e
+        return cursor.rowcount > 0
+
+    def keys(self, namespace: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield storage keys (all namespaces, or just one).
+
+        Raises:
+            IOError: If the database cannot be read
+        """
+        try:
+            if namespace is None:
+                rows = self._conn().execute("SELECT key FROM entries").fetchall()
+            else:
+                rows = self._conn().execute(
+                    "SELECT key FROM entries WHERE namespace = ?", (namespace,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache read failed: {e}") from e
+        for (key,) in rows:
+            yield key
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """
+        Delete every entry (or every entry in a namespace); return the count.
+
+        Raises:
+            IOError: If the database cannot be written
+        """
+        try:
+            if namespace is None:
+                cursor = self._conn().execute("DELETE FROM entries")
+            else:
+                cursor = self._conn().execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache delete failed: {e}") from e
+        return cursor.rowcount
+
+    # Longest a recency update waits for another process's write lock, in
+    # milliseconds; recency is best effort and must not stall reads
+    TOUCH_TIMEOUT_MS = 50
+
+    def touch(self, key: str):
+        """Mark an entry as recently used (for LRU eviction)."""
+        self.touch_many([key])
+
+    def touch_many(self, keys: Iterable[str]):
+        """Mark several entries as recently used in one short transaction."""
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {self.TOUCH_TIMEOUT_MS}")
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in keys])
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        except sqlite3.Error:
+            pass  # Busy; recency is best effort
+
+    def evict(
+        self,
+        namespace: Optional[str],
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> List[str]:
+        """
+        Delete least recently used entries until a namespace fits its quota.
+
+        Runs in one write transaction, so concurrent processes never evict
+        the same namespace below its quota.
+
+        Returns:
+            Storage keys that were evicted
+
+        Raises:
+            IOError: If the database cannot be written
+        """
+        column = namespace or ''
+        conn = self._conn()
+        victims = []
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT entries, bytes FROM namespace_totals WHERE namespace = ?", (column,)
+                ).fetchone()
+                count, used = row if row else (0, 0)
+
+                if (max_entries is not None and count > max_entries) or \
+                        (max_bytes is not None and used > max_bytes):
+                    rows = conn.execute(
+                        "SELECT key, size FROM entries WHERE namespace = ? ORDER BY last_used",
+                        (column,)
+                    )
+                    for key, size in rows:
+                        if (max_entries is None or count <= max_entries) and \
+                                (max_bytes is None or used <= max_bytes):
+                            break
+                        victims.append(key)
+                        count -= 1
+                        used -= size
+
+                    conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache eviction failed: {e}") from e
+
+        return victims
+
+    def namespace_totals(self) -> Dict[Optional[str], Tuple[int, int]]:
+        """
+        (entries, bytes) per namespace holding entries (None = un-namespaced).
+
+        Raises:
+            IOError: If the database cannot be read
+        """
+        try:
+            rows = self._conn().execute(
+                "SELECT namespace, entries, bytes FROM namespace_totals WHERE entries > 0"
+            ).fetchall()
+        except sqlite3.Error as e:
+            raise IOError(f"SQLite cache read failed: {e}") from e
+        return {namespace or None: (entries, size) for namespace, entries, size in rows}
+
+    def reconcile(self, visit: Optional[Callable[[str, int, float], None]] = None) -> Dict:
+        """
+        Recompute the per-namespace totals from the entries table.
+
+        The triggers keep totals exact, so drift only appears if the
+        database was modified outside this class.
+
+        Args:
+            visit: Optional callback(key, size, last_used) for each entry
+
+        Returns:
+            Dictionary with the reconciled totals and the drift corrected
+        """
+        before = self.namespace_totals()
+        conn = self._conn()
+
+        if visit is not None:
+            for key, size, last_used in conn.execute("SELECT key, size, last_used FROM entries"):
+                visit(key, size, last_used)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM namespace_totals")
+            conn.execute(
+                "INSERT INTO namespace_totals (namespace, entries, bytes) "
+                "SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        after = self.namespace_totals()
+        entries = sum(e for e, _ in after.values())
+        total = sum(b for _, b in after.values())
+        self.last_reconciled = time.time()
+
+        return {
+            'entries': entries,
+            'bytes': total,
+            'drift_entries': entries - sum(e for e, _ in before.values()),
+            'drift_bytes': total - sum(b for _, b in before.values()),
+        }
+
+
+class LocalRedis:
+    """
+    In-process stand-in for a Redis server, exposing the subset of the
+    redis-py client API that RedisCacheBackend uses.
+
+    Lets the Redis backend run (and be tested) without a server. Data lives
+    in this object only, so it is not shared between processes.
+    """
+
+    def __init__(self):
+        """Initialize an empty keyspace."""
+        # Re-entrant, so callers can hold it to make several commands atomic
+        self.lock = threading.RLock()
+        self._data: Dict[str, Any] = {}
+
+    def get(self, name: str) -> Optional[str]:
+        with self.lock:
+            return self._data.get(name)
+
+    def set(self, name: str, value: str) -> bool:
+        with self.lock:
+            self._data[name] = value
+            return True
+
+    def mget(self, names: List[str]) -> List[Optional[str]]:
+        with self.lock:
+            return [self._data.get(name) for name in names]
+
+    def mset(self, mapping: Dict[str, str]) -> bool:
+        with self.lock:
+            self._data.update(mapping)
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self.lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self.lock:
+            return self._data.get(name, {}).get(key)
+
+    def hset(self, name: str, key: str, value: Any) -> int:
+        with self.lock:
+            hash_ = self._data.setdefault(name, {})
+            added = key not in hash_
+            hash_[key] = str(value)
+            return int(added)
+
+    def hdel(self, name: str, *keys: str) -> int:
+        with self.lock:
+            hash_ = self._data.get(name, {})
+            return sum(1 for key in keys if hash_.pop(key, None) is not None)
+
+    def hlen(self, name: str) -> int:
+        with self.lock:
+            return len(self._data.get(name, {}))
+
+    def hgetall(self, name: str) -> Dict[str, str]:
+        with self.lock:
+            return dict(self._data.get(name, {}))
+
+    def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        with self.lock:
+            hash_ = self._data.setdefault(name, {})
+            value = int(hash_.get(key, 0)) + amount
+            hash_[key] = str(value)
+            return value
+
+    def zadd(self, name: str, mapping: Dict[str, float], xx: bool = False) -> int:
+        with self.lock:
+            zset = self._data.setdefault(name, {})
+            if xx:
+                mapping = {member: score for member, score in mapping.items() if member in zset}
+            added = sum(1 for member in mapping if member not in zset)
+            zset.update(mapping)
+            return added
+
+    def zrem(self, name: str, *members: str) -> int:
+        with self.lock:
+            zset = self._data.get(name, {})
+            return sum(1 for member in members if zset.pop(member, None) is not None)
+
+    def zrange(self, name: str, start: int, end: int, withscores: bool = False) -> List:
+        with self.lock:
+            items = sorted(self._data.get(name, {}).items(), key=lambda item: (item[1], item[0]))
+        items = items[start:] if end == -1 else items[start:end + 1]
+        return items if withscores else [member for member, _ in items]
+
+    def sadd(self, name: str, *members: str) -> int:
+        with self.lock:
+            members_ = self._data.setdefault(name, set())
+            added = len(set(members) - members_)
+            members_.update(members)
+            return added
+
+    def srem(self, name: str, *members: str) -> int:
+        with self.lock:
+            members_ = self._data.get(name, set())
+            removed = len(set(members) & members_)
+            members_.difference_update(members)
+            return removed
+
+    def smembers(self, name: str) -> set:
+        with self.lock:
+            return set(self._data.get(name, set()))
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Entries in Redis (or anything speaking the redis-py client API).
+
+    Layout (prefix defaults to "cache"):
+        <prefix>:v:<storage key>     entry text
+        <prefix>:sizes:<namespace>   hash of storage key -> bytes
+        <prefix>:lru:<namespace>     sorted set of storage key by last use
+        <prefix>:bytes               hash of namespace -> total bytes
+        <prefix>:namespaces          set of namespaces in use
+
+    The un-namespaced keyspace uses an empty namespace name. The client
+    must return str (redis-py: decode_responses=True).
+
+    Writes and deletes update the entry and its bookkeeping in one Lua
+    script, so concurrent writers cannot skew the byte totals or the LRU
+    index (LocalRedis holds its lock for the same steps).
+    """
+
+    name = 'redis'
+
+    # KEYS: bytes hash, namespaces set, then (value, sizes, lru) per entry
+    # ARGV: now, then (storage key, namespace, text) per entry
+    WRITE_SCRIPT = """
+local now = ARGV[1]
+local count = (#KEYS - 2) / 3
+for i = 0, count - 1 do
+    local value_key, sizes_key, lru_key = KEYS[3 + 3 * i], KEYS[4 + 3 * i], KEYS[5 + 3 * i]
+    local key, namespace, text = ARGV[2 + 3 * i], ARGV[3 + 3 * i], ARGV[4 + 3 * i]
+    local size = string.len(text)
+    local previous = tonumber(redis.call('HGET', sizes_key, key) or 0)
+    redis.call('SET', value_key, text)
+    redis.call('HSET', sizes_key, key, size)
+    redis.call('ZADD', lru_key, now, key)
+    redis.call('HINCRBY', KEYS[1], namespace, size - previous)
+    redis.call('SADD', KEYS[2], namespace)
+end
+return count
+"""
+
+    # KEYS: value, sizes, lru, bytes hash; ARGV: storage key, namespace
+    DELETE_SCRIPT = """
+local previous = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or 0)
+local deleted = redis.call('DEL', KEYS[1])
+if redis.call('HDEL', KEYS[2], ARGV[1]) == 1 then
+    redis.call('HINCRBY', KEYS[4], ARGV[2], -previous)
+end
+redis.call('ZREM', KEYS[3], ARGV[1])
+return deleted
+"""
+
+    def __init__(self, client: Any, prefix: str = 'cache'):
+        """
+        Initialize Redis backend.
+
+        Args:
+            client: redis.Redis-compatible client (or LocalRedis)
+            prefix: Prefix for every Redis key this backend uses
+        """
+        self.client = client
+        self.prefix = prefix
+        self.last_reconciled = None
+        if isinstance(client, LocalRedis):
+            self._write_script = self._delete_script = None
+        else:
+            self._write_script = client.register_script(self.WRITE_SCRIPT)
+            self._delete_script = client.register_script(self.DELETE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'cache') -> 'RedisCacheBackend':
+        """
+        Connect to a Redis server (requires the redis package).
+
+        Args:
+            url: Redis URL, e.g. redis://localhost:6379/0
+            prefix: Prefix for every Redis key this backend uses
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The redis package is required for RedisCacheBackend.from_url()") from e
+        return cls(redis.Redis.from_url(url, decode_responses=True), prefix=prefix)
+
+    def _value_key(self, key: str) -> str:
+        return f"{self.prefix}:v:{key}"
+
+    def _sizes_key(self, namespace: str) -> str:
+        return f"{self.prefix}:sizes:{namespace}"
+
+    def _lru_key(self, namespace: str) -> str:
+        return f"{self.prefix}:lru:{namespace}"
+
+    def read(self, key: str) -> Optional[str]:
+        """Get an entry's serialized text, or None if there is no entry."""
+        return self.client.get(self._value_key(key))
+
+    def write(self, key: str, text: str) -> int:
+        """Store an entry (replacing any previous one); return its size in bytes."""
+        return self.write_many({key: text})[key]
+
+    def read_many(self, keys: List[str]) -> Dict[str, str]:
+        """Get several entries with a single MGET."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        values = self.client.mget([self._value_key(key) for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def write_many(self, items: Dict[str, str]) -> Dict[str, int]:
+        """Store several entries and their bookkeeping in one atomic round trip."""
+        if not items:
+            return {}
+
+        now = time.time()
+        sizes = {key: len(text.encode()) for key, text in items.items()}
+
+        if self._write_script is not None:
+            keys = [f"{self.prefix}:bytes", f"{self.prefix}:namespaces"]
+            args = [now]
+            for key, text in items.items():
+                namespace = split_key(key)[0] or ''
+                keys += [self._value_key(key), self._sizes_key(namespace), self._lru_key(namespace)]
+                args += [key, namespace, text]
+            self._write_script(keys=keys, args=args)
+            return sizes
+
+        # LocalRedis: same steps, made atomic by holding the client's lock
+        with self.client.lock:
+            self.client.mset({self._value_key(key): text for key, text in items.items()})
+            for key, size in sizes.items():
+                namespace = split_key(key)[0] or ''
+                sizes_key = self._sizes_key(namespace)
+
+                previous = self.client.hget(sizes_key, key)
+                self.client.hset(sizes_key, key, size)
+                self.client.zadd(self._lru_key(namespace), {key: now})
+                self.client.hincrby(f"{self.prefix}:bytes", namespace, size - int(previous or 0))
+                self.client.sadd(f"{self.prefix}:namespaces", namespace)
+        return sizes
+
+    def delete(self, key: str) -> bool:
+        """Delete an entry and its bookkeeping atomically; return True if something was deleted."""
+        namespace = split_key(key)[0] or ''
+        sizes_key = self._sizes_key(namespace)
+
+        if self._delete_script is not None:
+            deleted = self._delete_script(
+                keys=[self._value_key(key), sizes_key, self._lru_key(namespace), f"{self.prefix}:bytes"],
+                args=[key, namespace]
+            )
+            return int(deleted) > 0
+
+        # LocalRedis: same steps, made atomic by holding the client's lock
+        with self.client.lock:
+            previous = self.client.hget(sizes_key, key)
+            deleted = self.client.delete(self._value_key(key)) > 0
+            if self.client.hdel(sizes_key, key):
+                self.client.hincrby(f"{self.prefix}:bytes", namespace, -int(previous or 0))
+            self.client.zrem(self._lru_key(namespace), key)
+        return deleted
+
+    def _namespaces(self) -> List[str]:
+        return sorted(self.client.smembers(f"{self.prefix}:namespaces"))
+
+    def keys(self, namespace: Optional[str] = None) -> Iterator[str]:
+        """Yield storage keys (all namespaces, or just one)."""
+        namespaces = self._namespaces() if namespace is None else [namespace]
+        for name in namespaces:
+            yield from self.client.hgetall(self._sizes_key(name))
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Delete every entry (or every entry in a namespace); return the count."""
+        namespaces = self._namespaces() if namespace is None else [namespace]
+        deleted = 0
+        for name in namespaces:
+            keys = list(self.client.hgetall(self._sizes_key(name)))
+            if keys:
+                deleted += self.client.delete(*[self._value_key(key) for key in keys])
+            self.client.delete(self._sizes_key(name), self._lru_key(name))
+            self.client.hdel(f"{self.prefix}:bytes", name)
+            self.client.srem(f"{self.prefix}:namespaces", name)
+        return deleted
+
+    def touch(self, key: str):
+        """Mark an entry as recently used (for LRU eviction)."""
+        self.touch_many([key])
+
+    def touch_many(self, keys: Iterable[str]):
+        """Mark several entries as recently used with one ZADD per namespace."""
+        now = time.time()
+        by_namespace: Dict[str, Dict[str, float]] = {}
+        for key in keys:
+            by_namespace.setdefault(split_key(key)[0] or '', {})[key] = now
+        for namespace, mapping in by_namespace.items():
+            # xx: only update members still present (deleted entries stay out)
+            self.client.zadd(self._lru_key(namespace), mapping, xx=True)
+
+    def evict(
+        self,
+        namespace: Optional[str],
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> List[str]:
+        """Delete least recently used entries until a namespace fits its quota."""
+        name = namespace or ''
+        count = self.client.hlen(self._sizes_key(name))
+        used = int(self.client.hget(f"{self.prefix}:bytes", name) or 0)
+        if (max_entries is None or count <= max_entries) and (max_bytes is None or used <= max_bytes):
+            return []
+
+        sizes = self.client.hgetall(self._sizes_key(name))
+        victims = []
+        for key in self.client.zrange(self._lru_key(name), 0, -1):
+            if (max_entries is None or count <= max_entries) and \
+                    (max_bytes is None or used <= max_bytes):
+                break
+            victims.append(key)
+            count -= 1
+            used -= int(sizes.get(key, 0))
+
+        for key in victims:
+            self.delete(key)
+        return victims
+
+    def namespace_totals(self) -> Dict[Optional[str], Tuple[int, int]]:
+        """(entries, bytes) per namespace holding entries (None = un-namespaced)."""
+        totals = {}
+        byte_totals = self.client.hgetall(f"{self.prefix}:bytes")
+        for name in self._namespaces():
+            entries = self.client.hlen(self._sizes_key(name))
+            if entries:
+                totals[name or None] = (entries, int(byte_totals.get(name, 0)))
+        return totals
+
+    def reconcile(self, visit: Optional[Callable[[str, int, float], None]] = None) -> Dict:
+        """
+        Rebuild the byte totals from the per-namespace size hashes.
+
+        Args:
+            visit: Optional callback(key, size, last_used) for each entry
+
+        Returns:
+            Dictionary with the reconciled totals and the drift corrected
+        """
+        before = self.namespace_totals()
+        entries = total = 0
+
+        for name in self._namespaces():
+            sizes = self.client.hgetall(self._sizes_key(name))
+            namespace_bytes = sum(int(size) for size in sizes.values())
+            self.client.hset(f"{self.prefix}:bytes", name, namespace_bytes)
+            entries += len(sizes)
+            total += namespace_bytes
+
+            if visit is not None:
+                last_used = dict(self.client.zrange(self._lru_key(name), 0, -1, withscores=True))
+                for key, size in sizes.items():
+                    visit(key, int(size), last_used.get(key, time.time()))
+
+        self.last_reconciled = time.time()
+        return {
+            'entries': entries,
+            'bytes': total,
+            'drift_entries': entries - sum(e for e, _ in before.values()),
+            'drift_bytes': total - sum(b for _, b in before.values()),
+        }
+
+
+def create_backend(spec: str = 'file', base_dir: str = 'data/cache') -> CacheBackend:
+    """
+    Create a cache backend from a short description.
+
+    Args:
+        spec: 'file', 'sqlite', 'sqlite:<path>', 'redis://...' or 'local-redis'
+        base_dir: Directory for the file backend and the default SQLite file
+
+    Returns:
+        CacheBackend instance
+
+    Raises:
+        ValueError: If the spec is not recognised
+    """
+    if spec == 'file':
+        return FileCacheBackend(base_dir)
+    if spec == 'sqlite':
+        return SQLiteCacheBackend(os.path.join(base_dir, 'cache.sqlite3'))
+    if spec.startswith('sqlite:'):
+        return SQLiteCacheBackend(spec[len('sqlite:'):])
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCacheBackend.from_url(spec)
+    if spec == 'local-redis':
+        return RedisCacheBackend(LocalRedis())
+    raise ValueError(f"Unknown cache backend: {spec!r}")
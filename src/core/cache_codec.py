@@ -0,0 +1,282 @@
+"""
+Serializers for cache values.
+
+The cache stores entries as JSON text. Plain JSON cannot represent the
+domain models (dataclasses holding tuples and datetimes), so values go
+through a serializer that turns them into JSON-compatible structures and
+back again. Large entries can additionally be compressed (EntryCompressor).
+"""
+
+import base64
+import bz2
+import hashlib
+import zlib
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Type
+
+try:
+    import lzma
+except ImportError:  # Python built without liblzma
+    lzma = None
+
+
+class CacheCodecError(ValueError):
+    """Raised when a cached value cannot be encoded or decoded."""
+    pass
+
+
+class JSONSerializer:
+    """
+    Pass-through serializer for values that are already JSON-compatible.
+
+    Subclasses override encode()/decode() to support richer types.
+    """
+
+    def register(self, cls: Type) -> Type:
+        """Plain JSON has no type registry; accept and ignore registrations."""
+        return cls
+
+    def encode(self, value: Any) -> Any:
+        """Convert a value into a JSON-compatible structure."""
+        return value
+
+    def decode(self, data: Any) -> Any:
+        """Convert a JSON-compatible structure back into a value."""
+        return data
+
+
+class DataclassSerializer(JSONSerializer):
+    """
+    Serializer that round-trips registered dataclasses.
+
+    Encoding (compact, positional):
+    - dataclass -> {"__dc__": "Name@fingerprint", "f": [field values...]}
+    - tuple     -> {"__t__": [items...]}
+    - datetime  -> {"__dt__": "ISO-8601 string"}
+    - lists and dicts are encoded recursively
+
+    The fingerprint is derived from the dataclass field names, so an entry
+    written before a model changed shape fails to decode (and is treated
+    as a cache miss) instead of silently landing in the wrong fields.
+
+    Usage:
+        serializer = DataclassSerializer()
+        serializer.register(Restaurant)
+
+        data = serializer.encode([restaurant1, restaurant2])
+        restaurants = serializer.decode(data)  # -> [Restaurant, Restaurant]
+    """
+
+    DATACLASS_TAG = '__dc__'
+    TUPLE_TAG = '__t__'
+    DATETIME_TAG = '__dt__'
+
+    def __init__(self):
+        """Initialize serializer with an empty type registry."""
+        self._by_type: Dict[Type, str] = {}
+        self._by_tag: Dict[str, Type] = {}
+        self._field_names: Dict[Type, List[str]] = {}
+
+    def register(self, cls: Type) -> Type:
+        """
+        Register a dataclass so it can be stored in the cache.
+
+        Can also be used as a class decorator.
+
+        Args:
+            cls: Dataclass type
+
+        Returns:
+            The class, unchanged
+
+        Raises:
+            TypeError: If cls is not a dataclass
+        """
+        if not (isinstance(cls, type) and is_dataclass(cls)):
+            raise TypeError(f"Only dataclasses can be registered, got {cls!r}")
+
+        names = [f.name for f in fields(cls) if f.init]
+        fingerprint = hashlib.md5(",".join(names).encode()).hexdigest()[:8]
+        tag = f"{cls.__name__}@{fingerprint}"
+
+        self._by_type[cls] = tag
+        self._by_tag[tag] = cls
+        self._field_names[cls] = names
+        return cls
+
+    def encode(self, value: Any) -> Any:
+        """
+        Convert a value into a JSON-compatible structure.
+
+        Raises:
+            CacheCodecError: If the value contains an unregistered dataclass
+                or another type JSON cannot represent
+        """
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+
+        if isinstance(value, tuple):
+            return {self.TUPLE_TAG: [self.encode(item) for item in value]}
+
+        if isinstance(value, dict):
+            return {key: self.encode(item) for key, item in value.items()}
+
+        if isinstance(value, datetime):
+            return {self.DATETIME_TAG: value.isoformat()}
+
+        tag = self._by_type.get(type(value))
+        if tag is not None:
+            return {
+                self.DATACLASS_TAG: tag,
+                'f': [self.encode(getattr(value, name)) for name in self._field_names[type(value)]],
+            }
+
+        raise CacheCodecError(f"Cannot cache value of type {type(value).__name__}")
+
+    def decode(self, data: Any) -> Any:
+        """
+        Convert a JSON-compatible structure back into a value.
+
+        Raises:
+            CacheCodecError: If the data references an unknown or changed dataclass
+        """
+        if isinstance(data, list):
+            return [self.decode(item) for item in data]
+
+        if not isinstance(data, dict):
+            return data
+
+        if self.DATACLASS_TAG in data:
+            cls = self._by_tag.get(data[self.DATACLASS_TAG])
+            if cls is None:
+                raise CacheCodecError(f"Unknown cached type: {data[self.DATACLASS_TAG]}")
+
+            names = self._field_names[cls]
+            return cls(**{name: self.decode(item) for name, item in zip(names, data['f'])})
+
+        if self.TUPLE_TAG in data:
+            return tuple(self.decode(item) for item in data[self.TUPLE_TAG])
+
+        if self.DATETIME_TAG in data:
+            return datetime.fromisoformat(data[self.DATETIME_TAG])
+
+        return {key: self.decode(item) for key, item in data.items()}
+
+
+class EntryCompressor:
+    """
+    Transparent compression for serialized cache entries.
+
+    Entries at or above threshold characters are compressed and stored as
+    "<codec>:<base64 payload>", so each entry records its own format and
+    entries written with different settings (or uncompressed, which always
+    start with "{") can be read side by side. An entry stays uncompressed
+    when compression would save less than min_saving of its size.
+
+    Usage:
+        compressor = EntryCompressor(codec='zlib', threshold=4096)
+
+        stored = compressor.pack(entry_json)
+        entry_json = compressor.unpack(stored)
+    """
+
+    CODECS = {
+        'zlib': (lambda data: zlib.compress(data, 6), zlib.decompress),
+        'bz2': (bz2.compress, bz2.decompress),
+    }
+    DECOMPRESS_ERRORS = (ValueError, OSError, EOFError, zlib.error)
+    if lzma is not None:
+        CODECS['lzma'] = (lzma.compress, lzma.decompress)
+        DECOMPRESS_ERRORS += (lzma.LZMAError,)
+
+    def __init__(self, codec: Optional[str] = 'zlib', threshold: int = 4096, min_saving: float = 0.1):
+        """
+        Initialize compressor.
+
+        Args:
+            codec: Codec for new entries ('zlib', 'bz2', 'lzma'), or None to
+                write everything uncompressed (reading still decompresses)
+            threshold: Minimum entry size in characters worth compressing
+            min_saving: Minimum fraction of the size compression must save
+
+        Raises:
+            ValueError: If the codec is not available
+        """
+        if codec is not None and codec not in self.CODECS:
+            raise ValueError(f"Unknown compression codec: {codec!r}")
+
+        self.codec = codec
+        self.threshold = threshold
+        self.min_saving = min_saving
+
+        # Statistics
+        self._stats = {
+            'compressed': 0,
+            'uncompressed': 0,
+            'not_worth_it': 0,
+            'raw_bytes': 0,
+            'stored_bytes': 0,
+        }
+
+    def pack(self, text: str) -> str:
+        """
+        Compress an entry if it is large enough and compresses well.
+
+        Args:
+            text: Serialized entry (JSON)
+
+        Returns:
+            Text to store: the JSON itself, or a codec header and payload
+        """
+        stored = text
+        if self.codec is not None and len(text) >= self.threshold:
+            compress, _ = self.CODECS[self.codec]
+            packed = f"{self.codec}:{base64.b64encode(compress(text.encode())).decode('ascii')}"
+            if len(packed) <= len(text) * (1 - self.min_saving):
+                stored = packed
+                self._stats['compressed'] += 1
+            else:
+                self._stats['not_worth_it'] += 1
+        else:
+            self._stats['uncompressed'] += 1
+
+        self._stats['raw_bytes'] += len(text)
+        self._stats['stored_bytes'] += len(stored)
+        return stored
+
+    def unpack(self, stored: str) -> str:
+        """
+        Recover an entry's JSON from its stored form.
+
+        Raises:
+            CacheCodecError: If the header names an unknown codec or the
+                payload is corrupt
+        """
+        if stored.startswith('{'):
+            return stored
+
+        codec, _, payload = stored.partition(':')
+        if codec not in self.CODECS:
+            raise CacheCodecError(f"Unknown cache entry format: {codec[:16]!r}")
+
+        _, decompress = self.CODECS[codec]
+        try:
+            return decompress(base64.b64decode(payload, validate=True)).decode()
+        except self.DECOMPRESS_ERRORS as e:
+            raise CacheCodecError(f"Corrupt {codec} cache entry: {e}") from e
+
+    def stats(self) -> Dict:
+        """Get compression statistics for entries written by this process."""
+        raw = self._stats['raw_bytes']
+        stored = self._stats['stored_bytes']
+        return {
+            'codec': self.codec,
+            'threshold': self.threshold,
+            **self._stats,
+            'saved_bytes': raw - stored,
+            'ratio': round(raw / stored, 2) if stored > 0 else 1.0,
+        }
@@ -0,0 +1,377 @@
+"""
+Canonical cache keys for domain queries.
+
+Handlers used to key entries on raw query text and coordinates rounded to
+four decimals, so "Italian" and "italian", or two users a few meters apart,
+got separate entries (and separate paid API calls). CacheKeyBuilder
+normalizes text fields and buckets coordinates into geohash cells whose
+size is configured per domain, so near-identical queries share one entry.
+
+Keys can be recorded to a JSON Lines query log and replayed through
+replay_report() to measure the hit-rate gain over exact keys:
+
+    python src/core/cache_keys.py data/query_log.jsonl --precision restaurants=6
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Per-thread switch for paused_recording()
+_recording = threading.local()
+
+
+@contextmanager
+def paused_recording():
+    """Stop the current thread's queries from reaching query logs (e.g. replays)."""
+    previous = getattr(_recording, 'paused', False)
+    _recording.paused = True
+    try:
+        yield
+    finally:
+        _recording.paused = previous
+
+
+def geohash(lat: float, lon: float, precision: int) -> str:
+    """
+    Encode a coordinate as a geohash.
+
+    Each extra character shrinks the cell by a factor of 32; at New York's
+    latitude precision 6 is about 1.2 km x 0.6 km, 7 about 150 m x 150 m
+    and 8 about 40 m x 20 m.
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        precision: Number of characters (1-12)
+
+    Returns:
+        Geohash string
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Bits alternate longitude, latitude, starting with longitude
+
+    while len(chars) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            bounds[0] = mid
+        else:
+            bits <<= 1
+            bounds[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def normalize_field(value: Any) -> str:
+    """
+    Canonical text for a query field.
+
+    Strings are case-folded with whitespace collapsed; missing values
+    (None, empty strings and lists) become "any"; lists are normalized
+    and sorted so their order does not matter.
+    """
+    if value is None:
+        return 'any'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple, set)):
+        items = sorted(normalize_field(item) for item in value)
+        return ','.join(items) if items else 'any'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    text = ' '.join(str(value).casefold().split())
+    return text or 'any'
+
+
+class CacheKeyBuilder:
+    """
+    Builds canonical cache keys from query fields and coordinates.
+
+    Features:
+    - Case and whitespace normalization of text fields
+    - Field order independence
+    - Coordinates bucketed into geohash cells (precision per domain)
+    - Optional JSON Lines query log for replay_report()
+
+    Usage:
+        keys = CacheKeyBuilder(geo_precision={'restaurants': 6})
+
+        key = keys.build('restaurants', [(40.7580, -73.9855)], cuisine="Italian")
+        # 'restaurants:cuisine=italian@dr5ru7'
+
+    Points near a cell edge can still land in different cells; the
+    precision trades hit rate against how far apart two queries sharing
+    results may be.
+    """
+
+    # Geohash characters per domain (see geohash() for cell sizes)
+    DEFAULT_GEO_PRECISION = {
+        'restaurants': 7,   # ~150 m: results are the same a block away
+        'rideshare': 7,     # ~150 m: same pickup/drop-off pricing
+    }
+
+    # Precision for domains not listed (close to the old 4-decimal rounding)
+    DEFAULT_PRECISION = 8
+
+    def __init__(
+        self,
+        geo_precision: Optional[Dict[str, int]] = None,
+        log_path: Optional[str] = None
+    ):
+        """
+        Initialize key builder.
+
+        Args:
+            geo_precision: Per-domain geohash precision
+                (default: DEFAULT_GEO_PRECISION)
+            log_path: Optional JSON Lines file every built key's inputs are
+                appended to (for replay_report())
+        """
+        self.geo_precision = dict(self.DEFAULT_GEO_PRECISION if geo_precision is None else geo_precision)
+        for domain, precision in self.geo_precision.items():
+            if not 1 <= precision <= 12:
+                raise ValueError(f"Geohash precision for {domain} must be 1-12, got {precision}")
+
+        self.log_path = log_path
+        self._log_lock = threading.Lock()
+
+    def precision_for(self, domain: str) -> int:
+        """Get the geohash precision for a domain."""
+        return self.geo_precision.get(domain, self.DEFAULT_PRECISION)
+
+    def build(
+        self,
+        domain: str,
+        points: Sequence[Tuple[float, float]] = (),
+        **fields: Any
+    ) -> str:
+        """
+        Build the canonical key for a query.
+
+        Args:
+            domain: Domain name (also selects the geohash precision)
+            points: (lat, lon) pairs, in order (e.g. origin, destination)
+            **fields: Query fields that affect the results
+
+        Returns:
+            Key such as "restaurants:cuisine=italian:price_range=$$@dr5ru7c"
+        """
+        key = self.key_for(domain, points, fields)
+        self.record(domain, points, fields)
+        return key
+
+    def key_for(
+        self,
+        domain: str,
+        points: Sequence[Tuple[float, float]],
+        fields: Dict[str, Any]
+    ) -> str:
+        """Build a key without recording it to the query log."""
+        parts = [domain]
+        parts.extend(f"{name}={normalize_field(fields[name])}" for name in sorted(fields))
+        key = ':'.join(parts)
+
+        precision = self.precision_for(domain)
+        cells = [geohash(lat, lon, precision) for lat, lon in points]
+        return f"{key}@{'>'.join(cells)}" if cells else key
+
+    def record(
+        self,
+        domain: str,
+        points: Sequence[Tuple[float, float]],
+        fields: Dict[str, Any],
+        query: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Append a query to the log (best effort; no-op without a log_path).
+
+        Args:
+            domain: Domain name
+            points: (lat, lon) pairs the key was built from
+            fields: Query fields the key was built from
+            query: Optional full query (as a dict), so the query can be
+                replayed later (see orchestration.cache_warmup)
+        """
+        if not self.log_path or getattr(_recording, 'paused', False):
+            return
+
+        record = {
+            'ts': round(time.time(), 3),
+            'domain': domain,
+            'points': [[lat, lon] for lat, lon in points],
+            'fields': fields,
+        }
+        if query is not None:
+            record['query'] = query
+        try:
+            line = json.dumps(record, default=str)
+            with self._log_lock, open(self.log_path, 'a') as f:
+                f.write(line + '\n')
+        except (IOError, TypeError) as e:
+            print(f"Warning: could not record query to {self.log_path}: {e}")
+
+
+def exact_key(domain: str, points: Sequence[Tuple[float, float]], fields: Dict[str, Any]) -> str:
+    """
+    Key a query the way handlers did before canonicalization.
+
+    Field values are used verbatim and coordinates rounded to four decimals.
+    """
+    parts = [domain]
+    parts.extend(f"{name}={fields[name]}" for name in sorted(fields))
+    parts.extend(f"{lat:.4f},{lon:.4f}" for lat, lon in points)
+    return ':'.join(parts)
+
+
+def load_query_log(path: str) -> Iterator[Dict]:
+    """
+    Read a query log written by CacheKeyBuilder.
+
+    Malformed lines are skipped.
+
+    Args:
+        path: JSON Lines file
+
+    Yields:
+        Records with ts, domain, points, fields and (if recorded) query
+    """
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                record['points'] = [tuple(point) for point in record.get('points', [])]
+                record.setdefault('fields', {})
+                yield record
+            except (ValueError, TypeError, AttributeError):
+                continue
+
+
+def replay_report(
+    records: Iterable[Dict],
+    builder: Optional[CacheKeyBuilder] = None,
+    ttls: Optional[Dict[str, int]] = None
+) -> Dict:
+    """
+    Replay a query log against exact and canonical keys.
+
+    Each record is treated as a lookup in an unbounded cache that is filled
+    on every miss; entries live for the domain TTL (forever if ttls is not
+    given or lacks the domain).
+
+    Args:
+        records: Query log records (see load_query_log())
+        builder: Key builder to evaluate (default: CacheKeyBuilder())
+        ttls: Per-domain TTLs in seconds
+
+    Returns:
+        Dictionary with per-domain and total request counts, hits, hit
+        rates and distinct keys for both schemes, and the improvement in
+        percentage points
+    """
+    builder = builder or CacheKeyBuilder()
+    ttls = ttls or {}
+
+    expires: Dict[str, Dict[str, float]] = {'exact': {}, 'canonical': {}}
+    counts: Dict[str, Dict[str, Any]] = {}
+
+    for record in records:
+        domain = record['domain']
+        ts = record.get('ts', 0)
+        ttl = ttls.get(domain)
+        domain_counts = counts.setdefault(domain, {
+            'requests': 0,
+            'exact': {'hits': 0, 'keys': set()},
+            'canonical': {'hits': 0, 'keys': set()},
+        })
+        domain_counts['requests'] += 1
+
+        keys = {
+            'exact': exact_key(domain, record['points'], record['fields']),
+            'canonical': builder.key_for(domain, record['points'], record['fields']),
+        }
+        for scheme, key in keys.items():
+            domain_counts[scheme]['keys'].add(key)
+            if key in expires[scheme] and ts < expires[scheme][key]:
+                domain_counts[scheme]['hits'] += 1
+            else:
+                expires[scheme][key] = ts + ttl if ttl is not None else float('inf')
+
+    def summarize(requests: int, exact_hits: int, exact_keys: int, canonical_hits: int, canonical_keys: int) -> Dict:
+        exact_rate = exact_hits / requests * 100 if requests else 0.0
+        canonical_rate = canonical_hits / requests * 100 if requests else 0.0
+        return {
+            'requests': requests,
+            'exact': {'hits': exact_hits, 'keys': exact_keys, 'hit_rate_percent': round(exact_rate, 2)},
+            'canonical': {'hits': canonical_hits, 'keys': canonical_keys, 'hit_rate_percent': round(canonical_rate, 2)},
+            'improvement_points': round(canonical_rate - exact_rate, 2),
+            'upstream_calls_saved': canonical_hits - exact_hits,
+        }
+
+    domains = {}
+    for domain, c in counts.items():
+        domains[domain] = summarize(
+            c['requests'],
+            c['exact']['hits'], len(c['exact']['keys']),
+            c['canonical']['hits'], len(c['canonical']['keys'])
+        )
+        domains[domain]['precision'] = builder.precision_for(domain)
+
+    return {
+        'domains': domains,
+        'total': summarize(
+            sum(d['requests'] for d in domains.values()),
+            sum(d['exact']['hits'] for d in domains.values()),
+            sum(d['exact']['keys'] for d in domains.values()),
+            sum(d['canonical']['hits'] for d in domains.values()),
+            sum(d['canonical']['keys'] for d in domains.values())
+        ),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.cache_service import CacheService
+
+    parser = argparse.ArgumentParser(description="Replay a query log against canonical cache keys")
+    parser.add_argument("log", help="Query log (JSON Lines, see CACHE_QUERY_LOG)")
+    parser.add_argument(
+        "--precision", action="append", default=[], metavar="DOMAIN=N",
+        help="Geohash precision override, e.g. restaurants=6 (repeatable)"
+    )
+    parser.add_argument("--no-ttl", action="store_true", help="Ignore domain TTLs (entries never expire)")
+
+    args = parser.parse_args()
+
+    precision = dict(CacheKeyBuilder.DEFAULT_GEO_PRECISION)
+    for override in args.precision:
+        domain, _, value = override.partition('=')
+        precision[domain] = int(value)
+
+    report = replay_report(
+        load_query_log(args.log),
+        CacheKeyBuilder(geo_precision=precision),
+        ttls=None if args.no_ttl else CacheService.DEFAULT_TTLS
+    )
+    print(json.dumps(report, indent=2))
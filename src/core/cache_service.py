@@ -1,17 +1,35 @@
 """
-Production-ready caching service with file-based storage.
-Designed for easy upgrade to Redis when needed.
+Production-ready caching service with pluggable storage.
+File-based by default; SQLite (shared by worker processes on one host)
+and Redis backends plug into the same interface.
 """
 
 import os
 import json
+import contextvars
 import hashlib
+import heapq
 import time
-from typing import Any, Optional, Dict
+from collections import OrderedDict
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Optional, Dict, Iterable, List, Set, Tuple, Union
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 
+from .cache_backends import (
+    DEFAULT_NAMESPACE,
+    CacheBackend,
+    FileCacheBackend,
+    create_backend,
+    split_key,
+    validate_namespace,
+)
+from .cache_codec import CacheCodecError, DataclassSerializer, EntryCompressor
+from .cache_keys import CacheKeyBuilder
+from .rate_limiter import priority_lane
+from .single_flight import SingleFlight
+
 
 @dataclass
 class CacheEntry:
@@ -19,38 +37,301 @@ class CacheEntry:
     key: str
     value: Any
     created_at: float
-    ttl: int  # Time to live in seconds
+    ttl: int  # Time to live in seconds (hard expiry)
+    soft_ttl: Optional[int] = None  # Served stale (and refreshed) after this
+    negative: Optional[str] = None  # Reason, for cached "not found"/"empty" outcomes
 
     def is_expired(self) -> bool:
         """Check if cache entry has expired."""
         age = time.time() - self.created_at
         return age > self.ttl
 
+    def is_stale(self) -> bool:
+        """Check if entry is past its soft TTL (still servable until ttl)."""
+        if self.soft_ttl is None:
+            return False
+        return time.time() - self.created_at > self.soft_ttl
+
     def age_seconds(self) -> float:
         """Get age of cache entry in seconds."""
         return time.time() - self.created_at
 
 
+class MemoryTier:
+    """
+    Bounded in-process LRU cache that sits in front of the file store.
+
+    Entries are kept as their serialized JSON text, so every hit returns a
+    fresh object (same semantics as reading the file) while skipping the
+    filesystem entirely. Eviction drops expired entries first, then the
+    least recently used ones, until both the entry and byte caps are met.
+
+    Recency is tracked per namespace and eviction takes from the namespace
+    using the most memory, so one busy domain cannot push another domain's
+    hot entries out of the tier.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize memory tier.
+
+        Args:
+            max_entries: Maximum number of entries held in memory
+            max_bytes: Maximum total size of serialized entries in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # namespace -> key -> (text, expires_at, size), least recently used first
+        self._entries: Dict[Optional[str], "OrderedDict[str, Tuple[str, float, int]]"] = {}
+        self._namespace_bytes: Dict[Optional[str], int] = {}
+        self._count = 0
+        self._bytes = 0
+        self.lock = Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get serialized entry text for a key.
+
+        Args:
+            key: Storage key
+
+        Returns:
+            Serialized entry if present and not expired, None otherwise
+        """
+        with self.lock:
+            entries = self._entries.get(split_key(key)[0])
+            record = entries.get(key) if entries is not None else None
+            if record is None:
+                self.misses += 1
+                return None
+
+            text, expires_at, _ = record
+            if time.time() > expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str, expires_at: float):
+        """
+        Store serialized entry text, evicting as needed.
+
+        Args:
+            key: Storage key
+            text: Serialized cache entry
+            expires_at: Unix timestamp after which the entry is stale
+        """
+        size = len(text)
+        if size > self.max_bytes or self.max_entries <= 0:
+            # Too large to ever fit; make sure no stale copy lingers
+            self.discard(key)
+            return
+
+        namespace = split_key(key)[0]
+        with self.lock:
+            self._remove(key)
+            self._entries.setdefault(namespace, OrderedDict())[key] = (text, expires_at, size)
+            self._namespace_bytes[namespace] = self._namespace_bytes.get(namespace, 0) + size
+            self._count += 1
+            self._bytes += size
+            self._evict()
+
+    def discard(self, key: str):
+        """Remove a key from the memory tier if present."""
+        with self.lock:
+            self._remove(key)
+
+    def clear(self, namespace: Optional[str] = None):
+        """Drop every entry from the memory tier (or from one namespace)."""
+        with self.lock:
+            if namespace is None:
+                self._entries.clear()
+                self._namespace_bytes.clear()
+                self._count = 0
+                self._bytes = 0
+                return
+
+            entries = self._entries.pop(namespace, None)
+            if entries is not None:
+                self._count -= len(entries)
+                self._bytes -= self._namespace_bytes.pop(namespace, 0)
+
+    def _remove(self, key: str):
+        """Remove a key (caller must hold the lock)."""
+        namespace = split_key(key)[0]
+        entries = self._entries.get(namespace)
+        record = entries.pop(key, None) if entries is not None else None
+        if record is not None:
+            self._namespace_bytes[namespace] -= record[2]
+            self._count -= 1
+            self._bytes -= record[2]
+
+    def _evict(self):
+        """Evict expired, then least recently used entries (caller holds lock)."""
+        if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        now = time.time()
+        for entries in self._entries.values():
+            for key in [k for k, (_, expires_at, _) in entries.items() if expires_at < now]:
+                self._remove(key)
+                self.evictions += 1
+
+        while self._count > self.max_entries or self._bytes > self.max_bytes:
+            # Take from whichever namespace holds the most memory
+            namespace = max(self._namespace_bytes, key=self._namespace_bytes.get)
+            key = next(iter(self._entries[namespace]))
+            self._remove(key)
+            self.evictions += 1
+
+    def namespace_stats(self) -> Dict[Optional[str], Dict[str, int]]:
+        """Entries and bytes held per namespace."""
+        with self.lock:
+            return {
+                namespace: {'entries': len(entries), 'bytes': self._namespace_bytes[namespace]}
+                for namespace, entries in self._entries.items()
+                if entries
+            }
+
+    def stats(self) -> Dict:
+        """Get memory tier statistics."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate_percent': round(self.hits / total * 100, 2) if total > 0 else 0,
+                'entries': self._count,
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class ExpiryIndex:
+    """
+    Expiry-ordered index of cache entries (min-heap on expiry time).
+
+    Lets the sweeper find due entries without touching the rest of the
+    cache. Heap items superseded by a later set or a delete are skipped
+    when popped; the dict holds each key's current expiry.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.lock = Lock()
+        self._heap: List[Tuple[float, str]] = []
+        self._expiry: Dict[str, float] = {}
+
+    def push(self, key_hash: str, expires_at: float):
+        """Record (or update) when an entry expires."""
+        with self.lock:
+            self._expiry[key_hash] = expires_at
+            heapq.heappush(self._heap, (expires_at, key_hash))
+
+    def add_if_missing(self, key_hash: str, expires_at: float):
+        """Record an expiry only for keys the index does not know yet."""
+        with self.lock:
+            if key_hash not in self._expiry:
+                self._expiry[key_hash] = expires_at
+                heapq.heappush(self._heap, (expires_at, key_hash))
+
+    def discard(self, key_hash: str):
+        """Forget an entry."""
+        with self.lock:
+            self._expiry.pop(key_hash, None)
+
+    def clear(self):
+        """Forget every entry."""
+        with self.lock:
+            self._heap.clear()
+            self._expiry.clear()
+
+    def discard_namespace(self, namespace: str):
+        """Forget every entry in a namespace."""
+        prefix = f"{namespace}/"
+        with self.lock:
+            for key_hash in [k for k in self._expiry if k.startswith(prefix)]:
+                del self._expiry[key_hash]
+
+    def pop_due(self, now: float, limit: int) -> List[str]:
+        """
+        Remove and return up to limit keys that expire at or before now.
+
+        Args:
+            now: Current Unix timestamp
+            limit: Maximum number of keys to return
+
+        Returns:
+            Due key hashes, earliest first
+        """
+        due = []
+        with self.lock:
+            while self._heap and len(due) < limit and self._heap[0][0] <= now:
+                expires_at, key_hash = heapq.heappop(self._heap)
+                if self._expiry.get(key_hash) == expires_at:
+                    del self._expiry[key_hash]
+                    due.append(key_hash)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
 class CacheService:
     """
-    File-based caching service with Redis-ready interface.
+    Caching service over a pluggable storage backend.
 
     Features:
-    - File-based storage (no external dependencies)
+    - File-based storage by default (no external dependencies)
+    - SQLite (WAL) or Redis backends for sharing one cache between worker
+      processes (see cache_backends.create_backend())
+    - Sharded directory layout with atomic (temp file + rename) writes
+    - In-process LRU tier in front of the files (read- and write-through)
+    - Transparent compression of large entries
     - TTL (time-to-live) support
-    - Domain-specific cache directories
+    - Background expiry sweeper driven by an expiry-ordered index
+    - Domain-namespaced keys with per-domain clear, quotas (LRU eviction)
+      and hit-rate statistics
+    - Canonical query keys (normalized text, geohash-bucketed coordinates)
     - Cache statistics
-    - Easy migration path to Redis
 
     Usage:
         cache = CacheService(base_dir="data/cache")
 
+        # Register model types so they come back as objects
+        cache.register_type(RideEstimate)
+
         # Set with 5-minute TTL
         cache.set("ride_key", estimate_data, ttl=300)
 
         # Get (returns None if expired or missing)
         data = cache.get("ride_key")
 
+        # Namespaced by domain (domain TTL and quota apply)
+        cache.set("ride_key", estimate_data, domain="rideshare")
+        data = cache.get("ride_key", domain="rideshare")
+        cache.clear(domain="rideshare")  # Other domains untouched
+
+        # Batched reads and writes (one backend round trip each)
+        cache.set_many({"key_a": a, "key_b": b}, domain="rideshare")
+        found = cache.get_many(["key_a", "key_b"], domain="rideshare")
+
+        # Get, or fetch once for all concurrent callers and cache the result
+        data = cache.get_or_fetch("ride_key", fetch_estimates, domain="rideshare")
+
+        # Delete expired entries in the background (bounded work per tick)
+        cache.start_sweeper(interval=30, max_per_tick=500)
+
         # Statistics
         stats = cache.stats()
     """
@@ -64,12 +345,57 @@ class CacheService:
         'geocoding': 86400,    # 24 hours
     }
 
+    # Stale-while-revalidate (soft TTL, hard TTL) pairs in seconds. Between
+    # the two, get_or_fetch() serves the stale value and refreshes it in the
+    # background. Domains not listed use DEFAULT_TTLS as a hard TTL.
+    DEFAULT_STALE_TTLS = {
+        'restaurants': (3600, 21600),  # Fresh 1 hour, servable 6 hours
+    }
+
+    # TTLs for negative entries ("not found" / "empty result"), in seconds.
+    # Short, so a transient upstream gap or a newly added place shows up soon.
+    DEFAULT_NEGATIVE_TTLS = {
+        'rideshare': 30,
+        'restaurants': 120,
+        'geocoding': 900,      # 15 minutes for unknown place names
+    }
+
+    # Per-domain on-disk quotas (max entries, max bytes). When a domain goes
+    # over, its least recently used entries are evicted; other domains are
+    # unaffected. Domains not listed are unbounded.
+    DEFAULT_QUOTAS = {
+        'rideshare': (5000, 25 * 1024 * 1024),
+        'restaurants': (5000, 100 * 1024 * 1024),
+        'geocoding': (20000, 20 * 1024 * 1024),
+    }
+
+    # Priority lane background refreshes are charged to
+    REFRESH_LANE = 'background-warmup'
+
+    # Memory-tier hits are reported to the backend's LRU in batches of up to
+    # TOUCH_BATCH keys, at least every TOUCH_INTERVAL seconds, rather than
+    # one backend write per hit
+    TOUCH_BATCH = 256
+    TOUCH_INTERVAL = 5.0
+
     def __init__(
         self,
         base_dir: str = "data/cache",
         cache_dir: Optional[str] = None,  # Backward compatibility
         enabled: bool = True,
-        ttl_minutes: Optional[int] = None  # Backward compatibility
+        ttl_minutes: Optional[int] = None,  # Backward compatibility
+        memory_max_entries: int = 1024,
+        memory_max_bytes: int = 16 * 1024 * 1024,
+        serializer: Optional[Any] = None,
+        stale_ttls: Optional[Dict[str, Tuple[int, int]]] = None,
+        max_background_refreshes: int = 2,
+        reconcile_interval: int = 600,
+        quotas: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+        backend: Optional[CacheBackend] = None,
+        compression: Optional[str] = 'zlib',
+        compress_threshold: int = 4096,
+        geo_precision: Optional[Dict[str, int]] = None,
+        query_log: Optional[str] = None
     ):
         """
         Initialize cache service.
@@ -79,6 +405,27 @@ class CacheService:
             cache_dir: Deprecated, use base_dir instead
             enabled: Whether caching is enabled (useful for testing)
             ttl_minutes: Deprecated, use ttl parameter in set() instead
+            memory_max_entries: Entry cap for the in-memory tier (0 disables it)
+            memory_max_bytes: Byte cap for the in-memory tier
+            serializer: Value serializer (default: DataclassSerializer)
+            stale_ttls: Per-domain (soft, hard) TTL pairs (default: DEFAULT_STALE_TTLS)
+            max_background_refreshes: Maximum concurrent stale-entry refreshes
+            reconcile_interval: Seconds between background re-scans of the
+                on-disk entry count/size index (see reconcile_stats())
+            quotas: Per-domain (max entries, max bytes) quotas
+                (default: DEFAULT_QUOTAS)
+            backend: Storage backend (default: FileCacheBackend in base_dir).
+                With a backend shared between processes, each process still
+                keeps its own memory tier; set memory_max_entries=0 where
+                another process's writes must be seen immediately.
+            compression: Codec for entries of compress_threshold characters
+                or more ('zlib', 'bz2', 'lzma'; None stores them as plain
+                JSON). Compressed entries are always readable.
+            compress_threshold: Minimum serialized size worth compressing
+            geo_precision: Per-domain geohash precision for canonical keys
+                (default: CacheKeyBuilder.DEFAULT_GEO_PRECISION)
+            query_log: Optional JSON Lines file recording every canonical
+                key built (see cache_keys.replay_report())
         """
         # Handle backward compatibility
         if cache_dir is not None:
@@ -101,6 +448,64 @@ class CacheService:
         if self.enabled:
             self.base_dir.mkdir(parents=True, exist_ok=True)
 
+        # Storage (default: sharded files with atomic writes)
+        self.backend = backend if backend is not None else FileCacheBackend(self.base_dir)
+
+        # Per-domain quotas, enforced by LRU eviction after each write
+        self.quotas = dict(self.DEFAULT_QUOTAS if quotas is None else quotas)
+
+        # Expiry-ordered index driving the background sweeper
+        self.expiry_index = ExpiryIndex()
+        self._sweeper: Optional[Thread] = None
+        self._sweeper_stop = Event()
+        self._sweep_stats = {
+            'interval': None,
+            'max_per_tick': None,
+            'ticks': 0,
+            'checked': 0,
+            'removed': 0,
+            'last_tick_at': None,
+            'last_tick_ms': 0.0,
+            'last_tick_removed': 0,
+            'backlog': False,
+        }
+
+        # Entry count / size index, rebuilt from disk now and periodically
+        self.reconcile_interval = reconcile_interval
+        self._reconciling = False
+        self._reconcile_lock = Lock()
+        if self.enabled:
+            self.reconcile_stats()
+
+        # Converts cached values to/from JSON-compatible data
+        self.serializer = serializer if serializer is not None else DataclassSerializer()
+
+        # Compresses large serialized entries (format recorded per entry)
+        self.compressor = EntryCompressor(compression, compress_threshold)
+
+        # In-memory tier in front of the file store
+        self.memory = MemoryTier(
+            max_entries=memory_max_entries,
+            max_bytes=memory_max_bytes
+        )
+
+        # Coalesces concurrent misses for the same key
+        self.single_flight = SingleFlight()
+
+        # Canonical keys, so near-identical queries share entries
+        self.keys = CacheKeyBuilder(geo_precision, log_path=query_log)
+
+        # Stale-while-revalidate configuration and in-progress refreshes
+        self.stale_ttls = dict(self.DEFAULT_STALE_TTLS if stale_ttls is None else stale_ttls)
+        self.max_background_refreshes = max_background_refreshes
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = Lock()
+
+        # Memory-tier hits not yet reported to the backend (ordered set)
+        self._pending_touches: "OrderedDict[str, None]" = OrderedDict()
+        self._touch_lock = Lock()
+        self._last_touch_flush = time.time()
+
         # Statistics
         self._stats = {
             'hits': 0,
@@ -108,7 +513,28 @@ class CacheService:
             'sets': 0,
             'deletes': 0,
             'expired': 0,
+            'disk_hits': 0,
+            'disk_misses': 0,
+            'stale_hits': 0,
+            'refreshes_started': 0,
+            'refreshes_completed': 0,
+            'refreshes_failed': 0,
+            'refreshes_skipped': 0,
+            'refreshes_throttled': 0,
+            'negative_hits': 0,
+            'negative_sets': 0,
         }
+        self._namespace_stats: Dict[str, Dict[str, int]] = {}
+
+    def register_type(self, *classes) -> None:
+        """
+        Register dataclasses that may be stored as cache values.
+
+        Args:
+            *classes: Dataclass types (e.g. Restaurant, RideEstimate)
+        """
+        for cls in classes:
+            self.serializer.register(cls)
 
     def _get_cache_key(self, *args) -> str:
         """
@@ -124,25 +550,64 @@ class CacheService:
         key_string = ":".join(str(arg) for arg in args)
         return hashlib.md5(key_string.encode()).hexdigest()
 
-    def _get_cache_path(self, key: str) -> Path:
+    def _get_key_hash(self, key: str) -> str:
         """
-        Get file path for cache key.
+        Get the storage hash for a cache key.
 
         Args:
             key: Cache key
 
         Returns:
-            Path to cache file
+            MD5 hex digest (keys that already are one are used as-is)
         """
         # Hash the key to create a safe filename if not already hashed
         if len(key) != 32:  # Not an MD5 hash
-            key_hash = hashlib.md5(key.encode()).hexdigest()
-        else:
-            key_hash = key
+            return hashlib.md5(key.encode()).hexdigest()
+        return key
+
+    def _storage_key(self, key: str, domain: Optional[str] = None) -> str:
+        """
+        Get the backend storage key for a cache key.
+
+        Args:
+            key: Cache key
+            domain: Optional domain namespace
+
+        Returns:
+            Key hash, prefixed with "<domain>/" when namespaced
+
+        Raises:
+            ValueError: If the domain is not a valid namespace name
+        """
+        key_hash = self._get_key_hash(key)
+        if domain is None:
+            return key_hash
+        return f"{validate_namespace(domain)}/{key_hash}"
+
+    def _get_cache_path(self, key: str, domain: Optional[str] = None) -> Path:
+        """
+        Get file path for cache key.
+
+        Args:
+            key: Cache key
+            domain: Optional domain namespace
 
-        return self.base_dir / f"{key_hash}.json"
+        Returns:
+            Path to cache file
+        """
+        return self.backend.path_for(self._storage_key(key, domain))
+
+    def _count(self, storage_key: str, stat: str, amount: int = 1):
+        """Bump a per-namespace counter."""
+        namespace = split_key(storage_key)[0] or DEFAULT_NAMESPACE
+        counts = self._namespace_stats.get(namespace)
+        if counts is None:
+            counts = self._namespace_stats.setdefault(
+                namespace, {'hits': 0, 'misses': 0, 'negative_hits': 0, 'sets': 0, 'evictions': 0}
+            )
+        counts[stat] += amount
 
-    def get(self, key_or_args: Any = None, *args) -> Optional[Any]:
+    def get(self, key_or_args: Any = None, *args, domain: Optional[str] = None) -> Optional[Any]:
         """
         Get value from cache.
 
@@ -153,6 +618,7 @@ class CacheService:
         Args:
             key_or_args: Cache key (new) or first argument (old)
             *args: Additional arguments for old interface
+            domain: Optional domain namespace the key lives in
 
         Returns:
             Cached value if exists and not expired, None otherwise
@@ -168,17 +634,107 @@ class CacheService:
             # New interface: get("key")
             key = str(key_or_args) if key_or_args is not None else ""
 
-        cache_path = self._get_cache_path(key)
+        found, value, _, negative = self._read(self._storage_key(key, domain))
+        return value if found and negative is None else None
 
-        # Check if cache file exists
-        if not cache_path.exists():
-            self._stats['misses'] += 1
+    def _read(self, key_hash: str) -> Tuple[bool, Any, bool, Optional[str]]:
+        """
+        Look up an entry in the memory tier, then the file store.
+
+        Args:
+            key_hash: Storage key (see _storage_key())
+
+        Returns:
+            Tuple of (found, value, stale, negative). Stale entries are past
+            their soft TTL but not their hard TTL; negative is the reason
+            stored with a negative entry (None for ordinary entries).
+        """
+        # Tier 1: in-memory LRU
+        result = self._read_memory(key_hash)
+        if result is not None:
+            return result
+
+        # Tier 2: backend store
+        try:
+            text = self.backend.read(key_hash)
+        except IOError:
+            text = None
+        return self._load(key_hash, text)
+
+    def _read_many(self, key_hashes: List[str]) -> Dict[str, Tuple[bool, Any, bool, Optional[str]]]:
+        """
+        Look up several entries: memory tier first, then one backend batch.
+
+        Returns:
+            Dictionary mapping each storage key to its _read() result
+        """
+        results = {}
+        missing = []
+        for key_hash in dict.fromkeys(key_hashes):
+            result = self._read_memory(key_hash)
+            if result is None:
+                missing.append(key_hash)
+            else:
+                results[key_hash] = result
+
+        if missing:
+            try:
+                texts = self.backend.read_many(missing)
+            except IOError:
+                texts = {}
+            for key_hash in missing:
+                results[key_hash] = self._load(key_hash, texts.get(key_hash))
+        return results
+
+    def _read_memory(self, key_hash: str) -> Optional[Tuple[bool, Any, bool, Optional[str]]]:
+        """Serve an entry from the memory tier, or None if it is not there."""
+        text = self.memory.get(key_hash)
+        if text is None:
             return None
 
+        entry = CacheEntry(**json.loads(self.compressor.unpack(text)))
+        self._touch(key_hash)
+        return self._hit(key_hash, entry, self.serializer.decode(entry.value))
+
+    def _touch(self, key_hash: str):
+        """Queue a memory-tier hit for the backend's LRU, flushing when a batch is due."""
+        with self._touch_lock:
+            self._pending_touches[key_hash] = None
+            due = (len(self._pending_touches) >= self.TOUCH_BATCH or
+                   time.time() - self._last_touch_flush >= self.TOUCH_INTERVAL)
+        if due:
+            self._flush_touches()
+
+    def _flush_touches(self):
+        """Report queued memory-tier hits to the backend in one batch."""
+        with self._touch_lock:
+            keys = list(self._pending_touches)
+            self._pending_touches.clear()
+            self._last_touch_flush = time.time()
+        if not keys:
+            return
+        try:
+            self.backend.touch_many(keys)
+        except IOError:
+            pass  # Recency is best effort
+
+    def _discard_from_backend(self, key_hash: str):
+        """Delete an unusable entry; if the backend is unavailable, the sweeper retries later."""
+        try:
+            self.backend.delete(key_hash)
+        except IOError:
+            pass
+
+    def _load(self, key_hash: str, text: Optional[str]) -> Tuple[bool, Any, bool, Optional[str]]:
+        """Decode an entry read from the backend (None counts as a miss)."""
+        if text is None:
+            self._stats['misses'] += 1
+            self._stats['disk_misses'] += 1
+            self._count(key_hash, 'misses')
+            return False, None, False, None
+
         try:
-            # Read cache entry
-            with open(cache_path, 'r') as f:
-                data = json.load(f)
+            data = json.loads(self.compressor.unpack(text))
 
             # Handle both new format (CacheEntry) and old format
             if 'created_at' in data and 'ttl' in data:
@@ -189,11 +745,19 @@ class CacheService:
                 if entry.is_expired():
                     self._stats['expired'] += 1
                     self._stats['misses'] += 1
-                    cache_path.unlink()
-                    return None
+                    self._stats['disk_misses'] += 1
+                    self._count(key_hash, 'misses')
+                    self._discard_from_backend(key_hash)
+                    self.expiry_index.discard(key_hash)
+                    return False, None, False, None
 
-                self._stats['hits'] += 1
-                return entry.value
+                value = self.serializer.decode(entry.value)
+
+                # Read-through into the memory tier
+                self.memory.put(key_hash, text, entry.created_at + entry.ttl)
+
+                self._stats['disk_hits'] += 1
+                return self._hit(key_hash, entry, value)
 
             elif 'timestamp' in data:
                 # Old format - backward compatibility
@@ -201,31 +765,54 @@ class CacheService:
                 if datetime.now() - cached_time > self.ttl:
                     self._stats['expired'] += 1
                     self._stats['misses'] += 1
-                    cache_path.unlink()
-                    return None
+                    self._stats['disk_misses'] += 1
+                    self._count(key_hash, 'misses')
+                    self._discard_from_backend(key_hash)
+                    return False, None, False, None
 
                 self._stats['hits'] += 1
-                return data["data"]
+                self._stats['disk_hits'] += 1
+                self._count(key_hash, 'hits')
+                return True, data["data"], False, None
 
             else:
                 # Unknown format
                 self._stats['misses'] += 1
-                cache_path.unlink()
-                return None
+                self._stats['disk_misses'] += 1
+                self._count(key_hash, 'misses')
+                self._discard_from_backend(key_hash)
+                return False, None, False, None
 
-        except (json.JSONDecodeError, IOError, KeyError, ValueError) as e:
-            # Corrupted cache file, delete it
+        except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError) as e:
+            # Corrupted cache file (or stale model shape), delete it
             self._stats['misses'] += 1
-            if cache_path.exists():
-                cache_path.unlink()
-            return None
+            self._stats['disk_misses'] += 1
+            self._count(key_hash, 'misses')
+            self._discard_from_backend(key_hash)
+            return False, None, False, None
+
+    def _hit(self, key_hash: str, entry: CacheEntry, value: Any) -> Tuple[bool, Any, bool, Optional[str]]:
+        """Count a hit (negative hits separately) and build the _read() result."""
+        if entry.negative is not None:
+            self._stats['negative_hits'] += 1
+            self._count(key_hash, 'negative_hits')
+            return True, value, False, entry.negative
+
+        stale = entry.is_stale()
+        self._stats['hits'] += 1
+        self._count(key_hash, 'hits')
+        if stale:
+            self._stats['stale_hits'] += 1
+        return True, value, stale, None
 
     def set(
         self,
         key_or_data: Any,
         value_or_args: Any = None,
         *args,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        soft_ttl: Optional[int] = None,
+        domain: Optional[str] = None
     ) -> bool:
         """
         Store value in cache.
@@ -238,7 +825,12 @@ class CacheService:
             key_or_data: Cache key (new) or data to cache (old)
             value_or_args: Value to cache (new) or first arg (old)
             *args: Additional arguments for old interface
-            ttl: Time to live in seconds (default: 300 = 5 minutes)
+            ttl: Time to live in seconds (default: the domain TTL, else
+                300 = 5 minutes)
+            soft_ttl: Optional age after which get_or_fetch() treats the
+                entry as stale and refreshes it in the background
+            domain: Optional domain namespace; its quota is enforced after
+                the write
 
         Returns:
             True if successful, False otherwise
@@ -263,36 +855,399 @@ class CacheService:
 
         # Use provided TTL or default
         if ttl is None:
-            ttl = self.default_ttl
+            ttl = self.get_ttl_for_domain(domain) if domain is not None else self.default_ttl
+
+        return self._write(key, value, ttl, soft_ttl, domain)
+
+    def get_many(
+        self,
+        keys: Iterable[str],
+        domain: Optional[str] = None,
+        negatives: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get several values with a single batched backend read.
+
+        Keys found in the memory tier are served from it; the rest are
+        fetched from the backend in one call (one query for SQLite, one
+        MGET for Redis).
+
+        Args:
+            keys: Cache keys
+            domain: Optional domain namespace the keys live in
+            negatives: Optional dictionary that receives key -> reason for
+                keys holding a live negative entry
+
+        Returns:
+            Dictionary mapping each key with a live value to that value;
+            missing, expired and negative keys are left out
+        """
+        if not self.enabled:
+            return {}
+
+        storage_keys = {key: self._storage_key(key, domain) for key in keys}
+        results = self._read_many(list(storage_keys.values()))
+
+        values = {}
+        for key, key_hash in storage_keys.items():
+            found, value, _, negative = results[key_hash]
+            if not found:
+                continue
+            if negative is not None:
+                if negatives is not None:
+                    negatives[key] = negative
+            else:
+                values[key] = value
+        return values
+
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        soft_ttl: Optional[int] = None,
+        domain: Optional[str] = None
+    ) -> int:
+        """
+        Store several values with a single batched backend write.
+
+        Args:
+            items: Dictionary mapping cache key to value
+            ttl: Time to live in seconds (default: the domain TTL, else
+                300 = 5 minutes)
+            soft_ttl: Optional age after which get_or_fetch() treats the
+                entries as stale
+            domain: Optional domain namespace; its quota is enforced once
+                after the batch
+
+        Returns:
+            Number of entries stored (values that cannot be serialized are
+            skipped)
+        """
+        if not self.enabled or not items:
+            return 0
+
+        if ttl is None:
+            ttl = self.get_ttl_for_domain(domain) if domain is not None else self.default_ttl
 
-        cache_path = self._get_cache_path(key)
+        packed = {}
+        for key, value in items.items():
+            try:
+                packed[self._storage_key(key, domain)] = self._pack(key, value, ttl, soft_ttl)
+            except (TypeError, CacheCodecError):
+                continue
 
         try:
-            # Create cache entry (new format)
-            entry = CacheEntry(
-                key=key,
-                value=value,
-                created_at=time.time(),
-                ttl=ttl
-            )
+            self.backend.write_many({key_hash: text for key_hash, (text, _) in packed.items()})
+        except IOError:
+            for key_hash in packed:
+                self.memory.discard(key_hash)
+            return 0
+
+        for key_hash, (text, expires_at) in packed.items():
+            self.expiry_index.push(key_hash, expires_at)
+            self.memory.put(key_hash, text, expires_at)
+            self._count(key_hash, 'sets')
+        self._stats['sets'] += len(packed)
+
+        if domain is not None:
+            self._enforce_quota(domain)
+        return len(packed)
+
+    def _pack(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        soft_ttl: Optional[int] = None,
+        negative: Optional[str] = None
+    ) -> Tuple[str, float]:
+        """
+        Serialize an entry into stored text.
+
+        Returns:
+            Tuple of (text, expires_at)
+
+        Raises:
+            TypeError, CacheCodecError: If the value cannot be serialized
+        """
+        entry = CacheEntry(
+            key=key,
+            value=self.serializer.encode(value),
+            created_at=time.time(),
+            ttl=ttl,
+            soft_ttl=soft_ttl,
+            negative=negative
+        )
+        text = self.compressor.pack(json.dumps(asdict(entry), separators=(',', ':')))
+        return text, entry.created_at + ttl
+
+    def _write(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        soft_ttl: Optional[int] = None,
+        domain: Optional[str] = None,
+        negative: Optional[str] = None
+    ) -> bool:
+        """Serialize and store an entry in the backend and memory tier."""
+        key_hash = self._storage_key(key, domain)
 
-            # Write to file
-            with open(cache_path, 'w') as f:
-                json.dump(asdict(entry), f, indent=2)
+        try:
+            text, expires_at = self._pack(key, value, ttl, soft_ttl, negative)
+
+            # Atomic write to the backend
+            self.backend.write(key_hash, text)
+            self.expiry_index.push(key_hash, expires_at)
+
+            # Write-through into the memory tier
+            self.memory.put(key_hash, text, expires_at)
 
-            self._stats['sets'] += 1
+            self._stats['negative_sets' if negative is not None else 'sets'] += 1
+            self._count(key_hash, 'sets')
+            if domain is not None:
+                self._enforce_quota(domain)
             return True
 
-        except (IOError, TypeError) as e:
-            # Failed to write (permissions, not JSON-serializable, etc.)
+        except (IOError, TypeError, CacheCodecError) as e:
+            # Failed to write (permissions, not serializable, etc.)
+            self.memory.discard(key_hash)
+            return False
+
+    def set_negative(
+        self,
+        key: str,
+        reason: str,
+        domain: Optional[str] = None,
+        ttl: Optional[int] = None,
+        value: Any = None
+    ) -> bool:
+        """
+        Cache a "not found" or "empty result" outcome for a short time.
+
+        Args:
+            key: Cache key
+            reason: Why the lookup failed (returned by get_negative())
+            domain: Optional domain namespace
+            ttl: Time to live in seconds (default: the domain's negative TTL)
+            value: Result to hand back on a hit (e.g. an empty list)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled:
             return False
 
-    def delete(self, key: str) -> bool:
+        if ttl is None:
+            ttl = self.get_negative_ttl_for_domain(domain)
+        return self._write(key, value, ttl, domain=domain, negative=reason)
+
+    def get_negative(self, key: str, domain: Optional[str] = None) -> Optional[str]:
+        """
+        Check for a cached negative outcome.
+
+        Args:
+            key: Cache key
+            domain: Optional domain namespace
+
+        Returns:
+            The stored reason if the key holds a live negative entry,
+            None otherwise (including when it holds a normal value)
+        """
+        if not self.enabled:
+            return None
+
+        found, _, _, negative = self._read(self._storage_key(key, domain))
+        return negative if found else None
+
+    def _enforce_quota(self, domain: str):
+        """Evict a domain's least recently used entries while over quota."""
+        quota = self.quotas.get(domain)
+        if quota is None:
+            return
+
+        max_entries, max_bytes = quota
+        # Eviction order should reflect recent memory-tier hits
+        self._flush_touches()
+        try:
+            evicted = self.backend.evict(domain, max_entries, max_bytes)
+        except IOError:
+            return  # Backend busy; the next write retries
+        for key_hash in evicted:
+            self.memory.discard(key_hash)
+            self.expiry_index.discard(key_hash)
+            self._count(key_hash, 'evictions')
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        ttl: Optional[int] = None,
+        domain: Optional[str] = None,
+        rate_limiter: Optional[Any] = None,
+        api_name: Optional[str] = None,
+        cache_empty: Union[bool, Callable[[], bool]] = True,
+        complete: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """
+        Get value from cache, fetching it on a miss.
+
+        Concurrent misses for the same key wait on a single call to fetch()
+        and share its result. Non-empty results are cached; empty results
+        are cached as short-lived negative entries ("empty result") and
+        returned as-is on a hit without calling fetch().
+
+        For domains with a stale-while-revalidate pair (see stale_ttls), an
+        entry past its soft TTL is returned immediately and refreshed in the
+        background, provided the rate limiter has a token for api_name.
+
+        Args:
+            key: Cache key
+            fetch: Zero-argument function that loads the value upstream
+            ttl: Time to live in seconds (default: domain TTL, else default_ttl)
+            domain: Domain namespace the entry lives in (also used for TTL
+                lookup and coalescing statistics)
+            rate_limiter: Optional RateLimiter checked before background refreshes
+            api_name: Rate limit bucket charged for a background refresh
+            cache_empty: Whether to negative-cache an empty result; a callable
+                is asked after fetch() returns (e.g. False when providers
+                failed rather than found nothing)
+            complete: Optional callable asked after fetch() returns; False
+                means the result is partial (e.g. one of several providers
+                failed), so it is returned but not cached at all
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        if not self.enabled:
+            return fetch()
+
+        soft_ttl = None
+        if ttl is None and domain is not None:
+            if domain in self.stale_ttls:
+                soft_ttl, ttl = self.stale_ttls[domain]
+            else:
+                ttl = self.get_ttl_for_domain(domain)
+
+        storage_key = self._storage_key(key, domain)
+        found, cached, stale, negative = self._read(storage_key)
+        if found and negative is not None:
+            return cached
+        if found and cached is not None:
+            if stale:
+                self._schedule_refresh(
+                    key, fetch, ttl, soft_ttl, domain, rate_limiter, api_name, cache_empty, complete
+                )
+            return cached
+
+        def load():
+            value = fetch()
+            if complete is not None and not complete():
+                return value
+            if value:
+                self.set(key, value, ttl=ttl, soft_ttl=soft_ttl, domain=domain)
+            elif cache_empty() if callable(cache_empty) else cache_empty:
+                self.set_negative(key, "empty result", domain=domain, value=value)
+            return value
+
+        return self.single_flight.do(storage_key, load, domain=domain or DEFAULT_NAMESPACE)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        ttl: Optional[int],
+        soft_ttl: Optional[int],
+        domain: Optional[str],
+        rate_limiter: Optional[Any],
+        api_name: Optional[str],
+        cache_empty: Union[bool, Callable[[], bool]] = True,
+        complete: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Start a background refresh of a stale entry, if budget allows.
+
+        At most one refresh per key and max_background_refreshes in total
+        run at a time; refreshes are skipped (the stale value keeps being
+        served) when the rate limiter has no token available. The check
+        does not take the token: fetch() charges the API client as usual,
+        in the 'background-warmup' lane so refreshes yield to live traffic.
+        """
+        storage_key = self._storage_key(key, domain)
+        with self._refresh_lock:
+            if storage_key in self._refreshing:
+                return
+
+            if len(self._refreshing) >= self.max_background_refreshes:
+                self._stats['refreshes_skipped'] += 1
+                return
+
+            if rate_limiter is not None and api_name and rate_limiter.available_tokens(api_name) < 1:
+                self._stats['refreshes_throttled'] += 1
+                return
+
+            self._refreshing.add(storage_key)
+            self._stats['refreshes_started'] += 1
+
+        lane = self.REFRESH_LANE if rate_limiter is None or self.REFRESH_LANE in rate_limiter.lanes else None
+
+        def run():
+            if lane is None:
+                self._refresh(key, fetch, ttl, soft_ttl, domain, cache_empty, complete)
+                return
+            with priority_lane(lane):
+                self._refresh(key, fetch, ttl, soft_ttl, domain, cache_empty, complete)
+
+        # A copy of the caller's context, so other context variables carry over
+        Thread(
+            target=contextvars.copy_context().run,
+            args=(run,),
+            name=f"cache-refresh-{key[:16]}",
+            daemon=True
+        ).start()
+
+    def _refresh(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        ttl: Optional[int],
+        soft_ttl: Optional[int],
+        domain: Optional[str] = None,
+        cache_empty: Union[bool, Callable[[], bool]] = True,
+        complete: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Fetch a fresh value for a stale entry and store it.
+
+        cache_empty and complete are the get_or_fetch() predicates: a partial
+        result, or an empty one caused by provider failures, leaves the stale
+        entry in place and counts as a failed refresh.
+        """
+        try:
+            value = fetch()
+            partial = complete is not None and not complete()
+            if partial or (not value and not (cache_empty() if callable(cache_empty) else cache_empty)):
+                print(f"Background cache refresh for {key} degraded by provider failures; keeping stale entry")
+                self._stats['refreshes_failed'] += 1
+                return
+            if value:
+                self.set(key, value, ttl=ttl, soft_ttl=soft_ttl, domain=domain)
+            self._stats['refreshes_completed'] += 1
+        except Exception as e:
+            # Keep serving the stale value; the next request retries
+            print(f"Background cache refresh failed for {key}: {e}")
+            self._stats['refreshes_failed'] += 1
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(self._storage_key(key, domain))
+
+    def delete(self, key: str, domain: Optional[str] = None) -> bool:
         """
         Delete value from cache.
 
         Args:
             key: Cache key
+            domain: Optional domain namespace the key lives in
 
         Returns:
             True if deleted, False if not found
@@ -300,10 +1255,11 @@ class CacheService:
         if not self.enabled:
             return False
 
-        cache_path = self._get_cache_path(key)
+        key_hash = self._storage_key(key, domain)
+        self.memory.discard(key_hash)
+        self.expiry_index.discard(key_hash)
 
-        if cache_path.exists():
-            cache_path.unlink()
+        if self.backend.delete(key_hash):
             self._stats['deletes'] += 1
             return True
 
@@ -314,7 +1270,8 @@ class CacheService:
         Clear cache entries.
 
         Args:
-            domain: Optional domain to clear (if None, clears all)
+            domain: Optional domain to clear (if None, clears all). Only
+                entries stored under that domain's namespace are removed.
 
         Returns:
             Number of entries deleted
@@ -322,14 +1279,17 @@ class CacheService:
         if not self.enabled:
             return 0
 
-        deleted = 0
+        if domain is not None:
+            namespace = validate_namespace(domain)
+            self.memory.clear(namespace)
+            self.expiry_index.discard_namespace(namespace)
+            return self.backend.clear(namespace)
 
-        # Clear all cache files
-        for cache_file in self.base_dir.glob("*.json"):
-            cache_file.unlink()
-            deleted += 1
+        self.memory.clear()
+        self.expiry_index.clear()
 
-        return deleted
+        # Clear all cache files
+        return self.backend.clear()
 
     def clear_expired(self) -> int:
         """
@@ -341,6 +1301,141 @@ class CacheService:
         """
         return self.cleanup_expired()
 
+    def reconcile_stats(self) -> Dict:
+        """
+        Re-scan the cache directory to correct the entry count/size index.
+
+        stats() reads the index in O(1); this pass (which stats every file)
+        fixes drift from other processes sharing the directory. It runs on
+        startup and in the background every reconcile_interval seconds.
+
+        Returns:
+            Dictionary with the reconciled totals and the drift corrected
+        """
+        try:
+            # Entries the expiry index has not seen (written before startup
+            # or by another process) are due now; the sweeper checks them.
+            return self.backend.reconcile(
+                visit=lambda key_hash, size, mtime: self.expiry_index.add_if_missing(key_hash, mtime)
+            )
+        finally:
+            with self._reconcile_lock:
+                self._reconciling = False
+
+    def _maybe_reconcile_in_background(self):
+        """Kick off a background reconcile if the index is due for one."""
+        last = self.backend.last_reconciled
+        if not self.enabled or (last is not None and time.time() - last < self.reconcile_interval):
+            return
+
+        with self._reconcile_lock:
+            if self._reconciling:
+                return
+            self._reconciling = True
+
+        Thread(target=self.reconcile_stats, name="cache-reconcile", daemon=True).start()
+
+    def _entry_expires_at(self, text: str) -> Optional[float]:
+        """Expiry time of a stored entry (None if unreadable)."""
+        try:
+            data = json.loads(self.compressor.unpack(text))
+            if 'created_at' in data and 'ttl' in data:
+                return data['created_at'] + data['ttl']
+            if 'timestamp' in data:
+                # Old format
+                cached_time = datetime.fromisoformat(data["timestamp"])
+                return (cached_time + self.ttl).timestamp()
+        except (json.JSONDecodeError, TypeError, ValueError):
+            pass
+        return None
+
+    def sweep_expired(self, max_entries: int = 500) -> int:
+        """
+        Delete entries that are due according to the expiry index.
+
+        Only due entries are read. Each one is re-checked on disk before
+        deletion, so an entry rewritten by another process survives and is
+        re-indexed with its new expiry.
+
+        Args:
+            max_entries: Maximum number of due entries to check
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.enabled:
+            return 0
+
+        start = time.time()
+        due = self.expiry_index.pop_due(start, max_entries)
+        removed = 0
+
+        for key_hash in due:
+            try:
+                text = self.backend.read(key_hash)
+            except IOError:
+                continue
+            if text is None:
+                continue
+
+            expires_at = self._entry_expires_at(text)
+            if expires_at is not None and expires_at > time.time():
+                self.expiry_index.add_if_missing(key_hash, expires_at)
+                continue
+
+            # Expired or corrupted
+            self.memory.discard(key_hash)
+            if self.backend.delete(key_hash):
+                self._stats['expired'] += 1
+                removed += 1
+
+        sweep = self._sweep_stats
+        sweep['ticks'] += 1
+        sweep['checked'] += len(due)
+        sweep['removed'] += removed
+        sweep['last_tick_at'] = start
+        sweep['last_tick_ms'] = round((time.time() - start) * 1000, 2)
+        sweep['last_tick_removed'] = removed
+        sweep['backlog'] = len(due) >= max_entries
+
+        return removed
+
+    def start_sweeper(self, interval: float = 30.0, max_per_tick: int = 500) -> bool:
+        """
+        Start a daemon thread that runs sweep_expired() every interval seconds.
+
+        Args:
+            interval: Seconds between sweeps
+            max_per_tick: Maximum entries checked per sweep
+
+        Returns:
+            True if started, False if disabled or already running
+        """
+        if not self.enabled or (self._sweeper is not None and self._sweeper.is_alive()):
+            return False
+
+        self._sweep_stats['interval'] = interval
+        self._sweep_stats['max_per_tick'] = max_per_tick
+        self._sweeper_stop.clear()
+
+        def run():
+            while not self._sweeper_stop.wait(interval):
+                try:
+                    self.sweep_expired(max_per_tick)
+                except Exception as e:
+                    print(f"Cache sweep failed: {e}")
+
+        self._sweeper = Thread(target=run, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+        return True
+
+    def stop_sweeper(self, timeout: Optional[float] = None):
+        """Stop the background sweeper (if running)."""
+        self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout)
+            self._sweeper = None
+
     def cleanup_expired(self) -> int:
         """
         Remove all expired cache entries.
@@ -353,59 +1448,139 @@ class CacheService:
 
         removed = 0
 
-        for cache_file in self.base_dir.glob("*.json"):
+        for key_hash in list(self.backend.keys()):
             try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
+                text = self.backend.read(key_hash)
+                if text is None:
+                    # Removed concurrently by another reader or writer
+                    continue
+                data = json.loads(self.compressor.unpack(text))
 
                 # Handle both new and old format
                 if 'created_at' in data and 'ttl' in data:
                     entry = CacheEntry(**data)
                     if entry.is_expired():
-                        cache_file.unlink()
+                        self.backend.delete(key_hash)
                         removed += 1
                 elif 'timestamp' in data:
                     # Old format
                     cached_time = datetime.fromisoformat(data["timestamp"])
                     if datetime.now() - cached_time > self.ttl:
-                        cache_file.unlink()
+                        self.backend.delete(key_hash)
                         removed += 1
 
-            except (json.JSONDecodeError, IOError, KeyError, ValueError):
-                # Corrupted file, remove it
-                cache_file.unlink()
+            except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError):
+                # Corrupted entry, remove it
+                self.backend.delete(key_hash)
                 removed += 1
 
+        # E.g. temp files from writers that died between write and rename
+        self.backend.cleanup()
+
         return removed
 
     def stats(self) -> Dict:
         """
         Get cache statistics.
 
+        Constant time: entry counts and sizes come from an index maintained
+        on set/delete/expire rather than from walking the cache directory.
+
         Returns:
             Dictionary with cache statistics
         """
         total_requests = self._stats['hits'] + self._stats['misses']
         hit_rate = (self._stats['hits'] / total_requests * 100) if total_requests > 0 else 0
 
-        files = list(self.base_dir.glob("*.json")) if self.base_dir.exists() else []
-        total_size = sum(f.stat().st_size for f in files) if files else 0
+        self._maybe_reconcile_in_background()
+        total_size = self.backend.total_bytes()
 
         return {
             'enabled': self.enabled,
             'hits': self._stats['hits'],
             'misses': self._stats['misses'],
+            'tiers': {
+                'memory': self.memory.stats(),
+                'disk': {
+                    'hits': self._stats['disk_hits'],
+                    'misses': self._stats['disk_misses'],
+                },
+            },
             'sets': self._stats['sets'],
             'deletes': self._stats['deletes'],
             'expired': self._stats['expired'],
+            'namespaces': self.namespace_stats(),
+            'compression': self.compressor.stats(),
+            'single_flight': self.single_flight.stats(),
+            'negative': {
+                'hits': self._stats['negative_hits'],
+                'sets': self._stats['negative_sets'],
+            },
+            'stale_while_revalidate': {
+                'stale_hits': self._stats['stale_hits'],
+                'refreshes_started': self._stats['refreshes_started'],
+                'refreshes_completed': self._stats['refreshes_completed'],
+                'refreshes_failed': self._stats['refreshes_failed'],
+                'refreshes_skipped': self._stats['refreshes_skipped'],
+                'refreshes_throttled': self._stats['refreshes_throttled'],
+                'refreshing': len(self._refreshing),
+            },
             'total_requests': total_requests,
             'hit_rate_percent': round(hit_rate, 2),
+            'backend': self.backend.name,
             'cache_dir': str(self.base_dir),
-            'cache_files': len(files),
+            'cache_files': self.backend.entry_count(),
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
+            'last_reconciled_at': self.backend.last_reconciled,
+            'sweeper': {
+                **self._sweep_stats,
+                'running': self._sweeper is not None and self._sweeper.is_alive(),
+                'indexed_entries': len(self.expiry_index),
+            },
         }
 
+    def namespace_stats(self) -> Dict[str, Dict]:
+        """
+        Get per-domain statistics.
+
+        Returns:
+            Dictionary mapping each namespace ("default" for un-namespaced
+            keys) to its hits, misses, negative hits, hit rate, sets, quota
+            evictions, and current entries/bytes on disk and in memory
+        """
+        memory = self.memory.namespace_stats()
+        on_disk = self.backend.namespace_totals()
+        names = set(self._namespace_stats)
+        names.update(ns or DEFAULT_NAMESPACE for ns in on_disk)
+        names.update(ns or DEFAULT_NAMESPACE for ns in memory)
+
+        result = {}
+        for name in sorted(names):
+            namespace = None if name == DEFAULT_NAMESPACE else name
+            counts = self._namespace_stats.get(name, {})
+            hits = counts.get('hits', 0)
+            misses = counts.get('misses', 0)
+            total = hits + misses
+            entries, size = on_disk.get(namespace, (0, 0))
+            in_memory = memory.get(namespace, {})
+            max_entries, max_bytes = self.quotas.get(name, (None, None))
+            result[name] = {
+                'hits': hits,
+                'misses': misses,
+                'negative_hits': counts.get('negative_hits', 0),
+                'hit_rate_percent': round(hits / total * 100, 2) if total > 0 else 0,
+                'sets': counts.get('sets', 0),
+                'evictions': counts.get('evictions', 0),
+                'entries': entries,
+                'bytes': size,
+                'memory_entries': in_memory.get('entries', 0),
+                'memory_bytes': in_memory.get('bytes', 0),
+                'max_entries': max_entries,
+                'max_bytes': max_bytes,
+            }
+        return result
+
     def get_stats(self) -> Dict:
         """
         Backward compatible alias for stats().
@@ -422,6 +1597,31 @@ class CacheService:
             "cache_dir": stats_data['cache_dir'],
         }
 
+    def get_stale_ttls_for_domain(self, domain: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the stale-while-revalidate (soft, hard) TTL pair for a domain.
+
+        Args:
+            domain: Domain name (rideshare, restaurants, etc.)
+
+        Returns:
+            (soft_ttl, hard_ttl) in seconds, or None if the domain does not
+            serve stale entries
+        """
+        return self.stale_ttls.get(domain)
+
+    def get_negative_ttl_for_domain(self, domain: Optional[str]) -> int:
+        """
+        Get the TTL for negative entries in a domain.
+
+        Args:
+            domain: Domain name (rideshare, restaurants, etc.)
+
+        Returns:
+            TTL in seconds (60 for domains without a configured value)
+        """
+        return self.DEFAULT_NEGATIVE_TTLS.get(domain, 60)
+
     def get_ttl_for_domain(self, domain: str) -> int:
         """
         Get default TTL for a domain.
@@ -436,14 +1636,17 @@ class CacheService:
 
 
 # Convenience function for creating cache service
-def create_cache_service(enabled: bool = True) -> CacheService:
+def create_cache_service(enabled: bool = True, backend: str = 'file') -> CacheService:
     """
     Create a cache service instance.
 
     Args:
         enabled: Whether caching is enabled
+        backend: Backend spec for create_backend() ('file', 'sqlite',
+            'redis://...', ...)
 
     Returns:
         CacheService instance
     """
-    return CacheService(enabled=enabled)
+    base_dir = "data/cache"
+    return CacheService(base_dir=base_dir, enabled=enabled, backend=create_backend(backend, base_dir))
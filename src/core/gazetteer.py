@@ -0,0 +1,241 @@
+"""
+Offline gazetteer for frequently requested places.
+
+Most lookups name the same few hundred landmarks, and each cold Nominatim
+lookup costs a network round trip at 1 request/second. The gazetteer
+answers those from a bundled data file (src/core/data/nyc_gazetteer.json)
+instead:
+
+- Forward lookups use a dictionary of names and aliases in canonical form
+  (see location_normalizer); a sorted key list backs prefix suggestions
+  ("Grand Centr" -> Grand Central Terminal). Only exact names and aliases
+  resolve a location: a prefix such as "Newark" or "Washington" would
+  silently pick the wrong place
+- Reverse lookups (nearest place to a coordinate) use a 2-d tree over the
+  places' positions projected onto a local flat plane
+"""
+
+import json
+import math
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .location_normalizer import normalize_location
+
+# Bundled landmark data
+DEFAULT_GAZETTEER_PATH = Path(__file__).parent / "data" / "nyc_gazetteer.json"
+
+# Kilometres per degree of latitude
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+@dataclass(frozen=True)
+class Place:
+    """A named place with coordinates."""
+    name: str
+    lat: float
+    lon: float
+    address: str
+    aliases: Tuple[str, ...] = field(default=())
+
+    def as_result(self) -> Tuple[float, float, str]:
+        """Get the place as a geocoding result (latitude, longitude, formatted_address)."""
+        return self.lat, self.lon, self.address
+
+
+class _Node:
+    """A k-d tree node splitting on x (axis 0) or y (axis 1)."""
+
+    __slots__ = ('point', 'place', 'axis', 'left', 'right')
+
+    def __init__(self, point: Tuple[float, float], place: Place, axis: int,
+                 left: Optional['_Node'], right: Optional['_Node']):
+        self.point = point
+        self.place = place
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+class Gazetteer:
+    """
+    In-memory place index for forward and reverse lookups.
+
+    Usage:
+        gazetteer = Gazetteer.from_file()
+
+        place = gazetteer.lookup("times square")   # Exact name or alias
+        places = gazetteer.suggest("grand centr")   # All prefix matches
+
+        place, km = gazetteer.nearest(40.7580, -73.9855)
+    """
+
+    def __init__(self, places: Iterable[Place]):
+        """
+        Build the indexes.
+
+        Args:
+            places: Places to index
+        """
+        self.places: List[Place] = list(places)
+
+        # Canonical name or alias -> place (the first place listed wins)
+        self._names: Dict[str, Place] = {}
+        for place in self.places:
+            for name in (place.name, *place.aliases):
+                self._names.setdefault(normalize_location(name), place)
+
+        # Sorted keys for prefix search
+        self._keys: List[str] = sorted(self._names)
+
+        # Positions are projected to km on a plane tangent at the mean
+        # latitude; across a city the distortion is negligible
+        mean_lat = sum(place.lat for place in self.places) / len(self.places) if self.places else 0.0
+        self._x_scale = KM_PER_DEGREE * math.cos(math.radians(mean_lat))
+        self._tree = self._build([(self._project(p.lat, p.lon), p) for p in self.places], 0)
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None, **kwargs) -> 'Gazetteer':
+        """
+        Load a gazetteer data file.
+
+        Args:
+            path: JSON file with a "places" list of {name, lat, lon, address,
+                aliases} (default: the bundled NYC landmarks)
+            **kwargs: Passed to Gazetteer()
+
+        Returns:
+            Gazetteer instance
+        """
+        with open(path or DEFAULT_GAZETTEER_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        places = [
+            Place(
+                name=item['name'],
+                lat=float(item['lat']),
+                lon=float(item['lon']),
+                address=item.get('address', item['name']),
+                aliases=tuple(item.get('aliases', ()))
+            )
+            for item in data['places']
+        ]
+        return cls(places, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _project(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Project a coordinate to (x, y) in km."""
+        return lon * self._x_scale, lat * KM_PER_DEGREE
+
+    def _build(self, items: List[Tuple[Tuple[float, float], Place]], axis: int) -> Optional[_Node]:
+        """Build a balanced k-d tree by splitting at the median."""
+        if not items:
+            return None
+        items.sort(key=lambda item: item[0][axis])
+        middle = len(items) // 2
+        point, place = items[middle]
+        return _Node(
+            point, place, axis,
+            self._build(items[:middle], 1 - axis),
+            self._build(items[middle + 1:], 1 - axis)
+        )
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """
+        Find a place by exact name or alias (after normalization).
+
+        Prefixes are not resolved here; use suggest() for those.
+
+        Args:
+            name: Place name as typed
+
+        Returns:
+            The place, or None if the name is not a known name or alias
+        """
+        return self._names.get(normalize_location(name))
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Place]:
+        """
+        Find places whose name or alias starts with a prefix.
+
+        Args:
+            prefix: Typed prefix
+            limit: Maximum number of places
+
+        Returns:
+            Distinct places, in key order
+        """
+        return self._prefix_matches(normalize_location(prefix), limit)
+
+    def _prefix_matches(self, key: str, limit: int) -> List[Place]:
+        """Distinct places with a key starting with key (up to limit)."""
+        matches: List[Place] = []
+        index = bisect_left(self._keys, key)
+        while index < len(self._keys) and self._keys[index].startswith(key) and len(matches) < limit:
+            place = self._names[self._keys[index]]
+            if place not in matches:
+                matches.append(place)
+            index += 1
+        return matches
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        max_distance_km: Optional[float] = None
+    ) -> Optional[Tuple[Place, float]]:
+        """
+        Find the place closest to a coordinate.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            max_distance_km: Ignore places further away than this
+
+        Returns:
+            Tuple of (place, distance in km), or None if no place is in range
+        """
+        if self._tree is None:
+            return None
+
+        target = self._project(lat, lon)
+        best: List = [None, math.inf if max_distance_km is None else max_distance_km ** 2]
+
+        def search(node: Optional[_Node]):
+            if node is None:
+                return
+            dx = node.point[0] - target[0]
+            dy = node.point[1] - target[1]
+            distance = dx * dx + dy * dy
+            if distance <= best[1]:
+                best[0], best[1] = node.place, distance
+
+            offset = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if offset < 0 else (node.right, node.left)
+            search(near)
+            if offset * offset <= best[1]:
+                search(far)
+
+        search(self._tree)
+        if best[0] is None:
+            return None
+        place = best[0]
+        return place, haversine_km(lat, lon, place.lat, place.lon)
+
+
+@lru_cache(maxsize=None)
+def default_gazetteer() -> Gazetteer:
+    """Get the bundled gazetteer (loaded once per process)."""
+    return Gazetteer.from_file()
@@ -1,8 +1,45 @@
 """Shared geocoding service for converting location names to coordinates."""
 
+import contextvars
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 import requests
-from functools import lru_cache
-from typing import Tuple
+
+from .gazetteer import Gazetteer
+from .location_normalizer import LocationNormalizer, normalize_location
+from .single_flight import SingleFlight
+
+
+class LocationNotFoundError(ValueError):
+    """Raised when the geocoder has no match for a location (as opposed to an API error)."""
+    pass
+
+
+# Prefix of geocoding cache keys (followed by the canonical location name)
+CACHE_KEY_PREFIX = "geocode:"
+
+
+def geocode_cache_key(location: str) -> str:
+    """Cache key for a location name (canonical form, see location_normalizer)."""
+    return CACHE_KEY_PREFIX + normalize_location(location)
+
+
+@dataclass
+class GeocodeResult:
+    """Outcome of geocoding one location in a batch."""
+    location: str
+    coordinates: Optional[Tuple[float, float, str]] = None  # (latitude, longitude, formatted_address)
+    error: Optional[Exception] = None  # LocationNotFoundError, ValueError, TimeoutError...
+
+    @property
+    def ok(self) -> bool:
+        """Whether the location was geocoded."""
+        return self.error is None
 
 
 class GeocodingService:
@@ -10,26 +47,95 @@ class GeocodingService:
     Geocoding service using Nominatim (OpenStreetMap) API.
 
     Converts human-readable location names into geographic coordinates.
-    Results are cached to minimize API calls and improve performance.
+
+    With a Gazetteer, well-known places (e.g. NYC landmarks) are resolved
+    locally and never reach the network; reverse_geocode() uses it too.
+
+    Names are normalized and alias-resolved first (see LocationNormalizer),
+    so "Times Square, NYC", "times square nyc" and "Times Sq" share one
+    cache entry and one API call.
+
+    Other results are cached in two tiers:
+    - An in-process LRU of decoded results, so repeat lookups cost a dict
+      access (share one GeocodingService between handlers)
+    - An optional CacheService ('geocoding' domain, 24h TTL by default),
+      which persists results across restarts and, with a shared backend,
+      between worker processes
+
+    Unknown places are cached as negative entries for the domain's negative
+    TTL. Concurrent lookups of the same new place make one API call, and
+    with a RateLimiter every call waits for the 'nominatim' bucket.
+    geocode_many() resolves a batch with one cache read and paced,
+    parallel API calls for the rest.
 
     Example:
-        geocoder = GeocodingService()
+        geocoder = GeocodingService(cache=CacheService(), gazetteer=default_gazetteer())
         lat, lon, name = geocoder.geocode("Times Square")
-        # Returns: (40.758, -73.985, "Times Square, New York, USA")
+        # Returns: (40.758, -73.9855, "Times Square, Manhattan, New York, NY 10036, USA")
     """
 
-    def __init__(self):
+    DOMAIN = 'geocoding'
+
+    # Rate limit bucket charged for each Nominatim call
+    API_NAME = 'nominatim'
+
+    def __init__(
+        self,
+        cache: Optional[Any] = None,
+        memory_max_entries: int = 1000,
+        ttl: Optional[int] = None,
+        gazetteer: Optional[Gazetteer] = None,
+        rate_limiter: Optional[Any] = None,
+        normalizer: Optional[LocationNormalizer] = None
+    ):
         """
         Initialize the geocoding service.
 
         Nominatim is free and doesn't require an API key.
+
+        Args:
+            cache: Optional CacheService for persistent, shared results
+            memory_max_entries: Entry cap for the in-process tier
+            ttl: Seconds a result stays valid (default: the cache's
+                'geocoding' TTL, else 24 hours)
+            gazetteer: Optional offline index consulted before the caches
+                and the network
+            rate_limiter: Optional RateLimiter pacing API calls (and told
+                about throttled responses)
+            normalizer: Canonical names and learned aliases for cache keys
+                (default: LocationNormalizer() without a persistent table)
         """
         self.base_url = "https://nominatim.openstreetmap.org/search"
         self.headers = {
             "User-Agent": "TouristCompanionApp/1.0"  # Required by Nominatim
         }
 
-    @lru_cache(maxsize=1000)
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.rate_limiter = rate_limiter
+        self.normalizer = normalizer if normalizer is not None else LocationNormalizer()
+        if ttl is None:
+            ttl = cache.get_ttl_for_domain(self.DOMAIN) if cache is not None else 86400
+        self.ttl = ttl
+
+        # In-process tier: cache key -> (result, expires_at), oldest first
+        self.memory_max_entries = memory_max_entries
+        self._memory: "OrderedDict[str, Tuple[Tuple[float, float, str], float]]" = OrderedDict()
+        self._memory_lock = Lock()
+
+        # One API call per new place, however many requests ask at once
+        self.single_flight = SingleFlight()
+
+        # Statistics
+        self._stats = {
+            'gazetteer_hits': 0,
+            'memory_hits': 0,
+            'cache_hits': 0,
+            'negative_hits': 0,
+            'api_calls': 0,
+            'not_found': 0,
+        }
+
     def geocode(self, location: str) -> Tuple[float, float, str]:
         """
         Convert a location name to coordinates.
@@ -41,12 +147,216 @@ class GeocodingService:
             Tuple of (latitude, longitude, formatted_address)
 
         Raises:
-            ValueError: If location cannot be found
+            LocationNotFoundError: If location cannot be found (possibly cached)
+            ValueError: If the geocoding API fails
+            TimeoutError: If the rate limiter cannot grant a call in time
 
         Example:
             lat, lon, name = geocoder.geocode("Central Park")
         """
-        return self._geocode_nominatim(location)
+        cache_key = self.cache_key(location)
+
+        result = self._resolve_local(location, cache_key)
+        if result is not None:
+            return result
+
+        return self.single_flight.do(cache_key, lambda: self._load(location, cache_key), domain=self.DOMAIN)
+
+    def geocode_many(self, locations: Sequence[str], max_workers: int = 4) -> List[GeocodeResult]:
+        """
+        Geocode a batch of locations.
+
+        Spellings that share a cache key are looked up once. Local hits
+        (gazetteer, memory tier) are served first, the rest of the cache is
+        read in one get_many() call, and what is left goes to the API from
+        up to max_workers threads, each call paced by the rate limiter.
+
+        Args:
+            locations: Location names
+            max_workers: Maximum concurrent API calls
+
+        Returns:
+            One GeocodeResult per location, in input order; failures are
+            reported in each result's error rather than raised
+        """
+        # First spelling seen for each distinct key
+        cache_keys = [self.cache_key(location) for location in locations]
+        unique: Dict[str, str] = {}
+        for location, cache_key in zip(locations, cache_keys):
+            unique.setdefault(cache_key, location)
+
+        outcomes: Dict[str, Tuple[Optional[Tuple[float, float, str]], Optional[Exception]]] = {}
+        pending = []
+        for cache_key, location in unique.items():
+            result = self._resolve_local(location, cache_key)
+            if result is not None:
+                outcomes[cache_key] = (result, None)
+            else:
+                pending.append(cache_key)
+
+        if self.cache is not None and pending:
+            negatives: Dict[str, str] = {}
+            cached = self.cache.get_many(pending, domain=self.DOMAIN, negatives=negatives)
+            for cache_key in pending:
+                if cache_key in negatives:
+                    self._stats['negative_hits'] += 1
+                    outcomes[cache_key] = (None, LocationNotFoundError(negatives[cache_key]))
+                elif cache_key in cached:
+                    self._stats['cache_hits'] += 1
+                    result = tuple(cached[cache_key])
+                    self._memory_put(cache_key, result)
+                    outcomes[cache_key] = (result, None)
+            pending = [cache_key for cache_key in pending if cache_key not in outcomes]
+
+        def fetch(cache_key: str):
+            location = unique[cache_key]
+            try:
+                result = self.single_flight.do(
+                    cache_key, lambda: self._fetch(location, cache_key), domain=self.DOMAIN
+                )
+                return cache_key, (result, None)
+            except (ValueError, TimeoutError) as e:
+                return cache_key, (None, e)
+
+        if len(pending) == 1 or max_workers <= 1:
+            outcomes.update(fetch(cache_key) for cache_key in pending)
+        elif pending:
+            # Workers run in copies of the caller's context, so API calls are
+            # charged to the caller's priority_lane()
+            context = contextvars.copy_context()
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+                outcomes.update(pool.map(lambda cache_key: context.copy().run(fetch, cache_key), pending))
+
+        return [
+            GeocodeResult(location, *outcomes[cache_key])
+            for location, cache_key in zip(locations, cache_keys)
+        ]
+
+    def cache_key(self, location: str) -> str:
+        """Cache key for a location (canonical form, or its learned alias target)."""
+        return CACHE_KEY_PREFIX + self.normalizer.resolve(location)
+
+    def _resolve_local(self, location: str, cache_key: str) -> Optional[Tuple[float, float, str]]:
+        """Answer from the gazetteer or the memory tier, without I/O."""
+        if self.gazetteer is not None:
+            place = self.gazetteer.lookup(location)
+            if place is not None:
+                self._stats['gazetteer_hits'] += 1
+                return place.as_result()
+
+        result = self._memory_get(cache_key)
+        if result is not None:
+            self._stats['memory_hits'] += 1
+        return result
+
+    def reverse_geocode(
+        self,
+        latitude: float,
+        longitude: float,
+        max_distance_km: float = 0.5
+    ) -> Tuple[float, float, str]:
+        """
+        Find the known place nearest to a coordinate (offline, gazetteer only).
+
+        Args:
+            latitude: Latitude
+            longitude: Longitude
+            max_distance_km: Furthest a place may be to count
+
+        Returns:
+            Tuple of (latitude, longitude, formatted_address) of the place
+
+        Raises:
+            LocationNotFoundError: If there is no gazetteer or no place in range
+        """
+        match = self.gazetteer.nearest(latitude, longitude, max_distance_km) if self.gazetteer is not None else None
+        if match is None:
+            raise LocationNotFoundError(f"No known place within {max_distance_km} km of {latitude}, {longitude}")
+        return match[0].as_result()
+
+    def _load(self, location: str, cache_key: str) -> Tuple[float, float, str]:
+        """Look a location up in the persistent cache, then the API, filling both tiers."""
+        if self.cache is not None:
+            negatives: Dict[str, str] = {}
+            cached = self.cache.get_many([cache_key], domain=self.DOMAIN, negatives=negatives)
+            if cache_key in negatives:
+                self._stats['negative_hits'] += 1
+                raise LocationNotFoundError(negatives[cache_key])
+            if cache_key in cached:
+                self._stats['cache_hits'] += 1
+                result = tuple(cached[cache_key])
+                self._memory_put(cache_key, result)
+                return result
+
+        return self._fetch(location, cache_key)
+
+    def _fetch(self, location: str, cache_key: str) -> Tuple[float, float, str]:
+        """Call the API (paced by the rate limiter), filling both tiers."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait_if_needed(self.API_NAME)
+
+        self._stats['api_calls'] += 1
+        try:
+            result = self._geocode_nominatim(location)
+        except LocationNotFoundError as e:
+            self._stats['not_found'] += 1
+            if self.cache is not None:
+                self.cache.set_negative(cache_key, str(e), domain=self.DOMAIN)
+            raise
+
+        if self.cache is not None:
+            self.cache.set(cache_key, list(result), ttl=self.ttl, domain=self.DOMAIN)
+        self._memory_put(cache_key, result)
+
+        # Later spellings with the same result share this entry
+        self.normalizer.learn_result(cache_key[len(CACHE_KEY_PREFIX):], result)
+        return result
+
+    def _memory_get(self, cache_key: str) -> Optional[Tuple[float, float, str]]:
+        """Get a live result from the in-process tier."""
+        with self._memory_lock:
+            record = self._memory.get(cache_key)
+            if record is None:
+                return None
+            result, expires_at = record
+            if time.time() > expires_at:
+                del self._memory[cache_key]
+                return None
+            self._memory.move_to_end(cache_key)
+            return result
+
+    def _memory_put(self, cache_key: str, result: Tuple[float, float, str]):
+        """Store a result in the in-process tier, evicting the least recently used."""
+        if self.memory_max_entries <= 0:
+            return
+        with self._memory_lock:
+            self._memory[cache_key] = (result, time.time() + self.ttl)
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+    def clear_memory(self):
+        """Drop the in-process tier (the persistent cache is untouched)."""
+        with self._memory_lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict:
+        """Get lookup statistics."""
+        with self._memory_lock:
+            memory_entries = len(self._memory)
+        lookups = sum(
+            self._stats[k] for k in ('gazetteer_hits', 'memory_hits', 'cache_hits', 'negative_hits', 'api_calls')
+        )
+        hits = lookups - self._stats['api_calls']
+        return {
+            **self._stats,
+            'memory_entries': memory_entries,
+            'lookups': lookups,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'persistent': self.cache is not None,
+            'gazetteer_places': len(self.gazetteer) if self.gazetteer is not None else 0,
+            'normalizer': self.normalizer.stats(),
+        }
 
     def _geocode_nominatim(self, location: str) -> Tuple[float, float, str]:
         """
@@ -59,7 +369,8 @@ class GeocodingService:
             Tuple of (latitude, longitude, formatted_address)
 
         Raises:
-            ValueError: If location not found or API error occurs
+            LocationNotFoundError: If location not found
+            ValueError: If an API error occurs
         """
         params = {
             "q": location,
@@ -74,12 +385,14 @@ class GeocodingService:
                 headers=self.headers,
                 timeout=10
             )
+            if self.rate_limiter is not None:
+                self.rate_limiter.report_response(self.API_NAME, response.status_code, response.headers)
             response.raise_for_status()
 
             results = response.json()
 
             if not results or len(results) == 0:
-                raise ValueError(f"Location not found: {location}")
+                raise LocationNotFoundError(f"Location not found: {location}")
 
             result = results[0]
             latitude = float(result["lat"])
@@ -88,6 +401,8 @@ class GeocodingService:
 
             return latitude, longitude, formatted_address
 
+        except LocationNotFoundError:
+            raise
         except requests.exceptions.Timeout:
             raise ValueError(f"Geocoding request timed out for: {location}")
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,270 @@
+"""
+Location name normalization and alias resolution for geocoding.
+
+"Times Square, NYC", "times square nyc" and "Times Sq" name one place but
+used to be cached (and geocoded) separately. Normalization maps them onto
+one canonical form before the cache key is built:
+
+1. Unicode folding: NFKD, accents dropped, case folded
+2. Punctuation: '&' becomes 'and', apostrophes vanish, the rest are spaces
+3. Abbreviations expanded ("sq" -> "square", "ave" -> "avenue"; "st" is
+   "saint" as the first word and "street" elsewhere)
+4. Trailing region qualifiers dropped ("..., New York, NY, USA"), unless
+   nothing else is left
+
+Spellings normalization cannot relate ("JFK" and "Kennedy Airport") are
+handled by a learned alias table: when a newly geocoded name resolves to a
+place already cached under another name, the new name becomes an alias of
+the old one, and later lookups share that entry.
+"""
+
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+# Abbreviation -> expansion, applied per word
+DEFAULT_ABBREVIATIONS = {
+    'sq': 'square',
+    'ave': 'avenue',
+    'av': 'avenue',
+    'blvd': 'boulevard',
+    'pkwy': 'parkway',
+    'hwy': 'highway',
+    'rd': 'road',
+    'dr': 'drive',
+    'pl': 'place',
+    'ln': 'lane',
+    'ctr': 'center',
+    'cntr': 'center',
+    'ter': 'terminal',
+    'term': 'terminal',
+    'sta': 'station',
+    'stn': 'station',
+    'pk': 'park',
+    'mt': 'mount',
+    'ft': 'fort',
+    'bldg': 'building',
+    'hosp': 'hospital',
+    'univ': 'university',
+    'intl': 'international',
+    'natl': 'national',
+    'arpt': 'airport',
+    'mus': 'museum',
+    'bklyn': 'brooklyn',
+}
+
+# Single-letter directions, expanded before a numbered street ("W 42nd St")
+DIRECTIONS = {'n': 'north', 's': 'south', 'e': 'east', 'w': 'west'}
+
+# Trailing qualifiers naming the region the app serves
+DEFAULT_REGION_SUFFIXES = (
+    'new york city',
+    'new york',
+    'nyc',
+    'ny',
+    'united states',
+    'usa',
+    'us',
+)
+
+_NOT_WORD = re.compile(r"[^\w\s]")
+
+
+def _fold(text: str) -> str:
+    """Case-fold and strip accents ("Café" -> "cafe")."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class LocationNormalizer:
+    """
+    Canonical forms for location names, with a learned alias table.
+
+    Usage:
+        normalizer = LocationNormalizer(alias_path="data/geocode_aliases.json")
+
+        normalizer.normalize("Times Sq, NYC")      # "times square"
+        normalizer.resolve("Kennedy Airport")      # Alias target, if learned
+
+        # After geocoding a new name, relate it to names with the same result
+        normalizer.learn_result("kennedy airport", (40.64, -73.78, "JFK Airport, Queens"))
+    """
+
+    def __init__(
+        self,
+        abbreviations: Optional[Dict[str, str]] = None,
+        region_suffixes: Optional[Iterable[str]] = None,
+        aliases: Optional[Dict[str, str]] = None,
+        alias_path: Optional[str] = None,
+        max_results: int = 10000
+    ):
+        """
+        Initialize normalizer.
+
+        Args:
+            abbreviations: Word expansions (default: DEFAULT_ABBREVIATIONS)
+            region_suffixes: Trailing qualifiers to drop
+                (default: DEFAULT_REGION_SUFFIXES)
+            aliases: Initial canonical name -> canonical target aliases
+            alias_path: Optional JSON file the alias table is loaded from
+                and saved to as aliases are learned
+            max_results: Most geocoding results remembered for learning
+        """
+        self.abbreviations = dict(DEFAULT_ABBREVIATIONS if abbreviations is None else abbreviations)
+        suffixes = DEFAULT_REGION_SUFFIXES if region_suffixes is None else region_suffixes
+        # Longest first, so "new york city" is tried before "new york"
+        self.region_suffixes: Tuple[Tuple[str, ...], ...] = tuple(
+            sorted((tuple(suffix.split()) for suffix in suffixes), key=len, reverse=True)
+        )
+        self.alias_path = Path(alias_path) if alias_path else None
+        self.max_results = max_results
+        self.lock = Lock()
+
+        self.aliases: Dict[str, str] = {}
+        if self.alias_path is not None and self.alias_path.exists():
+            try:
+                self.aliases.update(json.loads(self.alias_path.read_text()))
+            except (OSError, ValueError):
+                pass  # Unreadable table: start over, it is only an optimization
+        self.aliases.update(aliases or {})
+
+        # Result identity -> first canonical name it was cached under
+        self._results: Dict[Tuple, str] = {}
+
+        # Statistics
+        self._stats = {
+            'lookups': 0,
+            'rewritten': 0,
+            'alias_hits': 0,
+            'aliases_learned': 0,
+        }
+
+    def normalize(self, text: str) -> str:
+        """
+        Get the canonical form of a location name (without aliases).
+
+        Args:
+            text: Location name as typed
+
+        Returns:
+            Canonical name (lowercase words separated by single spaces)
+        """
+        text = _fold(text).replace('&', ' and ').replace("'", '').replace('’', '')
+        words = _NOT_WORD.sub(' ', text).split()
+
+        expanded = []
+        for index, word in enumerate(words):
+            if word == 'st':
+                word = 'saint' if index == 0 else 'street'
+            elif word in DIRECTIONS and index + 1 < len(words) and words[index + 1][:1].isdigit():
+                word = DIRECTIONS[word]
+            else:
+                word = self.abbreviations.get(word, word)
+            expanded.extend(word.split())
+
+        return ' '.join(self._strip_region(expanded))
+
+    def _strip_region(self, words: Sequence[str]) -> Sequence[str]:
+        """Drop trailing region qualifiers, keeping at least one other word."""
+        stripped = True
+        while stripped:
+            stripped = False
+            for suffix in self.region_suffixes:
+                if len(words) > len(suffix) and tuple(words[-len(suffix):]) == suffix:
+                    words = words[:-len(suffix)]
+                    stripped = True
+                    break
+        return words
+
+    def resolve(self, text: str) -> str:
+        """
+        Get the name a location is cached under (canonical form, then aliases).
+
+        Args:
+            text: Location name as typed
+
+        Returns:
+            Canonical name, replaced by its alias target if one was learned
+        """
+        canonical = self.normalize(text)
+        with self.lock:
+            self._stats['lookups'] += 1
+            if canonical != ' '.join(text.lower().split()):
+                self._stats['rewritten'] += 1
+            target = self.aliases.get(canonical)
+            if target is not None:
+                self._stats['alias_hits'] += 1
+                return target
+        return canonical
+
+    def learn_result(self, canonical: str, result: Tuple[float, float, str]) -> Optional[str]:
+        """
+        Relate a newly geocoded name to an earlier name with the same result.
+
+        Args:
+            canonical: Name the result was fetched for (from resolve())
+            result: (latitude, longitude, formatted_address)
+
+        Returns:
+            The alias target if canonical became an alias, else None
+        """
+        latitude, longitude, address = result
+        identity = (round(latitude, 4), round(longitude, 4), address)
+
+        with self.lock:
+            target = self._results.get(identity)
+            if target is None:
+                if len(self._results) < self.max_results:
+                    self._results[identity] = canonical
+                return None
+            if target == canonical or canonical in self.aliases:
+                return None
+
+            self.aliases[canonical] = target
+            self._stats['aliases_learned'] += 1
+            self._save()
+            return target
+
+    def _save(self):
+        """Write the alias table atomically (caller holds lock)."""
+        if self.alias_path is None:
+            return
+        try:
+            self.alias_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.alias_path.parent, prefix='.tmp-')
+        except OSError:
+            return  # Aliases still apply in this process
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.aliases, f, indent=0, sort_keys=True)
+            os.replace(temp_path, self.alias_path)
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        """Get normalization statistics."""
+        with self.lock:
+            return {
+                **self._stats,
+                'aliases': len(self.aliases),
+                'rewrite_rate': round(self._stats['rewritten'] / self._stats['lookups'], 4)
+                if self._stats['lookups'] else 0.0,
+            }
+
+
+# Canonical forms with the default rules and no aliases
+_DEFAULT_NORMALIZER = LocationNormalizer()
+
+
+def normalize_location(text: str) -> str:
+    """Canonical form of a location name with the default rules (no aliases)."""
+    return _DEFAULT_NORMALIZER.normalize(text)
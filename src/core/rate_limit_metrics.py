@@ -0,0 +1,147 @@
+"""
+Rate limiter metrics in the Prometheus text exposition format.
+
+TokenBucket.stats() only has lifetime totals. These metrics are meant to
+be scraped periodically, so the scraper keeps the history: wait-time
+histograms show how long requests queued, and counters show when
+requests started being rejected, timing out or shed.
+
+Metrics (all labelled with api="<name>"):
+- rate_limiter_wait_seconds: histogram of time waited for granted requests
+- rate_limiter_tokens: gauge of tokens currently in the bucket
+- rate_limiter_waiting: gauge of requests queued for tokens
+- rate_limiter_effective_rate: gauge of the refill rate in tokens/second
+- rate_limiter_requests_total: counter of granted requests
+- rate_limiter_rejected_total: counter of non-waiting acquires refused
+- rate_limiter_timeouts_total: counter of waits that hit their timeout
+- rate_limiter_shed_total: counter of shed requests (also lane="<name>")
+- rate_limiter_throttled_total: counter of upstream throttling reports
+- rate_limiter_quota_remaining / rate_limiter_quota_rejected_total: for
+  APIs with a calendar quota
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds of the wait-time histogram buckets, in seconds
+WAIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Content type of render_prometheus() output
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observed values.
+
+    Not locked: the owner records observations under a lock it already
+    holds (TokenBucket records waits under its own lock), so an
+    observation costs a binary search and two additions.
+    """
+
+    def __init__(self, buckets: Sequence[float] = WAIT_BUCKETS):
+        """
+        Initialize histogram.
+
+        Args:
+            buckets: Ascending upper bounds (an implicit +Inf bucket follows)
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        """Record one value."""
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self._sum += value
+
+    def snapshot(self) -> Dict:
+        """
+        Get cumulative bucket counts, sum and count.
+
+        Returns:
+            {'buckets': [(upper_bound, cumulative_count), ...], 'sum', 'count'}
+            with float('inf') as the last bound
+        """
+        cumulative = 0
+        buckets: List[Tuple[float, int]] = []
+        for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {'buckets': buckets, 'sum': self._sum, 'count': cumulative}
+
+
+def _labels(**labels: str) -> str:
+    """Format a label set, escaping values."""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _number(value: float) -> str:
+    """Format a sample value."""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(limiter) -> str:
+    """
+    Render a RateLimiter's metrics in the Prometheus text format.
+
+    Args:
+        limiter: RateLimiter to export
+
+    Returns:
+        Exposition text, newline-terminated
+    """
+    families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def sample(name: str, kind: str, help_text: str, labels: Dict, value: float, suffix: str = ''):
+        family = families.setdefault(name, (kind, help_text, []))
+        family[2].append(f"{name}{suffix}{_labels(**labels)} {_number(value)}")
+
+    for api_name, bucket in sorted(limiter.buckets.items()):
+        metrics = bucket.metrics()
+        api = {'api': api_name}
+
+        histogram = metrics['wait_seconds']
+        for bound, count in histogram['buckets']:
+            sample('rate_limiter_wait_seconds', 'histogram', 'Time granted requests waited for tokens',
+                   {**api, 'le': _number(bound)}, count, '_bucket')
+        sample('rate_limiter_wait_seconds', 'histogram', '', api, histogram['sum'], '_sum')
+        sample('rate_limiter_wait_seconds', 'histogram', '', api, histogram['count'], '_count')
+
+        sample('rate_limiter_tokens', 'gauge', 'Tokens currently in the bucket', api, metrics['tokens'])
+        sample('rate_limiter_waiting', 'gauge', 'Requests queued for tokens', api, metrics['waiting'])
+        sample('rate_limiter_effective_rate', 'gauge', 'Refill rate in tokens per second',
+               api, metrics['effective_rate'])
+        sample('rate_limiter_requests_total', 'counter', 'Requests granted', api, metrics['requests'])
+        sample('rate_limiter_rejected_total', 'counter', 'Non-waiting acquires refused',
+               api, metrics['rejected'])
+        sample('rate_limiter_timeouts_total', 'counter', 'Waits that reached their timeout',
+               api, metrics['timeouts'])
+        for lane, count in sorted(metrics['shed'].items()):
+            sample('rate_limiter_shed_total', 'counter', 'Requests shed to keep tokens for higher lanes',
+                   {**api, 'lane': lane}, count)
+        sample('rate_limiter_throttled_total', 'counter', 'Upstream throttling reports',
+               api, metrics['throttled'])
+
+    for api_name, quota in sorted(limiter.quotas.items()):
+        stats = quota.stats()
+        api = {'api': api_name, 'period': stats['period']}
+        sample('rate_limiter_quota_remaining', 'gauge', 'Requests left in the current quota window',
+               api, stats['remaining'])
+        sample('rate_limiter_quota_rejected_total', 'counter', 'Requests refused by a used-up quota',
+               api, stats['rejected'])
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,365 @@
+"""
+Shared state stores for rate limit buckets.
+
+By default each TokenBucket keeps its tokens in process memory, so every
+worker process gets the full budget. A bucket store keeps the token count
+and last refill time outside the process instead, and refills and takes
+tokens in one atomic step, so all workers draw from one global bucket.
+
+Stores:
+- FileLockBucketStore: a small JSON state file guarded by flock(); shared
+  by every process on one host
+- RedisBucketStore: any client speaking the redis-py API (a Lua script
+  keeps each take atomic on a real server; LocalRedis for development
+  and tests)
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from .cache_backends import LocalRedis
+
+
+def refill(tokens: float, last_refill: float, capacity: float, rate: float, now: float) -> float:
+    """Token count after refilling at rate tokens/second since last_refill (capped)."""
+    return min(capacity, tokens + max(0.0, now - last_refill) * rate)
+
+
+class BucketStore(ABC):
+    """
+    Interface between TokenBucket and shared bucket state.
+
+    Capacity and rate are passed on every call rather than stored, so a
+    bucket's configuration can change without touching the store.
+    Implementations must be safe to call from several threads and processes.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def take(
+        self,
+        bucket: str,
+        tokens: float,
+        capacity: float,
+        rate: float,
+        reserve: float = 0
+    ) -> Tuple[bool, float]:
+        """
+        Refill a bucket, then take tokens if enough are available.
+
+        A bucket the store has not seen starts full.
+
+        Args:
+            bucket: Bucket name
+            tokens: Tokens to take (0 just refills)
+            capacity: Maximum tokens the bucket holds
+            rate: Refill rate in tokens per second
+            reserve: Tokens that must remain after taking
+
+        Returns:
+            Tuple of (acquired, tokens available before taking)
+        """
+
+    def peek(self, bucket: str, capacity: float, rate: float) -> float:
+        """Get a bucket's current token count."""
+        return self.take(bucket, 0, capacity, rate)[1]
+
+    @abstractmethod
+    def give_back(self, bucket: str, tokens: float, capacity: float, rate: float):
+        """Refill a bucket, then return tokens to it (capped at capacity)."""
+
+    @abstractmethod
+    def reset(self, bucket: str):
+        """Refill a bucket to capacity."""
+
+
+class FileLockBucketStore(BucketStore):
+    """
+    Bucket state in a JSON file, updated under an exclusive flock().
+
+    Every process on the host opening the same path shares the buckets.
+    The file holds {bucket: [tokens, last_refill]}. Updates hold the lock
+    on a sidecar <path>.lock file, write the new state to a temp file and
+    commit it with os.replace(), so a crash mid-write leaves the previous
+    state intact rather than resetting every bucket (and calendar quota).
+    """
+
+    name = 'file'
+
+    TEMP_PREFIX = '.tmp-'
+
+    def __init__(self, path: str = 'data/rate_limits.json'):
+        """
+        Initialize store.
+
+        Args:
+            path: State file (created on first use)
+
+        Raises:
+            RuntimeError: If the platform has no fcntl module
+        """
+        if fcntl is None:
+            raise RuntimeError("FileLockBucketStore requires fcntl (POSIX)")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The state file is replaced on every write, so the lock lives in
+        # a file that is never replaced
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+
+    def _read(self) -> Dict[str, list]:
+        """Read the state file (caller holds the lock)."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.loads(f.read() or '{}')
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            return {}  # Only possible if the file was edited by hand
+
+    def _write(self, state: Dict[str, list]):
+        """Replace the state file atomically (caller holds the lock)."""
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(json.dumps(state, separators=(',', ':')))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _locked(self, operation, exclusive: bool = True) -> Any:
+        """Run operation() while holding the store's flock()."""
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                return operation()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update(self, bucket: str, update) -> Any:
+        """Run update(state) on the bucket state and save it, under the file lock."""
+        def operation():
+            state = self._read()
+            result = update(state)
+            self._write(state)
+            return result
+
+        return self._locked(operation)
+
+    def take(
+        self,
+        bucket: str,
+        tokens: float,
+        capacity: float,
+        rate: float,
+        reserve: float = 0
+    ) -> Tuple[bool, float]:
+        """Refill a bucket, then take tokens if enough are available."""
+        def update(state):
+            now = time.time()
+            current, last_refill = state.get(bucket, (capacity, now))
+            available = refill(current, last_refill, capacity, rate, now)
+            acquired = 0 < tokens and tokens + reserve <= available
+            state[bucket] = [available - tokens if acquired else available, now]
+            return acquired, available
+
+        return self._update(bucket, update)
+
+    def peek(self, bucket: str, capacity: float, rate: float) -> float:
+        """Get a bucket's current token count (read-only)."""
+        state = self._locked(self._read, exclusive=False)
+        now = time.time()
+        current, last_refill = state.get(bucket, (capacity, now))
+        return refill(current, last_refill, capacity, rate, now)
+
+    def give_back(self, bucket: str, tokens: float, capacity: float, rate: float):
+        """Refill a bucket, then return tokens to it (capped at capacity)."""
+        def update(state):
+            now = time.time()
+            current, last_refill = state.get(bucket, (capacity, now))
+            state[bucket] = [min(capacity, refill(current, last_refill, capacity, rate, now) + tokens), now]
+
+        self._update(bucket, update)
+
+    def reset(self, bucket: str):
+        """Refill a bucket to capacity."""
+        self._update(bucket, lambda state: state.pop(bucket, None))
+
+
+class RedisBucketStore(BucketStore):
+    """
+    Bucket state in Redis hashes, shared by every process using the server.
+
+    Refill and take run in one Lua script using the server clock, so
+    workers on different hosts agree on both the count and the time.
+    Key layout: <prefix>:<bucket> -> {tokens, ts}.
+    """
+
+    name = 'redis'
+
+    TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local available = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local acquired = 0
+tokens = available
+if requested > 0 and available >= requested + reserve then
+    tokens = available - requested
+    acquired = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+return {acquired, tostring(available)}
+"""
+
+    GIVE_BACK_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local returned = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate + returned)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+return tostring(tokens)
+"""
+
+    def __init__(self, client: Any, prefix: str = 'ratelimit'):
+        """
+        Initialize store.
+
+        Args:
+            client: redis-py compatible client (decode_responses=True), or
+                LocalRedis
+            prefix: Prefix for every Redis key this store uses
+        """
+        self.client = client
+        self.prefix = prefix
+        if isinstance(client, LocalRedis):
+            self._script = self._give_back_script = None
+        else:
+            self._script = client.register_script(self.TAKE_SCRIPT)
+            self._give_back_script = client.register_script(self.GIVE_BACK_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'ratelimit') -> 'RedisBucketStore':
+        """
+        Connect to a Redis server (requires the redis package).
+
+        Args:
+            url: Redis URL, e.g. redis://localhost:6379/0
+            prefix: Prefix for every Redis key this store uses
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The redis package is required for RedisBucketStore.from_url()") from e
+        return cls(redis.Redis.from_url(url, decode_responses=True), prefix=prefix)
+
+    def _key(self, bucket: str) -> str:
+        return f"{self.prefix}:{bucket}"
+
+    def take(
+        self,
+        bucket: str,
+        tokens: float,
+        capacity: float,
+        rate: float,
+        reserve: float = 0
+    ) -> Tuple[bool, float]:
+        """Refill a bucket, then take tokens if enough are available."""
+        key = self._key(bucket)
+        if self._script is not None:
+            acquired, available = self._script(keys=[key], args=[capacity, rate, tokens, reserve])
+            return bool(int(acquired)), float(available)
+
+        # LocalRedis: same steps, made atomic by holding the client's lock
+        with self.client.lock:
+            now = time.time()
+            current = self.client.hget(key, 'tokens')
+            last_refill = self.client.hget(key, 'ts')
+            available = refill(
+                float(current) if current is not None else capacity,
+                float(last_refill) if last_refill is not None else now,
+                capacity, rate, now
+            )
+            acquired = 0 < tokens and tokens + reserve <= available
+            self.client.hset(key, 'tokens', str(available - tokens if acquired else available))
+            self.client.hset(key, 'ts', str(now))
+            return acquired, available
+
+    def give_back(self, bucket: str, tokens: float, capacity: float, rate: float):
+        """Refill a bucket, then return tokens to it (capped at capacity)."""
+        key = self._key(bucket)
+        if self._give_back_script is not None:
+            self._give_back_script(keys=[key], args=[capacity, rate, tokens])
+            return
+
+        # LocalRedis: same steps, made atomic by holding the client's lock
+        with self.client.lock:
+            now = time.time()
+            current = self.client.hget(key, 'tokens')
+            last_refill = self.client.hget(key, 'ts')
+            available = refill(
+                float(current) if current is not None else capacity,
+                float(last_refill) if last_refill is not None else now,
+                capacity, rate, now
+            )
+            self.client.hset(key, 'tokens', str(min(capacity, available + tokens)))
+            self.client.hset(key, 'ts', str(now))
+
+    def reset(self, bucket: str):
+        """Refill a bucket to capacity."""
+        self.client.delete(self._key(bucket))
+
+
+def create_bucket_store(spec: str = 'memory', base_dir: str = 'data') -> Optional[BucketStore]:
+    """
+    Create a bucket store from a short description.
+
+    Args:
+        spec: 'memory' (per-process buckets, no store), 'file',
+            'file:<path>', 'redis://...' or 'local-redis'
+        base_dir: Directory for the default state file
+
+    Returns:
+        BucketStore instance, or None for per-process buckets
+
+    Raises:
+        ValueError: If the spec is not recognised
+    """
+    if spec == 'memory':
+        return None
+    if spec == 'file':
+        return FileLockBucketStore(os.path.join(base_dir, 'rate_limits.json'))
+    if spec.startswith('file:'):
+        return FileLockBucketStore(spec[len('file:'):])
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBucketStore.from_url(spec)
+    if spec == 'local-redis':
+        return RedisBucketStore(LocalRedis())
+    raise ValueError(f"Unknown rate limit store: {spec!r}")
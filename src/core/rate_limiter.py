@@ -1,12 +1,33 @@
 """
 Production-ready rate limiting service using token bucket algorithm.
 Prevents API rate limit violations with automatic backoff.
+
+Buckets adapt to upstream throttling: clients report 429 responses (and
+Retry-After headers) and the bucket cuts its refill rate multiplicatively,
+then recovers it additively while no more throttling is reported (AIMD).
+
+Requests belong to priority lanes (see DEFAULT_LANES and priority_lane()):
+higher lanes are queued ahead of lower ones, and lower lanes leave a reserve
+for higher ones and are shed at once when they would wait too long.
+
+APIs can also have a calendar quota (see CalendarQuota): a fixed number of
+requests per calendar day or month, e.g. a free tier that resets on the 1st.
 """
 
+import asyncio
+import contextvars
 import time
-from typing import Dict, Optional
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Dict, Mapping, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 from dataclasses import dataclass
-from threading import Lock
+from threading import Condition, Lock
+
+from .rate_limit_metrics import Histogram, render_prometheus
+from .rate_limit_stores import BucketStore
 
 
 @dataclass
@@ -22,30 +43,245 @@ class RateLimitConfig:
         return self.max_requests / self.time_window
 
 
+@dataclass
+class PriorityLane:
+    """A class of traffic competing for rate limit tokens."""
+    name: str
+    priority: int                      # Lower numbers are served first
+    reserve: float = 0.0               # Fraction of capacity left for higher lanes
+    max_wait: Optional[float] = None   # Shed instead of waiting longer (None = caller's timeout)
+
+    def reserve_tokens(self, capacity: int) -> int:
+        """Tokens this lane must leave in a bucket of the given capacity."""
+        return int(self.reserve * capacity)
+
+
+# Lanes used by the API: signed-in users, guests and cache warm-up
+DEFAULT_LANES = {
+    'interactive-auth': PriorityLane('interactive-auth', priority=0),
+    'interactive-guest': PriorityLane('interactive-guest', priority=1, reserve=0.1, max_wait=5.0),
+    'background-warmup': PriorityLane('background-warmup', priority=2, reserve=0.2, max_wait=0.0),
+}
+
+# Lane for requests made outside any priority_lane() block
+DEFAULT_LANE = 'interactive-auth'
+
+# Lane of the current thread or asyncio task
+_current_lane: contextvars.ContextVar = contextvars.ContextVar('rate_limit_lane', default=None)
+
+
+@contextmanager
+def priority_lane(name: str):
+    """
+    Charge rate limited calls made in this block to a priority lane.
+
+    Applies to the current thread or asyncio task, so handlers and API
+    clients need not pass the lane down explicitly.
+
+    Usage:
+        with priority_lane('interactive-guest'):
+            results = handler.process(query)
+    """
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    """Get the priority lane of the current thread or asyncio task."""
+    return _current_lane.get() or DEFAULT_LANE
+
+
+class RateLimitShedError(TimeoutError):
+    """Raised when a low-priority request is refused instead of queued."""
+    pass
+
+
+class QuotaExceededError(RateLimitShedError):
+    """Raised when an API's calendar quota is used up until the next window."""
+    pass
+
+
+@dataclass
+class AdaptiveConfig:
+    """How a bucket reacts to reported upstream throttling (AIMD)."""
+    decrease: float = 0.5              # Refill rate multiplier per throttling report
+    min_fraction: float = 0.05         # Floor, as a fraction of the configured rate
+    increase_per_minute: float = 0.1   # Fraction of the configured rate regained per minute
+    cooldown: float = 1.0              # Reports within this many seconds count as one
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Delay in seconds or an HTTP date
+        now: Current time for HTTP dates (default: time.time())
+
+    Returns:
+        Seconds to wait (0 or more), or None if missing or unparseable
+    """
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class _Waiter:
+    """A thread queued in TokenBucket.wait_and_acquire()."""
+
+    def __init__(self, lock: Lock, tokens: int, priority: int):
+        self.condition = Condition(lock)
+        self.tokens = tokens
+        self.priority = priority
+
+    def wake(self):
+        """Wake the waiting thread (caller holds the bucket lock)."""
+        self.condition.notify()
+
+
+class _AsyncWaiter:
+    """A coroutine queued in TokenBucket.wait_and_acquire_async()."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, tokens: int, priority: int):
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.tokens = tokens
+        self.priority = priority
+
+    def wake(self):
+        """Wake the waiting coroutine; safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+
+async def _off_loop(fn: Callable, *args, undo: Optional[Callable] = None):
+    """
+    Run fn(*args) in a worker thread and await its result.
+
+    Bucket operations take a threading lock and may do BucketStore I/O
+    (a file lock, a Redis round trip); run on the event loop, either would
+    stall every coroutine until it finished.
+
+    fn cannot be interrupted once started: if the caller is cancelled, fn
+    still runs to completion, and undo(result) is then called in a worker
+    thread (e.g. to give back tokens fn granted).
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        if undo is not None:
+            def done(finished: asyncio.Future):
+                if not finished.cancelled() and finished.exception() is None:
+                    finished.get_loop().run_in_executor(None, undo, finished.result())
+            future.add_done_callback(done)
+        raise
+
+
 class TokenBucket:
     """
     Token bucket implementation for rate limiting.
 
     The bucket starts full and refills at a constant rate.
     Each request consumes one token. If no tokens available, request must wait.
+
+    Waiting requests queue up first-come, first-served. Only the head of the
+    queue watches the clock: it sleeps exactly until its tokens will have
+    accrued, and when it leaves (acquired or timed out) it wakes the next
+    waiter. While anyone is queued, acquire() does not jump the queue.
+
+    Threads (wait_and_acquire()) and coroutines (wait_and_acquire_async())
+    share the same tokens and the same queue. Coroutines do their locked
+    work (and any BucketStore I/O) in worker threads, never on the event
+    loop.
+
+    Each request belongs to a PriorityLane. A waiter queues behind every
+    waiter of its own or a higher lane, i.e. ahead of lower lanes. A lane
+    with a reserve is only granted tokens while that many would remain,
+    and a lane with max_wait is shed (refused at once) when its estimated
+    wait exceeds it, and never waits longer than that.
+
+    With a BucketStore the tokens live outside the process and every worker
+    using the store draws from one bucket; the waiter queue (and so FIFO
+    order) is still per process.
+
+    report_throttled() drains the bucket, cuts the refill rate by the
+    adaptive decrease factor and optionally pauses the bucket for a
+    Retry-After delay; the rate then climbs back linearly to the configured
+    rate. The adaptive state is per process, also with a BucketStore.
     """
 
-    def __init__(self, config: RateLimitConfig):
+    def __init__(
+        self,
+        config: RateLimitConfig,
+        store: Optional[BucketStore] = None,
+        adaptive: Optional[AdaptiveConfig] = None
+    ):
         """
         Initialize token bucket.
 
         Args:
             config: Rate limit configuration
+            store: Optional shared state store (default: tokens kept in
+                this process)
+            adaptive: Reaction to reported throttling
+                (default: AdaptiveConfig())
         """
         self.config = config
+        self.store = store
+        self.adaptive = adaptive or AdaptiveConfig()
         self.tokens = float(config.max_requests)  # Start with full bucket
         self.last_refill = time.time()
         self.lock = Lock()  # Thread-safe operations
 
+        # Threads and coroutines waiting for tokens, oldest first
+        self._waiters: Deque[Union[_Waiter, _AsyncWaiter]] = deque()
+
+        # Adaptive state: fraction of the configured refill rate in effect,
+        # and when upstream asked us to hold off until
+        self._rate_fraction = 1.0
+        self._rate_updated = time.time()
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+
         # Statistics
         self._total_requests = 0
         self._total_waits = 0
         self._total_wait_time = 0.0
+        self._total_throttled = 0
+        self._total_rejected = 0
+        self._total_timeouts = 0
+        self._shed: Dict[str, int] = {}
+        self._wait_histogram = Histogram()
+
+    def _rate(self) -> float:
+        """Effective refill rate in tokens/second, after recovery (caller holds lock)."""
+        now = time.time()
+        if self._rate_fraction < 1.0:
+            recovered = self.adaptive.increase_per_minute * (now - self._rate_updated) / 60
+            self._rate_fraction = min(1.0, self._rate_fraction + recovered)
+        self._rate_updated = now
+        return self.config.tokens_per_second * self._rate_fraction
 
     def _refill(self):
         """Refill tokens based on time elapsed since last refill."""
@@ -53,102 +289,566 @@ class TokenBucket:
         elapsed = now - self.last_refill
 
         # Calculate tokens to add
-        tokens_to_add = elapsed * self.config.tokens_per_second
+        tokens_to_add = elapsed * self._rate()
 
         # Add tokens (capped at max)
         self.tokens = min(self.config.max_requests, self.tokens + tokens_to_add)
         self.last_refill = now
 
-    def acquire(self, tokens: int = 1) -> bool:
+    def _take(self, tokens: int, reserve: int = 0) -> Tuple[bool, float]:
+        """
+        Refill, then take tokens if available (caller holds lock).
+
+        Args:
+            tokens: Number of tokens to take
+            reserve: Tokens that must remain afterwards
+
+        Returns:
+            Tuple of (acquired, seconds until enough tokens will have
+            accrued, or the Retry-After pause ends, if not acquired)
+        """
+        paused_for = self._paused_until - time.time()
+        if paused_for > 0:
+            return False, paused_for
+
+        rate = self._rate()
+        if self.store is not None:
+            acquired, available = self.store.take(self.config.name, tokens, self.config.max_requests, rate, reserve)
+        else:
+            self._refill()
+            available = self.tokens
+            acquired = available >= tokens + reserve
+            if acquired:
+                self.tokens -= tokens
+
+        if acquired:
+            self._total_requests += 1
+            return True, 0.0
+        return False, (tokens + reserve - available) / rate
+
+    def _should_shed(self, tokens: int, lane: PriorityLane) -> bool:
+        """
+        Check whether a request would wait longer than its lane allows (caller holds lock).
+
+        The wait is estimated from the tokens needed by waiters served
+        first, this request and the lane's reserve, at the current rate.
+        """
+        reserve = lane.reserve_tokens(self.config.max_requests)
+        if tokens + reserve > self.config.max_requests:
+            return True
+        if lane.max_wait is None:
+            return False
+
+        ahead = sum(waiter.tokens for waiter in self._waiters if waiter.priority <= lane.priority)
+        deficit = ahead + tokens + reserve - self._available()
+        wait = max(self._paused_until - time.time(), deficit / self._rate() if deficit > 0 else 0.0)
+        return wait > lane.max_wait
+
+    def _enqueue(self, waiter: Union[_Waiter, _AsyncWaiter]):
+        """Queue a waiter behind all waiters of its own or a higher lane (caller holds lock)."""
+        for index, other in enumerate(self._waiters):
+            if other.priority > waiter.priority:
+                self._waiters.insert(index, waiter)
+                return
+        self._waiters.append(waiter)
+
+    def _deadlines(self, start_time: float, timeout: Optional[float], lane: PriorityLane) -> Tuple[Optional[float], bool]:
+        """Get (deadline, whether reaching it sheds the request) for a waiter."""
+        deadline = None if timeout is None else start_time + timeout
+        if lane.max_wait is not None and (deadline is None or start_time + lane.max_wait < deadline):
+            return start_time + lane.max_wait, True
+        return deadline, False
+
+    def _shed_request(self, lane: PriorityLane, raise_on_shed: bool) -> bool:
+        """Count a shed request; raise or return False (caller holds lock)."""
+        self._shed[lane.name] = self._shed.get(lane.name, 0) + 1
+        if raise_on_shed:
+            raise RateLimitShedError(
+                f"Rate limit for {self.config.name} is kept for higher-priority traffic "
+                f"({lane.name} request shed)"
+            )
+        return False
+
+    def acquire(self, tokens: int = 1, lane: Optional[PriorityLane] = None) -> bool:
         """
         Try to acquire tokens without waiting.
 
         Args:
             tokens: Number of tokens to acquire (default: 1)
+            lane: Priority lane (default: DEFAULT_LANE)
 
         Returns:
             True if tokens acquired, False if not available
         """
+        lane = lane or DEFAULT_LANES[DEFAULT_LANE]
         with self.lock:
-            self._refill()
+            acquired = (
+                not any(waiter.priority <= lane.priority for waiter in self._waiters)
+                and self._take(tokens, lane.reserve_tokens(self.config.max_requests))[0]
+            )
+            if not acquired:
+                self._total_rejected += 1
+            return acquired
+
+    def wait_and_acquire(
+        self,
+        tokens: int = 1,
+        timeout: Optional[float] = None,
+        lane: Optional[PriorityLane] = None,
+        raise_on_shed: bool = False
+    ) -> bool:
+        """
+        Wait until tokens are available, then acquire.
 
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                self._total_requests += 1
-                return True
+        Waiters are served by lane, then in arrival order; each is woken
+        when its tokens have accrued rather than by polling.
 
-            return False
+        Args:
+            tokens: Number of tokens to acquire (default: 1)
+            timeout: Maximum time to wait in seconds (None = wait forever)
+            lane: Priority lane (default: DEFAULT_LANE)
+            raise_on_shed: Raise RateLimitShedError instead of returning
+                False when the lane's limits refuse the request
 
-    def wait_and_acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        Returns:
+            True if acquired, False if timeout or shed (or if more tokens
+            are asked for than the bucket can ever hold)
         """
-        Wait until tokens are available, then acquire.
+        lane = lane or DEFAULT_LANES[DEFAULT_LANE]
+        start_time = time.time()
+        deadline, deadline_sheds = self._deadlines(start_time, timeout, lane)
+        reserve = lane.reserve_tokens(self.config.max_requests)
+
+        with self.lock:
+            if tokens > self.config.max_requests:
+                return False
+            if self._should_shed(tokens, lane):
+                return self._shed_request(lane, raise_on_shed)
+
+            waiter = _Waiter(self.lock, tokens, lane.priority)
+            self._enqueue(waiter)
+            try:
+                while True:
+                    wait_seconds = None
+                    if self._waiters[0] is waiter:
+                        # If not acquired, wait_seconds is exactly how long
+                        # until enough tokens will have accrued
+                        acquired, wait_seconds = self._take(tokens, reserve)
+                        if acquired:
+                            # Record wait time if we waited
+                            wait_time = time.time() - start_time
+                            self._wait_histogram.observe(wait_time)
+                            if wait_time > 0.1:  # Only count significant waits
+                                self._total_waits += 1
+                                self._total_wait_time += wait_time
+
+                            return True
+
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            if deadline_sheds:
+                                return self._shed_request(lane, raise_on_shed)
+                            self._total_timeouts += 1
+                            return False
+                        wait_seconds = remaining if wait_seconds is None else min(wait_seconds, remaining)
+
+                    # Releases the lock while waiting
+                    waiter.condition.wait(wait_seconds)
+            finally:
+                was_head = self._waiters[0] is waiter
+                self._waiters.remove(waiter)
+                if was_head:
+                    self._wake_next()
+
+    async def acquire_async(self, tokens: int = 1, lane: Optional[PriorityLane] = None) -> bool:
+        """
+        Try to acquire tokens without waiting (coroutine form of acquire()).
+
+        Args:
+            tokens: Number of tokens to acquire (default: 1)
+            lane: Priority lane (default: DEFAULT_LANE)
+
+        Returns:
+            True if tokens acquired, False if not available
+        """
+        return await _off_loop(
+            self.acquire, tokens, lane,
+            undo=lambda acquired: acquired and self.give_back(tokens)
+        )
+
+    async def wait_and_acquire_async(
+        self,
+        tokens: int = 1,
+        timeout: Optional[float] = None,
+        lane: Optional[PriorityLane] = None,
+        raise_on_shed: bool = False
+    ) -> bool:
+        """
+        Wait until tokens are available, then acquire, without blocking the event loop.
+
+        Queues alongside threads in wait_and_acquire(), so sync and async
+        callers draw on one budget by lane and arrival order. Lock and
+        BucketStore work runs in worker threads. Cancelling the coroutine
+        leaves the queue (and gives back tokens granted meanwhile).
 
         Args:
             tokens: Number of tokens to acquire (default: 1)
             timeout: Maximum time to wait in seconds (None = wait forever)
+            lane: Priority lane (default: DEFAULT_LANE)
+            raise_on_shed: Raise RateLimitShedError instead of returning
+                False when the lane's limits refuse the request
 
         Returns:
-            True if acquired, False if timeout
+            True if acquired, False if timeout or shed (or if more tokens
+            are asked for than the bucket can ever hold)
         """
+        lane = lane or DEFAULT_LANES[DEFAULT_LANE]
         start_time = time.time()
+        deadline, deadline_sheds = self._deadlines(start_time, timeout, lane)
+        reserve = lane.reserve_tokens(self.config.max_requests)
+        loop = asyncio.get_running_loop()
 
-        while True:
+        def join() -> Optional[_AsyncWaiter]:
+            """Queue a waiter, or None if the request is refused outright."""
+            with self.lock:
+                if tokens > self.config.max_requests:
+                    return None
+                if self._should_shed(tokens, lane):
+                    self._shed_request(lane, raise_on_shed)
+                    return None
+
+                waiter = _AsyncWaiter(loop, tokens, lane.priority)
+                self._enqueue(waiter)
+                return waiter
+
+        def turn(waiter: _AsyncWaiter) -> Tuple[Optional[bool], Optional[float]]:
+            """Try to acquire: (result, or None to keep waiting; seconds to wait)."""
             with self.lock:
+                wait_seconds = None
+                # A cancelled caller may already have left the queue
+                if self._waiters and self._waiters[0] is waiter:
+                    # If not acquired, wait_seconds is exactly how long
+                    # until enough tokens will have accrued
+                    acquired, wait_seconds = self._take(tokens, reserve)
+                    if acquired:
+                        # Record wait time if we waited
+                        wait_time = time.time() - start_time
+                        self._wait_histogram.observe(wait_time)
+                        if wait_time > 0.1:  # Only count significant waits
+                            self._total_waits += 1
+                            self._total_wait_time += wait_time
+
+                        return True, None
+
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        if deadline_sheds:
+                            return self._shed_request(lane, raise_on_shed), None
+                        self._total_timeouts += 1
+                        return False, None
+                    wait_seconds = remaining if wait_seconds is None else min(wait_seconds, remaining)
+
+                # Cleared under the lock, so a wake-up sent after this
+                # point is not lost
+                waiter.event.clear()
+                return None, wait_seconds
+
+        waiter = await _off_loop(join, undo=lambda joined: joined and self._leave(joined))
+        if waiter is None:
+            return False
+
+        try:
+            while True:
+                result, wait_seconds = await _off_loop(
+                    turn, waiter,
+                    undo=lambda outcome: outcome[0] and self.give_back(tokens)
+                )
+                if result is not None:
+                    return result
+
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), wait_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await _off_loop(self._leave, waiter)
+
+    def _leave(self, waiter: _AsyncWaiter):
+        """Remove a coroutine's waiter, waking the next one if it was at the head."""
+        with self.lock:
+            was_head = self._waiters[0] is waiter
+            self._waiters.remove(waiter)
+            if was_head:
+                self._wake_next()
+
+    def give_back(self, tokens: int = 1):
+        """
+        Return tokens granted to a request that did not go ahead.
+
+        Args:
+            tokens: Number of tokens to return (capped at capacity)
+        """
+        with self.lock:
+            if self.store is not None:
+                self.store.give_back(self.config.name, tokens, self.config.max_requests, self._rate())
+            else:
                 self._refill()
+                self.tokens = min(float(self.config.max_requests), self.tokens + tokens)
+            self._total_requests -= 1
+            self._wake_next()
 
-                if self.tokens >= tokens:
-                    self.tokens -= tokens
-                    self._total_requests += 1
+    def _wake_next(self):
+        """Wake the waiter at the head of the queue (caller holds lock)."""
+        if self._waiters:
+            self._waiters[0].wake()
 
-                    # Record wait time if we waited
-                    wait_time = time.time() - start_time
-                    if wait_time > 0.1:  # Only count significant waits
-                        self._total_waits += 1
-                        self._total_wait_time += wait_time
+    def report_throttled(self, retry_after: Optional[float] = None):
+        """
+        Record that upstream throttled a request (e.g. HTTP 429).
 
-                    return True
+        Empties the bucket and multiplies the refill rate by the adaptive
+        decrease factor (at most once per cooldown, so a burst of rejected
+        requests counts as one signal). With retry_after, nothing is
+        granted until that many seconds have passed.
 
-                # Check timeout
-                if timeout and (time.time() - start_time) >= timeout:
-                    return False
+        Args:
+            retry_after: Optional delay requested by upstream, in seconds
+        """
+        with self.lock:
+            now = time.time()
+            self._total_throttled += 1
+
+            if retry_after is not None and retry_after > 0:
+                self._paused_until = max(self._paused_until, now + retry_after)
 
-                # Calculate wait time needed
-                tokens_needed = tokens - self.tokens
-                wait_seconds = tokens_needed / self.config.tokens_per_second
+            if now - self._last_decrease < self.adaptive.cooldown:
+                return
+            self._last_decrease = now
 
-            # Sleep outside the lock (allow other threads to acquire)
-            time.sleep(min(wait_seconds, 0.1))  # Check at least every 100ms
+            # Drain at the old rate, then slow down
+            available = self._available()
+            if self.store is not None:
+                if available > 0:
+                    self.store.take(self.config.name, available, self.config.max_requests, self._rate())
+            else:
+                self.tokens = 0.0
+
+            self._rate_fraction = max(self.adaptive.min_fraction, self._rate_fraction * self.adaptive.decrease)
+
+    def effective_rate(self) -> float:
+        """Get the current refill rate in tokens per second."""
+        with self.lock:
+            return self._rate()
 
     def reset(self):
-        """Reset the bucket to full capacity."""
+        """Reset the bucket to full capacity and its configured rate."""
         with self.lock:
+            if self.store is not None:
+                self.store.reset(self.config.name)
             self.tokens = float(self.config.max_requests)
             self.last_refill = time.time()
+            self._rate_fraction = 1.0
+            self._paused_until = 0.0
+            self._wake_next()
+
+    def _available(self) -> float:
+        """Current token count, after refilling (caller holds lock)."""
+        if self.store is not None:
+            return self.store.peek(self.config.name, self.config.max_requests, self._rate())
+        self._refill()
+        return self.tokens
 
     def available_tokens(self) -> float:
         """Get current number of available tokens."""
         with self.lock:
-            self._refill()
-            return self.tokens
+            return self._available()
 
     def stats(self) -> Dict:
         """Get bucket statistics."""
         with self.lock:
-            self._refill()  # Refill tokens before getting stats
+            available = self._available()  # Refill tokens before getting stats
             avg_wait = (self._total_wait_time / self._total_waits) if self._total_waits > 0 else 0
 
             return {
                 'api_name': self.config.name,
                 'max_requests': self.config.max_requests,
                 'time_window': self.config.time_window,
-                'available_tokens': round(self.tokens, 2),  # Use self.tokens directly to avoid deadlock
+                'available_tokens': round(available, 2),
+                'store': self.store.name if self.store is not None else 'memory',
                 'total_requests': self._total_requests,
                 'total_waits': self._total_waits,
                 'total_wait_time': round(self._total_wait_time, 2),
                 'average_wait_time': round(avg_wait, 2),
+                'waiting': len(self._waiters),
+                'shed': dict(self._shed),
                 'refill_rate': round(self.config.tokens_per_second, 4),
+                'effective_rate': round(self._rate(), 6),
+                'rate_fraction': round(self._rate_fraction, 4),
+                'rejected': self._total_rejected,
+                'timeouts': self._total_timeouts,
+                'throttled': self._total_throttled,
+                'paused_for': round(max(0.0, self._paused_until - time.time()), 2),
             }
 
+    def metrics(self) -> Dict:
+        """Get the bucket's metric values (see rate_limit_metrics)."""
+        with self.lock:
+            return {
+                'wait_seconds': self._wait_histogram.snapshot(),
+                'tokens': self._available(),
+                'waiting': len(self._waiters),
+                'effective_rate': self._rate(),
+                'requests': self._total_requests,
+                'rejected': self._total_rejected,
+                'timeouts': self._total_timeouts,
+                'shed': dict(self._shed),
+                'throttled': self._total_throttled,
+            }
+
+
+class CalendarQuota:
+    """
+    A fixed number of requests per calendar day or month.
+
+    Unlike a token bucket, nothing refills gradually: the whole allowance
+    comes back when the next window starts (midnight, or midnight on the
+    1st, in the quota's timezone).
+
+    Usage is kept in the BucketStore, if given, as a non-refilling bucket
+    per window ("<name>@2024-05"), so a persistent store carries it across
+    restarts. An optional usage callable (e.g. a CostTracker count) reports
+    calls recorded elsewhere; the quota never grants more than the limit
+    minus what it reports.
+    """
+
+    PERIODS = ('day', 'month')
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        period: str = 'month',
+        tz: str = 'America/Los_Angeles',
+        store: Optional[BucketStore] = None,
+        usage: Optional[Callable[[], int]] = None
+    ):
+        """
+        Initialize quota.
+
+        Args:
+            name: API name (also the store key prefix)
+            limit: Requests allowed per window
+            period: 'day' or 'month'
+            tz: Timezone windows are aligned to (default: Pacific, where
+                Google's free caps reset)
+            store: Optional shared, persistent usage store
+            usage: Optional callable returning requests already used in
+                the current window
+
+        Raises:
+            ValueError: If the period is not 'day' or 'month'
+        """
+        if period not in self.PERIODS:
+            raise ValueError(f"Quota period must be one of {self.PERIODS}, got {period!r}")
+
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.tz = ZoneInfo(tz)
+        self.store = store
+        self.usage = usage
+        self.lock = Lock()
+
+        # In-process usage when there is no store
+        self._window_key: Optional[str] = None
+        self._used = 0
+
+        self._total_rejected = 0
+
+    def window(self, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """
+        Get the current window's (start, end).
+
+        Args:
+            now: Current time (default: now)
+        """
+        now = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.period == 'day':
+            end = start + timedelta(days=1)
+        else:
+            start = start.replace(day=1)
+            end = (start + timedelta(days=32)).replace(day=1)
+        return start, end
+
+    def _key(self) -> str:
+        """Store key for the current window."""
+        start, _ = self.window()
+        return f"{self.name}@{start:%Y-%m}" if self.period == 'month' else f"{self.name}@{start:%Y-%m-%d}"
+
+    def _remaining(self, key: str) -> float:
+        """Requests left in the window (caller holds lock)."""
+        if self.store is not None:
+            remaining = self.store.peek(key, self.limit, 0.0)
+        else:
+            remaining = self.limit - (self._used if key == self._window_key else 0)
+        if self.usage is not None:
+            remaining = min(remaining, self.limit - self.usage())
+        return max(0.0, remaining)
+
+    def remaining(self) -> float:
+        """Get the number of requests left in the current window."""
+        with self.lock:
+            return self._remaining(self._key())
+
+    def take(self, tokens: int = 1) -> bool:
+        """
+        Use part of the quota.
+
+        Args:
+            tokens: Number of requests (default: 1)
+
+        Returns:
+            True if the quota allowed them, False if it is used up
+        """
+        with self.lock:
+            key = self._key()
+            acquired = self.usage is None or self.usage() + tokens <= self.limit
+            if acquired and self.store is not None:
+                acquired = self.store.take(key, tokens, self.limit, 0.0)[0]
+            elif acquired:
+                if key != self._window_key:
+                    self._window_key, self._used = key, 0
+                acquired = self._used + tokens <= self.limit
+                if acquired:
+                    self._used += tokens
+
+            if not acquired:
+                self._total_rejected += 1
+            return acquired
+
+    def seconds_until_reset(self) -> float:
+        """Get the number of seconds until the next window starts."""
+        _, end = self.window()
+        return max(0.0, end.timestamp() - time.time())
+
+    def stats(self) -> Dict:
+        """Get quota statistics."""
+        start, end = self.window()
+        with self.lock:
+            remaining = self._remaining(self._key())
+        return {
+            'limit': self.limit,
+            'period': self.period,
+            'window_start': start.isoformat(),
+            'resets_at': end.isoformat(),
+            'used': round(self.limit - remaining, 2),
+            'remaining': round(remaining, 2),
+            'rejected': self._total_rejected,
+        }
+
 
 class RateLimiter:
     """
@@ -158,7 +858,12 @@ class RateLimiter:
     - Token bucket algorithm per API
     - Automatic waiting/retry
     - Thread-safe operations
-    - Statistics tracking
+    - Asyncio counterparts sharing the same budget
+    - Optional shared bucket store, so worker processes share one budget
+    - Adaptive refill rates driven by upstream 429/Retry-After responses
+    - Priority lanes: higher lanes served first, lower lanes shed fast
+    - Calendar-aligned daily/monthly quotas on top of the token buckets
+    - Statistics tracking, and Prometheus metrics (prometheus_metrics())
     - Configurable per API
 
     Usage:
@@ -177,6 +882,19 @@ class RateLimiter:
             response = uber_client.get_estimate(...)
         else:
             print("Rate limit reached, try later")
+
+        # From a coroutine (same buckets as the sync calls)
+        await limiter.acquire_async('uber')
+
+        # After the call, let the bucket slow down if upstream throttled us
+        limiter.report_response('uber', response.status_code, response.headers)
+
+        # Guest traffic yields to signed-in users and fails fast when scarce
+        with priority_lane('interactive-guest'):
+            limiter.wait_if_needed('google_places')  # May raise RateLimitShedError
+
+        # Never go past a monthly free tier (resets on the 1st, Pacific time)
+        limiter.add_quota('google_places', 5000, period='month')
     """
 
     # Default rate limits for common APIs
@@ -189,19 +907,38 @@ class RateLimiter:
         'nominatim': RateLimitConfig(max_requests=1, time_window=1, name='nominatim'),  # 1 req/sec
     }
 
-    def __init__(self, enabled: bool = True):
+    # Status codes reported as throttling (503 only with a Retry-After)
+    THROTTLE_STATUSES = (429,)
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        store: Optional[BucketStore] = None,
+        adaptive: Optional[AdaptiveConfig] = None,
+        lanes: Optional[Dict[str, PriorityLane]] = None
+    ):
         """
         Initialize rate limiter.
 
         Args:
             enabled: Whether rate limiting is enabled (useful for testing)
+            store: Optional shared bucket state (see rate_limit_stores);
+                every process using the same store shares each API's budget
+            adaptive: Reaction of every bucket to reported throttling
+                (default: AdaptiveConfig())
+            lanes: Priority lanes by name (default: DEFAULT_LANES; must
+                include DEFAULT_LANE)
         """
         self.enabled = enabled
+        self.store = store
+        self.adaptive = adaptive
+        self.lanes = dict(DEFAULT_LANES if lanes is None else lanes)
         self.buckets: Dict[str, TokenBucket] = {}
+        self.quotas: Dict[str, CalendarQuota] = {}
 
         # Initialize with default limits
         for api_name, config in self.DEFAULT_LIMITS.items():
-            self.buckets[api_name] = TokenBucket(config)
+            self.buckets[api_name] = TokenBucket(config, store, adaptive)
 
     def add_limit(self, api_name: str, max_requests: int, time_window: int):
         """
@@ -217,29 +954,97 @@ class RateLimiter:
             time_window=time_window,
             name=api_name
         )
-        self.buckets[api_name] = TokenBucket(config)
+        self.buckets[api_name] = TokenBucket(config, self.store, self.adaptive)
+
+    def add_quota(
+        self,
+        api_name: str,
+        limit: int,
+        period: str = 'month',
+        tz: str = 'America/Los_Angeles',
+        usage: Optional[Callable[[], int]] = None
+    ):
+        """
+        Add or update a calendar quota for an API.
+
+        Requests must then get past both the API's token bucket and its
+        quota. Quota usage lives in the limiter's store, if it has one.
+
+        Args:
+            api_name: Name of the API
+            limit: Requests allowed per window
+            period: 'day' or 'month'
+            tz: Timezone windows are aligned to
+            usage: Optional callable returning requests already used in
+                the current window (e.g. from CostTracker.monthly_count)
+        """
+        self.quotas[api_name] = CalendarQuota(api_name, limit, period, tz, self.store, usage)
+
+    def _quota_allows(self, api_name: str, tokens: int) -> bool:
+        """Check an API's quota has room before waiting for its bucket."""
+        quota = self.quotas.get(api_name)
+        return quota is None or quota.remaining() >= tokens
 
-    def try_acquire(self, api_name: str, tokens: int = 1) -> bool:
+    def _take_quota(self, api_name: str, tokens: int, bucket: Optional[TokenBucket] = None) -> bool:
+        """
+        Charge an API's quota once its bucket granted the request.
+
+        If the quota refuses, the bucket's tokens are given back, so a
+        refused request does not drain the budget other lanes share.
+        """
+        quota = self.quotas.get(api_name)
+        if quota is None or quota.take(tokens):
+            return True
+        if bucket is not None:
+            bucket.give_back(tokens)
+        return False
+
+    def _quota_exceeded(self, api_name: str) -> QuotaExceededError:
+        quota = self.quotas[api_name]
+        return QuotaExceededError(
+            f"{'Daily' if quota.period == 'day' else 'Monthly'} quota of {quota.limit} requests for {api_name} "
+            f"is used up (resets in {quota.seconds_until_reset() / 3600:.1f}h)"
+        )
+
+    def _lane(self, name: Optional[str]) -> PriorityLane:
+        """Resolve a lane name (None = the current priority_lane())."""
+        name = name or current_lane()
+        if name not in self.lanes:
+            raise ValueError(f"Unknown priority lane: {name}")
+        return self.lanes[name]
+
+    def try_acquire(self, api_name: str, tokens: int = 1, lane: Optional[str] = None) -> bool:
         """
         Try to acquire tokens without waiting.
 
         Args:
             api_name: Name of the API
             tokens: Number of tokens to acquire (default: 1)
+            lane: Priority lane (default: current priority_lane())
 
         Returns:
-            True if acquired, False if not available
+            True if acquired, False if not available (or the quota is used up)
         """
         if not self.enabled:
             return True
 
-        if api_name not in self.buckets:
-            # No limit configured, allow request
-            return True
+        if not self._quota_allows(api_name, tokens):
+            return False
+
+        # No bucket configured: only the quota (if any) applies
+        bucket = self.buckets.get(api_name)
+        if bucket is not None and not bucket.acquire(tokens, self._lane(lane)):
+            return False
 
-        return self.buckets[api_name].acquire(tokens)
+        return self._take_quota(api_name, tokens, bucket)
 
-    def acquire(self, api_name: str, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+    def acquire(
+        self,
+        api_name: str,
+        tokens: int = 1,
+        timeout: Optional[float] = None,
+        lane: Optional[str] = None
+    ) -> bool:
         """
         Acquire tokens, waiting if necessary.
 
@@ -247,34 +1052,172 @@ class RateLimiter:
             api_name: Name of the API
             tokens: Number of tokens to acquire (default: 1)
             timeout: Maximum time to wait in seconds (None = wait forever)
+            lane: Priority lane (default: current priority_lane())
 
         Returns:
-            True if acquired, False if timeout
+            True if acquired, False if timeout, shed or the quota is used up
         """
         if not self.enabled:
             return True
 
-        if api_name not in self.buckets:
-            # No limit configured, allow request
+        if not self._quota_allows(api_name, tokens):
+            return False
+
+        # No bucket configured: only the quota (if any) applies
+        bucket = self.buckets.get(api_name)
+        if bucket is not None and not bucket.wait_and_acquire(tokens, timeout, self._lane(lane)):
+            return False
+
+        return self._take_quota(api_name, tokens, bucket)
+
+    async def try_acquire_async(self, api_name: str, tokens: int = 1, lane: Optional[str] = None) -> bool:
+        """
+        Try to acquire tokens without waiting (coroutine form of try_acquire()).
+
+        Args:
+            api_name: Name of the API
+            tokens: Number of tokens to acquire (default: 1)
+            lane: Priority lane (default: current priority_lane())
+
+        Returns:
+            True if acquired, False if not available
+        """
+        bucket = self.buckets.get(api_name)
+        return await _off_loop(
+            self.try_acquire, api_name, tokens, lane,
+            undo=lambda acquired: acquired and bucket is not None and bucket.give_back(tokens)
+        )
+
+    async def acquire_async(
+        self,
+        api_name: str,
+        tokens: int = 1,
+        timeout: Optional[float] = None,
+        lane: Optional[str] = None
+    ) -> bool:
+        """
+        Acquire tokens, suspending the coroutine (not the event loop) if necessary.
+
+        Shares bucket state with acquire(), so sync and async callers draw
+        on the same budget.
+
+        Args:
+            api_name: Name of the API
+            tokens: Number of tokens to acquire (default: 1)
+            timeout: Maximum time to wait in seconds (None = wait forever)
+            lane: Priority lane (default: current priority_lane())
+
+        Returns:
+            True if acquired, False if timeout, shed or the quota is used up
+        """
+        if not self.enabled:
             return True
 
-        return self.buckets[api_name].wait_and_acquire(tokens, timeout)
+        if not await _off_loop(self._quota_allows, api_name, tokens):
+            return False
+
+        # No bucket configured: only the quota (if any) applies
+        bucket = self.buckets.get(api_name)
+        if bucket is not None and not await bucket.wait_and_acquire_async(tokens, timeout, self._lane(lane)):
+            return False
+
+        return await _off_loop(self._take_quota, api_name, tokens, bucket)
+
+    async def wait_if_needed_async(self, api_name: str, tokens: int = 1, lane: Optional[str] = None):
+        """
+        Coroutine form of wait_if_needed().
+
+        Raises:
+            QuotaExceededError: If the API's calendar quota is used up
+            RateLimitShedError: If the lane's limits refuse the request
+            TimeoutError: If can't acquire tokens within 60 seconds
+        """
+        if not self.enabled:
+            return
+
+        if not await _off_loop(self._quota_allows, api_name, tokens):
+            raise self._quota_exceeded(api_name)
+
+        bucket = self.buckets.get(api_name)
+        if bucket is not None and not await bucket.wait_and_acquire_async(
+            tokens, 60.0, self._lane(lane), raise_on_shed=True
+        ):
+            raise TimeoutError(f"Could not acquire rate limit for {api_name} within 60 seconds")
+
+        if not await _off_loop(self._take_quota, api_name, tokens, bucket):
+            raise self._quota_exceeded(api_name)
 
-    def wait_if_needed(self, api_name: str, tokens: int = 1):
+    def wait_if_needed(self, api_name: str, tokens: int = 1, lane: Optional[str] = None):
         """
         Convenience method that waits if rate limit reached.
         Raises exception if can't acquire within reasonable time.
 
+        Lower priority lanes fail fast instead of waiting the full 60
+        seconds (see PriorityLane.max_wait).
+
         Args:
             api_name: Name of the API
             tokens: Number of tokens to acquire (default: 1)
+            lane: Priority lane (default: current priority_lane())
 
         Raises:
+            QuotaExceededError: If the API's calendar quota is used up
+            RateLimitShedError: If the lane's limits refuse the request
             TimeoutError: If can't acquire tokens within 60 seconds
         """
-        if not self.acquire(api_name, tokens, timeout=60.0):
+        if not self.enabled:
+            return
+
+        if not self._quota_allows(api_name, tokens):
+            raise self._quota_exceeded(api_name)
+
+        bucket = self.buckets.get(api_name)
+        if bucket is not None and not bucket.wait_and_acquire(tokens, 60.0, self._lane(lane), raise_on_shed=True):
             raise TimeoutError(f"Could not acquire rate limit for {api_name} within 60 seconds")
 
+        if not self._take_quota(api_name, tokens, bucket):
+            raise self._quota_exceeded(api_name)
+
+    def report_throttled(self, api_name: str, retry_after: Optional[float] = None):
+        """
+        Record that an API throttled a request.
+
+        Args:
+            api_name: Name of the API
+            retry_after: Optional delay requested by the API, in seconds
+        """
+        if api_name in self.buckets:
+            self.buckets[api_name].report_throttled(retry_after)
+
+    def report_response(
+        self,
+        api_name: str,
+        status_code: int,
+        headers: Optional[Mapping[str, str]] = None
+    ) -> bool:
+        """
+        Feed an API response status back into its bucket.
+
+        429 responses (and 503 responses carrying Retry-After) count as
+        throttling; anything else is ignored.
+
+        Args:
+            api_name: Name of the API
+            status_code: HTTP status code
+            headers: Response headers (Retry-After is honoured)
+
+        Returns:
+            True if the response was treated as throttling
+        """
+        retry_after = None
+        for name, value in (headers or {}).items():
+            if name.lower() == 'retry-after':
+                retry_after = parse_retry_after(value)
+        if status_code in self.THROTTLE_STATUSES or (status_code == 503 and retry_after is not None):
+            self.report_throttled(api_name, retry_after)
+            return True
+        return False
+
     def reset(self, api_name: str):
         """
         Reset rate limit for an API.
@@ -298,12 +1241,25 @@ class RateLimiter:
             api_name: Name of the API
 
         Returns:
-            Number of available tokens
+            Number of available tokens (capped by the quota, if any)
         """
-        if api_name not in self.buckets:
-            return float('inf')  # Unlimited
-
-        return self.buckets[api_name].available_tokens()
+        available = float('inf')  # Unlimited
+        if api_name in self.buckets:
+            available = self.buckets[api_name].available_tokens()
+        if api_name in self.quotas:
+            available = min(available, self.quotas[api_name].remaining())
+        return available
+
+    def _api_stats(self, api_name: str) -> Dict:
+        """Bucket statistics for an API, with its quota's under 'quota'."""
+        stats = self.buckets[api_name].stats() if api_name in self.buckets else {'api_name': api_name}
+        if api_name in self.quotas:
+            stats['quota'] = self.quotas[api_name].stats()
+        return stats
+
+    def prometheus_metrics(self) -> str:
+        """Get metrics for all APIs in the Prometheus text format (see rate_limit_metrics)."""
+        return render_prometheus(self)
 
     def stats(self, api_name: Optional[str] = None) -> Dict:
         """
@@ -316,26 +1272,32 @@ class RateLimiter:
             Statistics dictionary
         """
         if api_name:
-            if api_name in self.buckets:
-                return self.buckets[api_name].stats()
+            if api_name in self.buckets or api_name in self.quotas:
+                return self._api_stats(api_name)
             return {}
 
         # Return stats for all APIs
         return {
-            name: bucket.stats()
-            for name, bucket in self.buckets.items()
+            name: self._api_stats(name)
+            for name in {**self.buckets, **self.quotas}
         }
 
 
 # Convenience function for creating rate limiter
-def create_rate_limiter(enabled: bool = True) -> RateLimiter:
+def create_rate_limiter(
+    enabled: bool = True,
+    store: Optional[BucketStore] = None,
+    adaptive: Optional[AdaptiveConfig] = None
+) -> RateLimiter:
     """
     Create a rate limiter instance with default limits.
 
     Args:
         enabled: Whether rate limiting is enabled
+        store: Optional shared bucket state (see rate_limit_stores)
+        adaptive: Reaction to reported throttling (default: AdaptiveConfig())
 
     Returns:
         RateLimiter instance
     """
-    return RateLimiter(enabled=enabled)
+    return RateLimiter(enabled=enabled, store=store, adaptive=adaptive)
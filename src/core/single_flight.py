@@ -0,0 +1,123 @@
+"""
+Request coalescing (single-flight) for identical cache misses.
+
+When a popular cache entry expires, every concurrent request misses at the
+same moment. Running them through SingleFlight lets the first caller (the
+leader) do the upstream fetch while the others wait and share its result.
+"""
+
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    """An in-flight fetch that followers can wait on."""
+
+    def __init__(self, domain: str):
+        self.domain = domain
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    Features:
+    - One upstream call per key at a time; followers share the result
+    - Leader exceptions are re-raised in every waiting follower
+    - Per-domain counts of executions and saved duplicate calls
+
+    Usage:
+        flight = SingleFlight()
+
+        restaurants = flight.do(
+            cache_key,
+            lambda: client.search(...),
+            domain='restaurants'
+        )
+
+        flight.stats()
+        # {'restaurants': {'executions': 1, 'coalesced': 7, 'in_flight': 0}}
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self.lock = Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def do(self, key: str, fn: Callable[[], Any], domain: str = 'default') -> Any:
+        """
+        Run fn once for all concurrent callers using the same key.
+
+        Args:
+            key: Coalescing key (usually the cache key)
+            fn: Zero-argument function performing the upstream fetch
+            domain: Domain name used for statistics
+
+        Returns:
+            Result of fn (shared between leader and followers)
+
+        Raises:
+            Exception: Whatever fn raised, re-raised for every caller
+        """
+        with self.lock:
+            domain_stats = self._domain_stats(domain)
+            call = self._calls.get(key)
+
+            if call is not None:
+                # Follower: wait for the leader's result
+                domain_stats['coalesced'] += 1
+                is_leader = False
+            else:
+                call = _Call(domain)
+                self._calls[key] = call
+                domain_stats['executions'] += 1
+                is_leader = True
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _domain_stats(self, domain: str) -> Dict[str, int]:
+        """Get (or create) the counters for a domain (caller holds lock)."""
+        if domain not in self._stats:
+            self._stats[domain] = {'executions': 0, 'coalesced': 0}
+        return self._stats[domain]
+
+    def stats(self) -> Dict:
+        """
+        Get per-domain coalescing statistics.
+
+        Returns:
+            Dictionary mapping domain to executions (upstream calls made),
+            coalesced (duplicate calls saved) and in_flight counts
+        """
+        with self.lock:
+            in_flight: Dict[str, int] = {}
+            for call in self._calls.values():
+                in_flight[call.domain] = in_flight.get(call.domain, 0) + 1
+
+            return {
+                domain: {
+                    'executions': counts['executions'],
+                    'coalesced': counts['coalesced'],
+                    'in_flight': in_flight.get(domain, 0),
+                }
+                for domain, counts in self._stats.items()
+            }
@@ -13,8 +13,15 @@ The domain handler pattern ensures:
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Optional, Any, Sequence, Tuple
+from dataclasses import asdict, dataclass, field, is_dataclass
+
+from core.cache_keys import CacheKeyBuilder
+from core.cache_service import CacheService
+from core.geocoding_service import GeocodingService, LocationNotFoundError, geocode_cache_key
+
+# Key builder for caches that do not bring their own
+_DEFAULT_KEYS = CacheKeyBuilder()
 
 
 @dataclass
@@ -133,6 +140,9 @@ class DomainHandler(ABC):
         results = handler.process("Get me from Times Square to JFK")
     """
 
+    # Query dataclass this handler parses into (set by subclasses)
+    query_type: Optional[type] = None
+
     def __init__(
         self,
         cache_service: Optional[Any] = None,
@@ -152,6 +162,174 @@ class DomainHandler(ABC):
         self.cache = cache_service
         self.geocoder = geocoding_service
 
+    def _register_cache_types(self, *classes) -> None:
+        """
+        Register result models with the cache so hits come back as objects.
+
+        Caches without a type registry (simple dict-like test doubles) are
+        left alone.
+
+        Args:
+            *classes: Dataclass types this handler stores in the cache
+        """
+        register_type = getattr(self.cache, 'register_type', None)
+        if register_type is not None:
+            register_type(*classes)
+
+    def _cache_key(
+        self,
+        domain: str,
+        points: Sequence[Tuple[float, float]] = (),
+        query: Any = None,
+        **fields: Any
+    ) -> str:
+        """
+        Build the canonical cache key for a query.
+
+        Uses the CacheService's key builder (its geohash precision and query
+        log); other caches get a builder with the default settings.
+
+        Args:
+            domain: Domain name
+            points: (lat, lon) pairs the results depend on
+            query: Optional query dataclass, recorded in the query log so
+                cache warm-up can replay it
+            **fields: Query fields the results depend on
+
+        Returns:
+            Cache key (see CacheKeyBuilder.build())
+        """
+        keys = self.cache.keys if isinstance(self.cache, CacheService) else _DEFAULT_KEYS
+        key = keys.key_for(domain, points, fields)
+        keys.record(domain, points, fields, query=asdict(query) if is_dataclass(query) else None)
+        return key
+
+    def _geocode(self, location: str):
+        """
+        Geocode a location, short-circuiting on cached "not found" results.
+
+        Unknown places are remembered as negative cache entries (for
+        CacheService.DEFAULT_NEGATIVE_TTLS['geocoding']), so repeated typos
+        do not go back to the geocoding API. API errors are not cached.
+
+        Args:
+            location: Location name
+
+        Returns:
+            Tuple of (latitude, longitude, formatted_address)
+
+        Raises:
+            LocationNotFoundError: If the location is unknown (possibly cached)
+            ValueError: If geocoding fails
+        """
+        return self._geocode_many([location])[0]
+
+    def _geocode_many(self, locations: List[str]) -> List[tuple]:
+        """
+        Geocode several locations, prefetching their cache entries in one call.
+
+        A GeocodingService resolves them as one batch (see geocode_many()),
+        so cold locations are fetched in parallel; the first failure in
+        input order is raised. Other geocoders are called in order, so the
+        first unknown location raises before later ones reach the API.
+
+        Args:
+            locations: Location names
+
+        Returns:
+            List of (latitude, longitude, formatted_address), one per location
+
+        Raises:
+            LocationNotFoundError: If a location is unknown (possibly cached)
+            ValueError: If geocoding fails
+        """
+        if isinstance(self.geocoder, GeocodingService):
+            results = self.geocoder.geocode_many(locations)
+            for result in results:
+                if not result.ok:
+                    raise result.error
+            return [result.coordinates for result in results]
+
+        if not isinstance(self.cache, CacheService):
+            return [self.geocoder.geocode(location) for location in locations]
+
+        cache_keys = [geocode_cache_key(location) for location in locations]
+        negatives: Dict[str, str] = {}
+        self.cache.get_many(cache_keys, domain='geocoding', negatives=negatives)
+
+        results = []
+        for location, cache_key in zip(locations, cache_keys):
+            if cache_key in negatives:
+                raise LocationNotFoundError(negatives[cache_key])
+
+            try:
+                results.append(self.geocoder.geocode(location))
+            except LocationNotFoundError as e:
+                # A geocoder sharing this cache has already stored it
+                if getattr(self.geocoder, 'cache', None) is not self.cache:
+                    self.cache.set_negative(cache_key, str(e), domain='geocoding')
+                raise
+        return results
+
+    def _get_or_fetch(
+        self,
+        cache_key: Optional[str],
+        fetch: Callable[[], Any],
+        domain: str,
+        api_name: Optional[str] = None,
+        cache_empty: Callable[[], bool] = lambda: True,
+        complete: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """
+        Return cached results for cache_key, fetching and caching on a miss.
+
+        With a CacheService this goes through get_or_fetch(), so concurrent
+        misses share one upstream fetch, stale entries (for domains with a
+        soft/hard TTL pair) are served while refreshing in the background,
+        and empty results are negative-cached briefly. Other caches (simple
+        get/set test doubles) get a plain lookup.
+
+        Args:
+            cache_key: Key results are cached under (None to skip the cache)
+            fetch: Zero-argument function that queries the providers
+            domain: Domain name for TTLs and statistics
+            api_name: Rate limit bucket charged for background refreshes
+            cache_empty: Called after an empty fetch; return False when the
+                result is empty because providers failed (not cached)
+            complete: Optional; called after a fetch, return False when the
+                result is partial because some providers failed (not cached)
+
+        Returns:
+            Cached or freshly fetched results
+        """
+        if not self.cache or not cache_key:
+            return fetch()
+
+        if isinstance(self.cache, CacheService):
+            return self.cache.get_or_fetch(
+                cache_key,
+                fetch,
+                domain=domain,
+                rate_limiter=getattr(self, 'rate_limiter', None),
+                api_name=api_name,
+                cache_empty=cache_empty,
+                complete=complete
+            )
+
+        cached = self.cache.get(cache_key)
+        if cached:
+            return cached
+
+        results = fetch()
+        if results and (complete is None or complete()):
+            get_ttl = getattr(self.cache, 'get_ttl_for_domain', None)
+            if get_ttl is not None:
+                self.cache.set(cache_key, results, ttl=get_ttl(domain))
+            else:
+                self.cache.set(cache_key, results)
+
+        return results
+
     @abstractmethod
     def parse_query(
         self,
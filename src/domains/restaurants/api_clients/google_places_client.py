@@ -4,6 +4,7 @@ import os
 import requests
 from math import radians, sin, cos, sqrt, atan2
 from typing import List, Optional
+from core.rate_limiter import QuotaExceededError, RateLimitShedError
 from ..models import Restaurant
 
 class GooglePlacesClient:
@@ -47,7 +48,14 @@ class GooglePlacesClient:
         price_range: str = None,
         rating_min: float = 0.0
     ) -> List[Restaurant]:
-        """Search restaurants via Google Places API."""
+        """
+        Search restaurants via Google Places API.
+
+        Raises:
+            QuotaExceededError: If the monthly google_places quota is used up
+            RateLimitShedError: If the google_places bucket has no token for
+                this request (the call is skipped, not queued)
+        """
 
         # Build query
         query = f"{cuisine} restaurant" if cuisine else "restaurant"
@@ -72,9 +80,21 @@ class GooglePlacesClient:
             "maxResultCount": limit
         }
         
+        # Refusals raise rather than return [], so callers can tell a skipped
+        # call from "no places found" (and not cache a partial result)
+        if self.rate_limiter and not self.rate_limiter.try_acquire('google_places'):
+            quota = self.rate_limiter.quotas.get('google_places')
+            if quota is not None and quota.remaining() < 1:
+                raise QuotaExceededError("Google Places API skipped: monthly quota used up")
+            raise RateLimitShedError("Google Places API skipped: rate limit reached")
+
         try:
             response = requests.post(self.base_url, json=body, headers=headers)
 
+            # Slow the bucket down if Google is throttling us
+            if self.rate_limiter:
+                self.rate_limiter.report_response('google_places', response.status_code, response.headers)
+
             # Log the full error response for debugging
             if response.status_code != 200:
                 print(f"Google Places API Error {response.status_code}:")
@@ -118,7 +118,7 @@ class MockGooglePlacesClient:
         """
         # Rate limiting
         if self.rate_limiter:
-            self.rate_limiter.acquire('google_places')
+            self.rate_limiter.wait_if_needed('google_places')
 
         # Get restaurant data
         cuisine_key = self._normalize_cuisine(cuisine)
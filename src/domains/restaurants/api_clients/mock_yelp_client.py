@@ -128,7 +128,7 @@ class MockYelpClient:
         """
         # Rate limiting
         if self.rate_limiter:
-            self.rate_limiter.acquire('yelp')
+            self.rate_limiter.wait_if_needed('yelp')
 
         # Get restaurant data for cuisine
         cuisine_key = self._normalize_cuisine(cuisine)
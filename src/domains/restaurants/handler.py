@@ -43,6 +43,9 @@ class RestaurantHandler(DomainHandler):
         )
     """
 
+    # Query model (used to rebuild logged queries for cache warm-up)
+    query_type = RestaurantQuery
+
     def __init__(
         self,
         cache_service=None,
@@ -60,6 +63,9 @@ class RestaurantHandler(DomainHandler):
         super().__init__(cache_service, geocoding_service)
         self.rate_limiter = rate_limiter
 
+        # Cached results come back as Restaurant objects
+        self._register_cache_types(Restaurant)
+
         # Initialize domain-specific components
         self.parser = RestaurantIntentParser()
         self.comparator = RestaurantComparator()
@@ -110,19 +116,57 @@ class RestaurantHandler(DomainHandler):
         if not self.geocoder:
             raise ValueError("Geocoding service required for restaurant search")
 
-        lat, lon, formatted_location = self.geocoder.geocode(query.location)
+        lat, lon, formatted_location = self._geocode(query.location)
 
-        # Check cache first (if available)
         cache_key = None
         if self.cache:
-            cache_key = f"restaurants_{query.cuisine or 'any'}_{lat:.4f}_{lon:.4f}_{query.price_range or 'any'}"
-            cached = self.cache.get(cache_key)
-            if cached:
-                # Convert dicts back to Restaurant objects
-                if cached and isinstance(cached[0], dict):
-                    return [Restaurant(**r) for r in cached]
-                return cached
+            cache_key = self._cache_key(
+                'restaurants',
+                [(lat, lon)],
+                query=query,
+                cuisine=query.cuisine,
+                price_range=query.price_range,
+                rating_min=query.rating_min
+            )
+
+        # Cache hit, stale-while-revalidate, or one coalesced provider round trip.
+        # "No results" is cached briefly; nothing is cached if a provider failed
+        # (e.g. Google Places refused by the rate limiter), since the results
+        # would be missing that provider's places until the entry expired.
+        failures: List[str] = []
+        restaurants = self._get_or_fetch(
+            cache_key,
+            lambda: self._fetch_from_providers(query, lat, lon, failures),
+            domain='restaurants',
+            api_name='google_places',
+            complete=lambda: not failures
+        )
+
+        # Entries written before typed caching hold plain dicts
+        if restaurants and isinstance(restaurants[0], dict):
+            return [Restaurant(**r) for r in restaurants]
+        return restaurants
+
+    def _fetch_from_providers(
+        self,
+        query: RestaurantQuery,
+        lat: float,
+        lon: float,
+        failures: Optional[List[str]] = None
+    ) -> List[Restaurant]:
+        """
+        Query every provider and merge the results.
+
+        Args:
+            query: RestaurantQuery with search criteria
+            lat: Search latitude
+            lon: Search longitude
+            failures: Optional list that receives the names of providers
+                that raised
 
+        Returns:
+            List of Restaurant objects sorted by rating
+        """
         # Fetch from each provider
         restaurants = []
 
@@ -138,6 +182,8 @@ class RestaurantHandler(DomainHandler):
                 )
                 restaurants.extend(results)
             except Exception as e:
+                if failures is not None:
+                    failures.append(provider_name)
                 print(f"Error fetching from {provider_name}: {e}")
                 import traceback
                 traceback.print_exc()
@@ -146,12 +192,6 @@ class RestaurantHandler(DomainHandler):
         # Sort by rating (best first)
         restaurants.sort(key=lambda r: r.rating, reverse=True)
 
-        # Cache results (if available)
-        if self.cache and cache_key:
-            # Use restaurant-specific TTL (1 hour)
-            ttl = self.cache.get_ttl_for_domain('restaurants')
-            self.cache.set(cache_key, restaurants, ttl=ttl)
-
         return restaurants
 
     def compare_options(self, options: List[Restaurant], priority: str = "balanced", use_ai: bool = False) -> str:    
@@ -79,7 +79,7 @@ class MockLyftClient:
         """
         # Rate limit check (if limiter provided)
         if self.rate_limiter:
-            self.rate_limiter.acquire('lyft')
+            self.rate_limiter.wait_if_needed('lyft')
 
         # Calculate trip distance and duration
         distance_miles = self._haversine_distance(
@@ -43,7 +43,8 @@ class UberClient:
         self,
         server_token: Optional[str] = None,
         client_id: Optional[str] = None,
-        client_secret: Optional[str] = None
+        client_secret: Optional[str] = None,
+        rate_limiter=None
     ):
         """
         Initialize Uber API client with authentication.
@@ -52,6 +53,8 @@ class UberClient:
             server_token: Uber server token (legacy auth)
             client_id: OAuth 2.0 client ID
             client_secret: OAuth 2.0 client secret
+            rate_limiter: Optional rate limiter told about throttled
+                (429) responses
 
         Note:
             If no credentials provided, reads from environment:
@@ -62,6 +65,7 @@ class UberClient:
             ValueError: If no valid credentials provided
         """
         self.base_url = "https://api.uber.com/v1.2"
+        self.rate_limiter = rate_limiter
 
         # Try OAuth credentials first
         self.client_id = client_id or os.getenv("UBER_CLIENT_ID") or os.getenv("UBER_CLEINT_ID")  # Handle typo
@@ -226,6 +230,10 @@ class UberClient:
                 timeout=10
             )
 
+            # Slow the bucket down if Uber is throttling us
+            if self.rate_limiter:
+                self.rate_limiter.report_response('uber', response.status_code, response.headers)
+
             # Check for errors
             if response.status_code == 401:
                 error_msg = "Uber API authentication failed."
@@ -49,6 +49,9 @@ class RideShareHandler(DomainHandler):
         # - route: Origin/destination coordinates
     """
 
+    # Query model (used to rebuild logged queries for cache warm-up)
+    query_type = RideQuery
+
     def __init__(
         self,
         cache_service: Optional[Any] = None,
@@ -71,6 +74,9 @@ class RideShareHandler(DomainHandler):
         super().__init__(cache_service, geocoding_service)
         self.rate_limiter = rate_limiter
 
+        # Cached results come back as RideEstimate objects
+        self._register_cache_types(RideEstimate)
+
         # Initialize domain-specific components
         self.parser = RideShareIntentParser()
         self.comparator = RideShareComparator()
@@ -171,37 +177,83 @@ class RideShareHandler(DomainHandler):
             - Cache TTL: 5 minutes (configured in cache service)
             - Returns all vehicle types from each provider
         """
-        estimates = []
-
         # Geocode origin and destination
         if not self.geocoder:
             raise ValueError("Geocoding service required for ride-share handler")
 
-        origin_lat, origin_lng, origin_formatted = self.geocoder.geocode(query.origin)
-        dest_lat, dest_lng, dest_formatted = self.geocoder.geocode(query.destination)
+        (origin_lat, origin_lng, origin_formatted), (dest_lat, dest_lng, dest_formatted) = \
+            self._geocode_many([query.origin, query.destination])
 
         # Generate cache key from coordinates
         cache_key = None
         if self.cache:
             cache_key = self._generate_cache_key(
                 origin_lat, origin_lng,
-                dest_lat, dest_lng
+                dest_lat, dest_lng,
+                query=query,
+                providers=query.providers
             )
-            cached = self.cache.get(cache_key)
-            if cached:
-                return cached
+
+        # Cache hit, or one coalesced provider round trip per route.
+        # "No estimates" is cached briefly, unless it came from provider errors.
+        failures: List[str] = []
+        estimates = self._get_or_fetch(
+            cache_key,
+            lambda: self._fetch_from_providers(
+                query,
+                origin_lat, origin_lng,
+                dest_lat, dest_lng,
+                failures
+            ),
+            domain='rideshare',
+            cache_empty=lambda: not failures
+        )
+
+        if not estimates:
+            raise Exception("No estimates available from any provider")
+
+        return estimates
+
+    def _fetch_from_providers(
+        self,
+        query: RideQuery,
+        origin_lat: float,
+        origin_lng: float,
+        dest_lat: float,
+        dest_lng: float,
+        failures: Optional[List[str]] = None
+    ) -> List[RideEstimate]:
+        """
+        Query each requested provider and enrich the estimates.
+
+        Args:
+            query: RideQuery with the providers to compare
+            origin_lat: Origin latitude
+            origin_lng: Origin longitude
+            dest_lat: Destination latitude
+            dest_lng: Destination longitude
+            failures: Optional list that receives the names of providers
+                that raised or have no client (so an empty result is not
+                cached as "no estimates")
+
+        Returns:
+            List of RideEstimate objects (empty if every provider failed)
+        """
+        estimates = []
 
         # Fetch from each requested provider
         for provider_name in query.providers:
             provider_name_lower = provider_name.lower()
 
             if provider_name_lower not in self.clients:
+                if failures is not None:
+                    failures.append(provider_name)
                 continue
 
             try:
                 # Rate limit check before API call
                 if self.rate_limiter:
-                    self.rate_limiter.acquire(provider_name_lower)
+                    self.rate_limiter.wait_if_needed(provider_name_lower)
 
                 client = self.clients[provider_name_lower]
 
@@ -217,6 +269,8 @@ class RideShareHandler(DomainHandler):
 
             except Exception as e:
                 # Log error but continue with other providers
+                if failures is not None:
+                    failures.append(provider_name)
                 print(f"Warning: Failed to fetch from {provider_name}: {e}")
                 continue
 
@@ -246,13 +300,6 @@ class RideShareHandler(DomainHandler):
             if estimate.surge_multiplier > 1.0:
                 estimate.surge = estimate.surge_multiplier
 
-        # Cache results
-        if self.cache and cache_key and estimates:
-            self.cache.set(cache_key, estimates)
-
-        if not estimates:
-            raise Exception("No estimates available from any provider")
-
         return estimates
 
     def compare_options(
@@ -402,22 +449,37 @@ class RideShareHandler(DomainHandler):
         origin_lat: float,
         origin_lng: float,
         dest_lat: float,
-        dest_lng: float
+        dest_lng: float,
+        query: Optional[RideQuery] = None,
+        providers: Optional[List[str]] = None
     ) -> str:
         """
-        Generate cache key from coordinates.
+        Generate cache key from coordinates and the providers compared.
+
+        Origin and destination are bucketed into geohash cells (see
+        CacheKeyBuilder), so nearby requests for the same route and
+        provider set share an entry. Provider order and case do not
+        matter. The vehicle type is left out: every vehicle type of each
+        provider is fetched and cached.
 
         Args:
             origin_lat: Origin latitude
             origin_lng: Origin longitude
             dest_lat: Destination latitude
             dest_lng: Destination longitude
+            query: Optional query, recorded in the cache query log
+            providers: Providers the results come from
 
         Returns:
-            Cache key string (MD5 hash of coordinates)
+            Cache key string (MD5 hash of the canonical key)
         """
         import hashlib
-        key_str = f"{origin_lat:.4f},{origin_lng:.4f},{dest_lat:.4f},{dest_lng:.4f}"
+        key_str = self._cache_key(
+            'rideshare',
+            [(origin_lat, origin_lng), (dest_lat, dest_lng)],
+            query=query,
+            providers=providers
+        )
         return hashlib.md5(key_str.encode()).hexdigest()[:16]
 
     def __repr__(self) -> str:
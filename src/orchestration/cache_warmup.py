@@ -0,0 +1,307 @@
+"""
+Cache warm-up from a recorded query log.
+
+After a deploy the cache starts empty, so the first wave of traffic pays
+full upstream latency and cost. CacheWarmer replays the most popular
+recent queries from the query log (see CacheService's query_log argument)
+through the domain handlers' fetch_options(), which leaves their results
+in the cache. Replays draw from a dedicated rate limit bucket, run in the
+background-warmup priority lane and stop touching a provider once its own
+bucket runs low, so live traffic keeps its budget.
+
+Command:
+    python src/orchestration/cache_warmup.py data/query_log.jsonl --top 100
+"""
+
+import os
+import sys
+import time
+from collections import OrderedDict
+from threading import Thread
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.cache_keys import CacheKeyBuilder, load_query_log, paused_recording
+from core.rate_limiter import priority_lane
+
+
+class CacheWarmer:
+    """
+    Replays top queries from a query log to fill the cache.
+
+    Features:
+    - Top-N (query, location) pairs by frequency, most recent first on ties
+    - Only records newer than max_age_seconds
+    - Paced by its own rate limit bucket (budget_api)
+    - Skips a domain once any of its providers' buckets drops below the
+      reserve fraction of capacity
+    - Overall deadline, optionally in a background thread
+
+    Usage:
+        warmer = CacheWarmer(
+            {'restaurants': restaurant_handler, 'rideshare': rideshare_handler},
+            rate_limiter=limiter
+        )
+        stats = warmer.warm_from_log("data/query_log.jsonl", top_n=100)
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Any],
+        rate_limiter: Optional[Any] = None,
+        budget: Tuple[int, int] = (30, 60),
+        budget_api: str = 'cache_warmup',
+        reserve: float = 0.2,
+        keys: Optional[CacheKeyBuilder] = None
+    ):
+        """
+        Initialize warmer.
+
+        Args:
+            handlers: Domain name -> handler with fetch_options() and a
+                query_type dataclass the logged queries are rebuilt as
+            rate_limiter: Optional RateLimiter; without one replays are
+                limited only by top_n and the deadline
+            budget: (max_requests, time_window) for the budget_api bucket,
+                added to the rate limiter if it has none
+            budget_api: Rate limit bucket charged once per replay
+            reserve: Fraction of a provider bucket's capacity left for live
+                traffic (0 disables the check)
+            keys: Key builder used to group equivalent queries
+                (default: CacheKeyBuilder())
+        """
+        self.handlers = handlers
+        self.rate_limiter = rate_limiter
+        self.budget_api = budget_api
+        self.reserve = reserve
+        self.keys = keys or CacheKeyBuilder()
+
+        if rate_limiter is not None and budget_api not in rate_limiter.buckets:
+            rate_limiter.add_limit(budget_api, max_requests=budget[0], time_window=budget[1])
+
+    def select(
+        self,
+        records: Iterable[Dict],
+        top_n: int = 100,
+        max_age_seconds: Optional[float] = 7 * 86400,
+        now: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Pick the queries worth replaying.
+
+        Records are grouped by canonical key, so near-identical queries
+        count together; each group is replayed once using its most recent
+        query.
+
+        Args:
+            records: Query log records (see load_query_log())
+            top_n: Maximum number of queries to return
+            max_age_seconds: Ignore records older than this (None = all)
+            now: Current time (default: time.time())
+
+        Returns:
+            Records ordered by popularity, most recent first on ties
+        """
+        now = time.time() if now is None else now
+        groups: Dict[str, Dict] = OrderedDict()
+
+        for record in records:
+            domain = record.get('domain')
+            if domain not in self.handlers or not isinstance(record.get('query'), dict):
+                continue
+            if max_age_seconds is not None and record.get('ts', 0) < now - max_age_seconds:
+                continue
+
+            key = self.keys.key_for(domain, record['points'], record['fields'])
+            group = groups.get(key)
+            if group is None:
+                groups[key] = {'count': 1, 'record': record}
+            else:
+                group['count'] += 1
+                if record.get('ts', 0) >= group['record'].get('ts', 0):
+                    group['record'] = record
+
+        ranked = sorted(
+            groups.values(),
+            key=lambda group: (group['count'], group['record'].get('ts', 0)),
+            reverse=True
+        )
+        return [group['record'] for group in ranked[:top_n]]
+
+    def warm(self, records: List[Dict], deadline_seconds: Optional[float] = 600) -> Dict:
+        """
+        Replay records through their domain handlers.
+
+        Args:
+            records: Records to replay, in order (see select())
+            deadline_seconds: Stop after this long (None = no limit)
+
+        Returns:
+            Statistics: selected, warmed, failed, skipped_reserve, stopped
+            ('deadline' or 'budget' when cut short), per-domain warmed
+            counts and elapsed_seconds
+        """
+        start = time.time()
+        stats = {
+            'selected': len(records),
+            'warmed': 0,
+            'failed': 0,
+            'skipped_reserve': 0,
+            'stopped': None,
+            'domains': {},
+            'elapsed_seconds': 0.0,
+        }
+
+        for record in records:
+            remaining = None
+            if deadline_seconds is not None:
+                remaining = deadline_seconds - (time.time() - start)
+                if remaining <= 0:
+                    stats['stopped'] = 'deadline'
+                    break
+
+            domain = record['domain']
+            handler = self.handlers[domain]
+
+            if not self._has_reserve(handler):
+                stats['skipped_reserve'] += 1
+                continue
+
+            if self.rate_limiter is not None and not self.rate_limiter.acquire(self.budget_api, timeout=remaining):
+                stats['stopped'] = 'budget'
+                break
+
+            try:
+                # Replays must not count as fresh traffic in the query log,
+                # and yield provider tokens to live requests
+                with paused_recording(), priority_lane('background-warmup'):
+                    handler.fetch_options(handler.query_type(**record['query']))
+                stats['warmed'] += 1
+                stats['domains'][domain] = stats['domains'].get(domain, 0) + 1
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"Warning: cache warm-up of {domain} query failed: {e}")
+
+        stats['elapsed_seconds'] = round(time.time() - start, 2)
+        return stats
+
+    def warm_from_log(
+        self,
+        path: str,
+        top_n: int = 100,
+        max_age_seconds: Optional[float] = 7 * 86400,
+        deadline_seconds: Optional[float] = 600
+    ) -> Dict:
+        """
+        Select the top queries from a query log file and replay them.
+
+        Args:
+            path: Query log (JSON Lines)
+            top_n: Maximum number of queries to replay
+            max_age_seconds: Ignore records older than this (None = all)
+            deadline_seconds: Stop after this long (None = no limit)
+
+        Returns:
+            Statistics (see warm()); an unreadable log warms nothing
+        """
+        try:
+            records = self.select(load_query_log(path), top_n, max_age_seconds)
+        except IOError as e:
+            print(f"Warning: cannot read query log {path}: {e}")
+            records = []
+        return self.warm(records, deadline_seconds)
+
+    def start(self, path: str, **kwargs) -> Thread:
+        """
+        Warm from a query log in a daemon thread (for startup hooks).
+
+        Args:
+            path: Query log (JSON Lines)
+            **kwargs: Passed to warm_from_log()
+
+        Returns:
+            The started thread
+        """
+        def run():
+            stats = self.warm_from_log(path, **kwargs)
+            print(f"Cache warm-up finished: {stats['warmed']} of {stats['selected']} queries "
+                  f"in {stats['elapsed_seconds']}s")
+
+        thread = Thread(target=run, name="cache-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _has_reserve(self, handler: Any) -> bool:
+        """Check every provider bucket the handler uses is above the reserve."""
+        if self.rate_limiter is None or self.reserve <= 0:
+            return True
+
+        for api_name in getattr(handler, 'clients', {}):
+            bucket = self.rate_limiter.buckets.get(api_name)
+            if bucket is not None and bucket.available_tokens() < bucket.config.max_requests * self.reserve:
+                return False
+        return True
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, src_dir)
+    sys.path.insert(0, os.path.dirname(src_dir))
+    from api.cost_tracker import BILLING_TIMEZONE, GOOGLE_PLACES_PRICING, CostTracker
+    from core import CacheService, GeocodingService, RateLimiter
+    from core.cache_backends import create_backend
+    from core.gazetteer import default_gazetteer
+    from core.location_normalizer import LocationNormalizer
+    from core.rate_limit_stores import create_bucket_store
+    from domains.restaurants.handler import RestaurantHandler
+    from domains.rideshare.handler import RideShareHandler
+
+    parser = argparse.ArgumentParser(description="Warm the cache from a recorded query log")
+    parser.add_argument("log", help="Query log (JSON Lines, see CACHE_QUERY_LOG)")
+    parser.add_argument("--top", type=int, default=100, help="Number of queries to replay")
+    parser.add_argument("--max-age-hours", type=float, default=168, help="Ignore older queries")
+    parser.add_argument("--deadline", type=float, default=600, help="Stop after this many seconds")
+    parser.add_argument("--budget", type=int, default=30, help="Replays allowed per minute")
+
+    args = parser.parse_args()
+
+    cache = CacheService(backend=create_backend(os.environ.get('CACHE_BACKEND', 'file')))
+    # Same bucket store and monthly quota as the server (api/app.py), so
+    # replays spend the shared budget and the reserve check sees live traffic
+    limiter = RateLimiter(store=create_bucket_store(os.environ.get('RATE_LIMIT_STORE', 'file')))
+    cost_tracker = CostTracker(data_dir="./cost_data")
+    places_quota = int(os.environ.get(
+        'GOOGLE_PLACES_MONTHLY_QUOTA', GOOGLE_PLACES_PRICING['text_search_pro']['free_cap']
+    ))
+    if places_quota > 0:
+        limiter.add_quota(
+            'google_places',
+            places_quota,
+            period='month',
+            tz=BILLING_TIMEZONE.key,
+            usage=lambda: cost_tracker.monthly_count('text_search_pro')
+        )
+    geocoder = GeocodingService(
+        cache=cache,
+        gazetteer=default_gazetteer(),
+        rate_limiter=limiter,
+        normalizer=LocationNormalizer(alias_path=os.environ.get('GEOCODE_ALIASES', 'data/geocode_aliases.json'))
+    )
+
+    warmer = CacheWarmer(
+        {
+            'restaurants': RestaurantHandler(cache_service=cache, geocoding_service=geocoder, rate_limiter=limiter),
+            'rideshare': RideShareHandler(cache_service=cache, geocoding_service=geocoder, rate_limiter=limiter),
+        },
+        rate_limiter=limiter,
+        budget=(args.budget, 60)
+    )
+    stats = warmer.warm_from_log(
+        args.log,
+        top_n=args.top,
+        max_age_seconds=args.max_age_hours * 3600,
+        deadline_seconds=args.deadline
+    )
+    print(json.dumps(stats, indent=2))
@@ -0,0 +1,97 @@
+"""Benchmark encode/decode throughput of the cache value serializer and compressor.
+
+Usage:
+    python tests/benchmark_cache_codec.py
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import json
+import time
+from datetime import datetime
+
+from core.cache_codec import DataclassSerializer, EntryCompressor
+from domains.restaurants.models import Restaurant
+from domains.rideshare.models import RideEstimate
+
+
+def make_restaurants(count: int = 10):
+    """Restaurant list shaped like a Google Places result page."""
+    return [
+        Restaurant(
+            provider='google_places',
+            name=f"Restaurant {i}",
+            cuisine='Italian',
+            rating=4.2,
+            review_count=1200 + i,
+            price_range='$$',
+            address=f"{i} Broadway, New York, NY 10001, USA",
+            distance_miles=0.4,
+            phone='(212) 555-0100',
+            website='https://example.com',
+            hours='Monday: 11:00 AM – 10:00 PM | Tuesday: 11:00 AM – 10:00 PM',
+            is_open_now=True,
+            coordinates=(40.7580 + i / 1000, -73.9855),
+            photos=[f"https://places.googleapis.com/v1/places/{i}/photos/{p}/media" for p in range(5)],
+        )
+        for i in range(count)
+    ]
+
+
+def make_estimates(count: int = 6):
+    """RideEstimate list shaped like an Uber + Lyft comparison."""
+    return [
+        RideEstimate(
+            provider='Uber' if i % 2 else 'Lyft',
+            vehicle_type=f"Type {i}",
+            price_low=30.0 + i,
+            price_high=40.0 + i,
+            price_estimate=35.0 + i,
+            duration_minutes=27,
+            pickup_eta_minutes=4,
+            distance_miles=16.2,
+            origin_coords=(40.7580, -73.9855),
+            destination_coords=(40.6413, -73.7781),
+            last_updated=datetime.now(),
+        )
+        for i in range(count)
+    ]
+
+
+def bench(label: str, func, iterations: int):
+    """Run func repeatedly and print operations per second."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {iterations / elapsed:>12,.0f} ops/sec  ({elapsed / iterations * 1e6:,.1f} µs/op)")
+
+
+def main(iterations: int = 5000):
+    serializer = DataclassSerializer()
+    serializer.register(Restaurant)
+    serializer.register(RideEstimate)
+
+    for label, value in (("10 x Restaurant", make_restaurants()), ("6 x RideEstimate", make_estimates())):
+        encoded = serializer.encode(value)
+        text = json.dumps(encoded, separators=(',', ':'))
+        print(f"\n{label}: {len(text):,} bytes encoded")
+
+        bench(f"{label} encode", lambda: serializer.encode(value), iterations)
+        bench(f"{label} decode", lambda: serializer.decode(encoded), iterations)
+        bench(f"{label} encode + json.dumps", lambda: json.dumps(serializer.encode(value), separators=(',', ':')), iterations)
+        bench(f"{label} json.loads + decode", lambda: serializer.decode(json.loads(text)), iterations)
+
+    # Compression of a full Places-sized page (60 results)
+    text = json.dumps(serializer.encode(make_restaurants(60)), separators=(',', ':'))
+    for codec in sorted(EntryCompressor.CODECS):
+        compressor = EntryCompressor(codec=codec, threshold=0)
+        stored = compressor.pack(text)
+        print(f"\n{codec}: {len(text):,} -> {len(stored):,} bytes ({len(text) / len(stored):.1f}x)")
+        bench(f"{codec} pack", lambda: compressor.pack(text), iterations // 10)
+        bench(f"{codec} unpack", lambda: compressor.unpack(stored), iterations // 10)
+
+
+if __name__ == '__main__':
+    main()
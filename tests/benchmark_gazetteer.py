@@ -0,0 +1,62 @@
+"""Benchmark gazetteer lookups per second.
+
+Forward lookups (exact name/alias), prefix suggestions and reverse lookups
+(nearest place to a coordinate) against the bundled NYC gazetteer. Reverse
+lookups through the k-d tree are compared with a linear scan of every
+place; either way no request waits on Nominatim's 1 request/second limit.
+
+Usage:
+    python tests/benchmark_gazetteer.py
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import random
+import time
+from typing import Callable, List
+
+from core.gazetteer import Gazetteer, haversine_km
+
+
+ITERATIONS = 50000
+
+
+def linear_nearest(gazetteer: Gazetteer, lat: float, lon: float):
+    """Nearest place by checking every place (the tree's baseline)."""
+    return min(gazetteer.places, key=lambda place: haversine_km(lat, lon, place.lat, place.lon))
+
+
+def rate(fn: Callable, inputs: List) -> float:
+    """Calls per second of fn over inputs, cycled ITERATIONS times."""
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        fn(inputs[i % len(inputs)])
+    return ITERATIONS / (time.perf_counter() - start)
+
+
+def main():
+    random.seed(0)
+    start = time.perf_counter()
+    gazetteer = Gazetteer.from_file()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    names = [place.name for place in gazetteer.places]
+    spelled = [name.upper() + '!' for name in names]
+    prefixes = ["Times Sq", "Grand Centr", "Metropolitan Mus", "Brooklyn Br", "Yankee St"]
+    points = [(random.uniform(40.55, 40.90), random.uniform(-74.15, -73.75)) for _ in range(1000)]
+
+    print(f"{len(gazetteer)} places loaded in {load_ms:.1f} ms; {ITERATIONS} lookups each")
+    print(f"{'lookup':<28}{'per second':>14}")
+    for label, fn, inputs in (
+        ('exact name', gazetteer.lookup, names),
+        ('name, other case/punct.', gazetteer.lookup, spelled),
+        ('prefix suggestions', gazetteer.suggest, prefixes),
+        ('reverse, k-d tree', lambda p: gazetteer.nearest(*p), points),
+        ('reverse, linear scan', lambda p: linear_nearest(gazetteer, *p), points),
+    ):
+        print(f"{label:<28}{rate(fn, inputs):>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
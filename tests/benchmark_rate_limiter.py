@@ -0,0 +1,100 @@
+"""Benchmark token bucket acquisition latency and jitter under contention.
+
+THREADS threads repeatedly wait for one token from a shared, empty bucket.
+With fair (FIFO) queueing every wait_and_acquire() call takes about
+THREADS / RATE seconds; unfair wake-ups show up as a wide spread, with some
+callers served almost at once and others starved. The queued implementation
+is compared with the previous 100ms polling loop.
+
+Usage:
+    python tests/benchmark_rate_limiter.py
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional, Type
+
+from core.rate_limiter import RateLimitConfig, TokenBucket
+
+
+THREADS = 50
+RATES = (500, 100)   # Tokens per second
+GRANTS_PER_THREAD = 6
+
+
+class PollingTokenBucket(TokenBucket):
+    """The previous wait_and_acquire(): re-check at most every 100ms."""
+
+    def wait_and_acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        start_time = time.time()
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self._total_requests += 1
+                    return True
+                if timeout and (time.time() - start_time) >= timeout:
+                    return False
+                wait_seconds = (tokens - self.tokens) / self.config.tokens_per_second
+            time.sleep(min(wait_seconds, 0.1))
+
+
+def run(bucket_type: Type[TokenBucket], rate: float) -> Dict:
+    """Contend for one empty bucket; return per-call latency figures in ms."""
+    bucket = bucket_type(RateLimitConfig(max_requests=1, time_window=1 / rate, name='bench'))
+    bucket.acquire(1)
+
+    latencies: List[float] = []
+    latencies_lock = threading.Lock()
+    start = threading.Event()
+
+    def worker():
+        start.wait()
+        for _ in range(GRANTS_PER_THREAD):
+            called = time.perf_counter()
+            bucket.wait_and_acquire(1)
+            with latencies_lock:
+                latencies.append((time.perf_counter() - called) * 1000)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+
+    t0 = time.perf_counter()
+    start.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t0
+
+    # The first round fills the queue; measure the steady state after it
+    steady = sorted(latencies[THREADS:])
+    return {
+        'elapsed_s': elapsed,
+        'p50': statistics.median(steady),
+        'p99': steady[int(len(steady) * 0.99) - 1],
+        'min': steady[0],
+        'max': steady[-1],
+        'stdev': statistics.pstdev(steady),
+    }
+
+
+def main():
+    print(f"{THREADS} threads x {GRANTS_PER_THREAD} acquisitions, latency per call (ms)")
+    print(f"{'rate':>8}  {'implementation':<15}{'elapsed':>9}{'ideal':>8}{'p50':>9}{'p99':>9}"
+          f"{'min':>9}{'max':>9}{'stdev':>9}")
+
+    for rate in RATES:
+        ideal = THREADS / rate * 1000
+        for name, bucket_type in (('polling (old)', PollingTokenBucket), ('queued', TokenBucket)):
+            r = run(bucket_type, rate)
+            print(f"{rate:>6}/s  {name:<15}{r['elapsed_s']:>8.2f}s{ideal:>8.0f}"
+                  f"{r['p50']:>9.1f}{r['p99']:>9.1f}{r['min']:>9.1f}{r['max']:>9.1f}{r['stdev']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""tests/test_cache_backends.py
+
+Contract tests run against every cache storage backend.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from core.cache_backends import (
+    FileCacheBackend,
+    LocalRedis,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+    create_backend,
+)
+from core.cache_service import CacheService
+
+
+@pytest.fixture(params=['file', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    """Each backend implementation, empty."""
+    if request.param == 'file':
+        return FileCacheBackend(str(tmp_path / "files"))
+    if request.param == 'sqlite':
+        return SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    return RedisCacheBackend(LocalRedis())
+
+
+def test_read_write_delete(backend):
+    """Test the basic entry lifecycle."""
+    assert backend.read("a" * 32) is None
+
+    size = backend.write("a" * 32, '{"v":1}')
+    assert size == 7
+    assert backend.read("a" * 32) == '{"v":1}'
+
+    assert backend.delete("a" * 32) is True
+    assert backend.read("a" * 32) is None
+    assert backend.delete("a" * 32) is False
+
+
+def test_read_write_many(backend):
+    """Test batched reads and writes, including missing keys and overwrites."""
+    backend.write("a" * 32, "old")
+    sizes = backend.write_many({"a" * 32: "x" * 4, "restaurants/" + "b" * 32: "y" * 6})
+
+    assert sizes == {"a" * 32: 4, "restaurants/" + "b" * 32: 6}
+    assert backend.read_many(["a" * 32, "c" * 32, "restaurants/" + "b" * 32]) == {
+        "a" * 32: "x" * 4,
+        "restaurants/" + "b" * 32: "y" * 6,
+    }
+    assert backend.read_many([]) == {}
+    assert backend.namespace_totals() == {None: (1, 4), 'restaurants': (1, 6)}
+
+
+def test_totals_follow_writes(backend):
+    """Test per-namespace entry counts and bytes track overwrites and deletes."""
+    backend.write("a" * 32, "x" * 10)
+    backend.write("restaurants/" + "b" * 32, "y" * 20)
+    backend.write("restaurants/" + "b" * 32, "y" * 5)  # Overwrite shrinks it
+
+    assert backend.namespace_totals() == {None: (1, 10), 'restaurants': (1, 5)}
+    assert backend.entry_count() == 2
+    assert backend.total_bytes() == 15
+
+    backend.delete("a" * 32)
+    assert backend.namespace_totals() == {'restaurants': (1, 5)}
+
+
+def test_clear_namespace(backend):
+    """Test clearing one namespace leaves the others."""
+    backend.write("restaurants/" + "a" * 32, "1")
+    backend.write("restaurants/" + "b" * 32, "2")
+    backend.write("geocoding/" + "a" * 32, "3")
+
+    assert backend.clear("restaurants") == 2
+    assert sorted(backend.keys()) == ["geocoding/" + "a" * 32]
+    assert backend.clear() == 1
+    assert backend.entry_count() == 0
+
+
+def test_evict_least_recently_used(backend):
+    """Test eviction removes the namespace's least recently used entries."""
+    keys = [f"restaurants/{c * 32}" for c in "abc"]
+    for key in keys:
+        backend.write(key, "v")
+        time.sleep(0.01)
+    backend.touch(keys[0])
+
+    assert backend.evict("restaurants", max_entries=2) == [keys[1]]
+    assert backend.evict("restaurants", max_entries=2) == []
+    assert backend.read(keys[0]) == "v"
+
+
+def test_reconcile_visits_entries(backend):
+    """Test reconcile reports every entry and no drift after normal use."""
+    backend.write("a" * 32, "1")
+    backend.write("rideshare/" + "b" * 32, "22")
+    seen = {}
+
+    result = backend.reconcile(visit=lambda key, size, mtime: seen.update({key: size}))
+
+    assert seen == {"a" * 32: 1, "rideshare/" + "b" * 32: 2}
+    assert result['entries'] == 2
+    assert result['drift_entries'] == 0
+    assert backend.last_reconciled is not None
+
+
+def test_cache_service_ttl_semantics(backend, tmp_path):
+    """Test CacheService behaves the same on every backend."""
+    cache = CacheService(base_dir=str(tmp_path / "svc"), backend=backend, memory_max_entries=0)
+
+    cache.set("short", "v", ttl=1)
+    cache.set("long", {"n": 1}, domain="restaurants")
+    assert cache.get("short") == "v"
+    assert cache.get("long", domain="restaurants") == {"n": 1}
+
+    time.sleep(1.1)
+    assert cache.get("short") is None
+    assert cache.stats()['cache_files'] == 1
+    assert cache.stats()['backend'] == backend.name
+
+    assert cache.clear(domain="restaurants") == 1
+
+
+def test_cache_service_batch_round_trip(backend, tmp_path):
+    """Test get_many()/set_many() on every backend."""
+    cache = CacheService(base_dir=str(tmp_path / "svc"), backend=backend, memory_max_entries=0)
+
+    assert cache.set_many({"a": [1], "b": {"n": 2}}, domain="rideshare") == 2
+    assert cache.get_many(["a", "b", "c"], domain="rideshare") == {"a": [1], "b": {"n": 2}}
+    assert cache.get("a", domain="rideshare") == [1]
+
+
+def test_redis_concurrent_overwrites_keep_totals():
+    """Test racing writers and deleters leave Redis byte totals matching the entries."""
+    import threading
+
+    backend = RedisCacheBackend(LocalRedis())
+    keys = [f"restaurants/{c * 32}" for c in "abcd"]
+
+    def worker(seed):
+        for i in range(50):
+            key = keys[(seed + i) % len(keys)]
+            if i % 7 == 0:
+                backend.delete(key)
+            else:
+                backend.write_many({key: "x" * ((seed * 13 + i) % 40 + 1)})
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored = backend.read_many(keys)
+    expected = (len(stored), sum(len(text) for text in stored.values()))
+    assert backend.namespace_totals().get('restaurants', (0, 0)) == expected
+    assert sorted(backend.keys('restaurants')) == sorted(stored)
+
+
+def _sqlite_worker(path, worker, count):
+    cache = CacheService(
+        base_dir=str(Path(path).parent), backend=SQLiteCacheBackend(path), memory_max_entries=0
+    )
+    for i in range(count):
+        cache.set(f"w{worker}-{i}", [worker, i], domain="rideshare")
+
+
+def test_memory_hits_touch_backend_in_batches(backend, tmp_path):
+    """Test memory-tier hits reach the backend LRU in one batch, before eviction."""
+    cache = CacheService(base_dir=str(tmp_path / "svc"), backend=backend)
+    touched = []
+    backend.touch_many = lambda keys, touch_many=backend.touch_many: (touched.append(list(keys)), touch_many(keys))
+
+    cache.set("a", "1", domain="restaurants")
+    time.sleep(0.01)
+    cache.set("b", "2", domain="restaurants")
+    for _ in range(10):
+        assert cache.get("a", domain="restaurants") == "1"
+    assert touched == []
+
+    cache.quotas['restaurants'] = (2, None)
+    cache.set("c", "3", domain="restaurants")   # Flushes, then evicts "b"
+
+    assert touched == [[cache._storage_key("a", "restaurants")]]
+    assert cache.get("a", domain="restaurants") == "1"
+    assert cache.get("b", domain="restaurants") is None
+
+
+def test_sqlite_locked_database_degrades(tmp_path):
+    """Test a write-locked database surfaces as IOError and a miss, not OperationalError."""
+    import sqlite3
+
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SQLiteCacheBackend(path, timeout=0.05)
+    cache = CacheService(base_dir=str(tmp_path / "svc"), backend=backend, memory_max_entries=0)
+    cache.set("expired", "v", ttl=1)
+    time.sleep(1.1)
+
+    locker = sqlite3.connect(path, isolation_level=None)
+    locker.execute("BEGIN EXCLUSIVE")
+    try:
+        for operation in (
+            lambda: backend.delete("a" * 32),
+            lambda: backend.clear(),
+            lambda: backend.evict(None, max_entries=0),
+        ):
+            with pytest.raises(IOError):
+                operation()
+        backend.touch("a" * 32)   # Best effort: no error
+
+        assert cache.get("expired") is None
+    finally:
+        locker.execute("ROLLBACK")
+        locker.close()
+
+
+def test_sqlite_shared_between_processes(tmp_path):
+    """Test several processes can write one SQLite cache concurrently."""
+    path = str(tmp_path / "shared.sqlite3")
+    SQLiteCacheBackend(path)  # Create the schema up front
+
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_sqlite_worker, args=(path, w, 50)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    cache = CacheService(base_dir=str(tmp_path), backend=SQLiteCacheBackend(path))
+    assert cache.stats()['namespaces']['rideshare']['entries'] == 200
+    assert cache.get("w3-49", domain="rideshare") == [3, 49]
+
+
+def test_create_backend(tmp_path):
+    """Test backend specs map to implementations."""
+    assert isinstance(create_backend('file', str(tmp_path)), FileCacheBackend)
+    assert isinstance(create_backend('sqlite', str(tmp_path)), SQLiteCacheBackend)
+    assert isinstance(create_backend('local-redis'), RedisCacheBackend)
+
+    with pytest.raises(ValueError):
+        create_backend('memcached')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
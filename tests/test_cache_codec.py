@@ -0,0 +1,235 @@
+"""tests/test_cache_codec.py
+
+Unit tests for cache value serializers.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import pytest
+from dataclasses import dataclass
+from datetime import datetime
+from core.cache_codec import CacheCodecError, DataclassSerializer, EntryCompressor, JSONSerializer
+from core.cache_service import CacheService
+from domains.restaurants.models import Restaurant
+from domains.rideshare.models import RideEstimate
+
+
+@pytest.fixture
+def serializer():
+    """Serializer with the domain models registered."""
+    serializer = DataclassSerializer()
+    serializer.register(Restaurant)
+    serializer.register(RideEstimate)
+    return serializer
+
+
+def sample_estimate():
+    """A RideEstimate with tuples and a datetime."""
+    return RideEstimate(
+        provider="Uber",
+        vehicle_type="UberX",
+        price_low=35.0,
+        price_high=45.0,
+        price_estimate=40.16,
+        origin_coords=(40.7580, -73.9855),
+        destination_coords=(40.6413, -73.7781),
+        last_updated=datetime(2025, 1, 15, 18, 30, 0)
+    )
+
+
+def test_round_trip_ride_estimates(serializer):
+    """Test RideEstimate lists round-trip with tuples and datetimes intact."""
+    estimates = [sample_estimate(), sample_estimate()]
+
+    decoded = serializer.decode(serializer.encode(estimates))
+
+    assert decoded == estimates
+    assert isinstance(decoded[0], RideEstimate)
+    assert decoded[0].origin_coords == (40.7580, -73.9855)
+    assert decoded[0].last_updated == datetime(2025, 1, 15, 18, 30, 0)
+
+
+def test_round_trip_restaurants(serializer):
+    """Test Restaurant lists round-trip including nested lists."""
+    restaurant = Restaurant(
+        provider="google_places",
+        name="Joe's Pizza",
+        rating=4.5,
+        coordinates=(40.7306, -74.0021),
+        photos=["https://example.com/1.jpg", "https://example.com/2.jpg"],
+        categories=["pizza"]
+    )
+
+    decoded = serializer.decode(serializer.encode([restaurant]))
+
+    assert decoded == [restaurant]
+    assert decoded[0].coordinates == (40.7306, -74.0021)
+
+
+def test_encoding_is_positional(serializer):
+    """Test dataclasses encode as field lists, not field-name dicts."""
+    encoded = serializer.encode(sample_estimate())
+
+    assert set(encoded.keys()) == {'__dc__', 'f'}
+    assert encoded['__dc__'].startswith('RideEstimate@')
+
+
+def test_unregistered_dataclass_rejected(serializer):
+    """Test unregistered dataclasses cannot be encoded."""
+    @dataclass
+    class Unknown:
+        value: int
+
+    with pytest.raises(CacheCodecError):
+        serializer.encode(Unknown(1))
+
+
+def test_changed_model_shape_fails_to_decode(serializer):
+    """Test entries written for an older model shape are rejected."""
+    encoded = serializer.encode(sample_estimate())
+    encoded['__dc__'] = 'RideEstimate@00000000'
+
+    with pytest.raises(CacheCodecError):
+        serializer.decode(encoded)
+
+
+def test_register_requires_dataclass(serializer):
+    """Test only dataclasses can be registered."""
+    with pytest.raises(TypeError):
+        serializer.register(dict)
+
+
+def test_json_serializer_passthrough():
+    """Test plain JSON serializer leaves values untouched."""
+    serializer = JSONSerializer()
+    assert serializer.encode({"a": [1, 2]}) == {"a": [1, 2]}
+    assert serializer.decode({"a": [1, 2]}) == {"a": [1, 2]}
+
+
+def test_cache_service_stores_model_objects(tmp_path):
+    """Test CacheService caches and returns real model objects."""
+    cache = CacheService(base_dir=str(tmp_path))
+    cache.register_type(RideEstimate)
+
+    estimates = [sample_estimate()]
+    assert cache.set("rides", estimates, ttl=300) is True
+
+    # Fresh instance reads from disk
+    reader = CacheService(base_dir=str(tmp_path))
+    reader.register_type(RideEstimate)
+    cached = reader.get("rides")
+
+    assert cached == estimates
+    assert isinstance(cached[0], RideEstimate)
+
+
+def test_cache_service_unregistered_type_not_cached(tmp_path):
+    """Test unregistered dataclasses are rejected by set()."""
+    cache = CacheService(base_dir=str(tmp_path))
+
+    assert cache.set("rides", [sample_estimate()]) is False
+    assert cache.get("rides") is None
+
+
+def places_payload(count=20):
+    """Serialized entry resembling a Google Places result list."""
+    import json
+
+    results = [
+        {
+            "name": f"Restaurant {i}",
+            "formattedAddress": f"{i} Carmine St, New York, NY 10014, USA",
+            "photos": [f"https://places.googleapis.com/v1/places/p{i}/photos/{j}/media" for j in range(10)],
+            "weekdayDescriptions": ["Monday: 11:00 AM - 11:00 PM"] * 7,
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"key": "k", "value": results, "created_at": 0, "ttl": 60})
+
+
+@pytest.mark.parametrize("codec", sorted(EntryCompressor.CODECS))
+def test_compressor_round_trip(codec):
+    """Test large entries are compressed with a recorded codec and restored."""
+    compressor = EntryCompressor(codec=codec, threshold=1024)
+    text = places_payload()
+
+    stored = compressor.pack(text)
+
+    assert stored.startswith(f"{codec}:")
+    assert len(stored) < len(text) / 4
+    assert compressor.unpack(stored) == text
+
+
+def test_compressor_leaves_small_and_incompressible_entries():
+    """Test entries below the threshold or that do not shrink stay plain JSON."""
+    import base64
+    import os
+
+    compressor = EntryCompressor(threshold=100)
+    small = '{"value": 1}'
+    noise = '{"value": "%s"}' % base64.b85encode(os.urandom(300)).decode()
+
+    assert compressor.pack(small) == small
+    assert compressor.pack(noise) == noise
+    stats = compressor.stats()
+    assert stats['compressed'] == 0
+    assert stats['not_worth_it'] == 1
+    assert stats['ratio'] == 1.0
+
+
+def test_compressor_reads_any_codec():
+    """Test a reader configured differently (or disabled) still decodes entries."""
+    text = places_payload()
+    stored = EntryCompressor(codec='bz2', threshold=0).pack(text)
+
+    assert EntryCompressor(codec=None).unpack(stored) == text
+
+
+def test_compressor_rejects_unknown_or_corrupt_entries():
+    """Test bad headers and payloads raise CacheCodecError."""
+    compressor = EntryCompressor()
+
+    with pytest.raises(CacheCodecError):
+        compressor.unpack("snappy:abc")
+    with pytest.raises(CacheCodecError):
+        compressor.unpack("zlib:not-a-payload")
+    with pytest.raises(ValueError):
+        EntryCompressor(codec='snappy')
+
+
+def test_cache_service_compresses_large_entries(tmp_path):
+    """Test CacheService stores large entries compressed and reports the ratio."""
+    import json
+
+    cache = CacheService(base_dir=str(tmp_path), compress_threshold=1024)
+    value = json.loads(places_payload())["value"]
+
+    cache.set("places", value, domain="restaurants")
+    cache.set("small", [1, 2, 3], domain="restaurants")
+
+    stored = cache._get_cache_path("places", domain="restaurants").read_text()
+    assert stored.startswith("zlib:")
+    assert cache._get_cache_path("small", domain="restaurants").read_text().startswith("{")
+
+    reader = CacheService(base_dir=str(tmp_path), compression=None)
+    assert reader.get("places", domain="restaurants") == value
+    assert cache.get("places", domain="restaurants") == value  # Memory tier copy
+
+    compression = cache.stats()['compression']
+    assert compression['compressed'] == 1
+    assert compression['ratio'] > 2
+
+
+def test_cache_service_corrupt_compressed_entry_is_a_miss(tmp_path):
+    """Test an unreadable compressed entry is dropped like any corrupt entry."""
+    cache = CacheService(base_dir=str(tmp_path), memory_max_entries=0)
+    cache.set("key", "value")
+    cache._get_cache_path("key").write_text("zlib:garbage")
+
+    assert cache.get("key") is None
+    assert not cache._get_cache_path("key").exists()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
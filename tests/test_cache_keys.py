@@ -0,0 +1,145 @@
+"""tests/test_cache_keys.py
+
+Tests for canonical cache keys and the query-log replay report.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import json
+
+import pytest
+
+from core.cache_keys import (
+    CacheKeyBuilder,
+    exact_key,
+    geohash,
+    load_query_log,
+    normalize_field,
+    replay_report,
+)
+from core.cache_service import CacheService
+
+
+TIMES_SQUARE = (40.7580, -73.9855)
+NEAR_TIMES_SQUARE = (40.75805, -73.98545)  # ~7 m away
+JFK = (40.6413, -73.7781)
+
+
+def test_geohash_known_values():
+    """Test encoding against published geohash values."""
+    assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash(*TIMES_SQUARE, 6) == "dr5ru7"
+    assert geohash(*TIMES_SQUARE, 7).startswith(geohash(*TIMES_SQUARE, 6))
+
+
+def test_normalize_field():
+    """Test case, whitespace, missing-value and list normalization."""
+    assert normalize_field("  Italian  Food ") == "italian food"
+    assert normalize_field(None) == normalize_field("") == normalize_field([]) == "any"
+    assert normalize_field(["Vegan", "gluten free"]) == normalize_field(["Gluten  Free", "vegan"])
+    assert normalize_field(4.0) == "4"
+    assert normalize_field(True) == "true"
+
+
+def test_near_identical_queries_share_key():
+    """Test case, whitespace, field order and nearby points map to one key."""
+    keys = CacheKeyBuilder()
+
+    a = keys.build('restaurants', [TIMES_SQUARE], cuisine="Italian", price_range="$$")
+    b = keys.build('restaurants', [NEAR_TIMES_SQUARE], price_range="$$", cuisine=" italian ")
+
+    assert a == b
+    assert a != keys.build('restaurants', [TIMES_SQUARE], cuisine="Chinese", price_range="$$")
+    assert a != keys.build('restaurants', [JFK], cuisine="Italian", price_range="$$")
+
+
+def test_precision_per_domain():
+    """Test geohash precision is configured per domain."""
+    keys = CacheKeyBuilder(geo_precision={'restaurants': 5})
+
+    assert keys.build('restaurants', [TIMES_SQUARE]).endswith("@" + geohash(*TIMES_SQUARE, 5))
+    assert keys.precision_for('hotels') == CacheKeyBuilder.DEFAULT_PRECISION
+
+    with pytest.raises(ValueError):
+        CacheKeyBuilder(geo_precision={'restaurants': 0})
+
+
+def test_point_order_matters():
+    """Test origin/destination are not interchangeable."""
+    keys = CacheKeyBuilder()
+    assert keys.build('rideshare', [TIMES_SQUARE, JFK]) != keys.build('rideshare', [JFK, TIMES_SQUARE])
+
+
+def test_query_log_round_trip(tmp_path):
+    """Test built keys are recorded and read back."""
+    log = tmp_path / "queries.jsonl"
+    keys = CacheKeyBuilder(log_path=str(log))
+
+    keys.build('restaurants', [TIMES_SQUARE], cuisine="Italian")
+    with open(log, 'a') as f:
+        f.write("not json\n")
+    keys.key_for('restaurants', [JFK], {})  # Not recorded
+
+    records = list(load_query_log(str(log)))
+    assert len(records) == 1
+    assert records[0]['domain'] == 'restaurants'
+    assert records[0]['points'] == [TIMES_SQUARE]
+    assert records[0]['fields'] == {'cuisine': "Italian"}
+
+
+def test_replay_report_shows_improvement():
+    """Test the report counts hits for exact and canonical keys."""
+    records = [
+        {'ts': 0, 'domain': 'restaurants', 'points': [TIMES_SQUARE], 'fields': {'cuisine': "Italian"}},
+        {'ts': 1, 'domain': 'restaurants', 'points': [NEAR_TIMES_SQUARE], 'fields': {'cuisine': "italian"}},
+        {'ts': 2, 'domain': 'restaurants', 'points': [TIMES_SQUARE], 'fields': {'cuisine': "Italian"}},
+        {'ts': 3, 'domain': 'rideshare', 'points': [TIMES_SQUARE, JFK], 'fields': {}},
+    ]
+
+    report = replay_report(records)
+    restaurants = report['domains']['restaurants']
+
+    assert restaurants['requests'] == 3
+    assert restaurants['exact']['hits'] == 1
+    assert restaurants['exact']['keys'] == 2
+    assert restaurants['canonical']['hits'] == 2
+    assert restaurants['canonical']['keys'] == 1
+    assert restaurants['improvement_points'] == pytest.approx(33.33)
+    assert report['total']['requests'] == 4
+    assert report['total']['upstream_calls_saved'] == 1
+
+
+def test_replay_report_respects_ttl():
+    """Test entries past their domain TTL count as misses."""
+    records = [
+        {'ts': 0, 'domain': 'rideshare', 'points': [TIMES_SQUARE, JFK], 'fields': {}},
+        {'ts': 400, 'domain': 'rideshare', 'points': [TIMES_SQUARE, JFK], 'fields': {}},
+    ]
+
+    assert replay_report(records)['total']['canonical']['hits'] == 1
+    assert replay_report(records, ttls={'rideshare': 300})['total']['canonical']['hits'] == 0
+
+
+def test_exact_key_matches_old_scheme():
+    """Test exact keys keep case and 4-decimal coordinates."""
+    assert exact_key('restaurants', [TIMES_SQUARE], {'cuisine': "Italian"}) == \
+        "restaurants:cuisine=Italian:40.7580,-73.9855"
+
+
+def test_cache_service_uses_builder(tmp_path):
+    """Test CacheService exposes a builder configured from its arguments."""
+    log = tmp_path / "queries.jsonl"
+    cache = CacheService(
+        base_dir=str(tmp_path / "cache"),
+        geo_precision={'restaurants': 6},
+        query_log=str(log)
+    )
+
+    key = cache.keys.build('restaurants', [TIMES_SQUARE], cuisine="Thai")
+    assert key == "restaurants:cuisine=thai@dr5ru7"
+    assert json.loads(log.read_text())['fields'] == {'cuisine': "Thai"}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -11,7 +11,7 @@ import time
 import tempfile
 import shutil
 from pathlib import Path
-from core.cache_service import CacheService, CacheEntry, create_cache_service
+from core.cache_service import CacheService, CacheEntry, MemoryTier, create_cache_service
 
 
 @pytest.fixture
@@ -277,9 +277,10 @@ def test_cache_file_creation(temp_cache_dir):
     cache = CacheService(base_dir=temp_cache_dir)
     cache.set("test", "value")
 
-    # Check that a cache file was created
-    cache_files = list(Path(temp_cache_dir).glob("*.json"))
+    # Check that a cache file was created (in its hash-prefix shard)
+    cache_files = list(Path(temp_cache_dir).rglob("*.json"))
     assert len(cache_files) == 1
+    assert cache_files[0].parent.name == cache_files[0].stem[:2]
 
     # File should be JSON
     import json
@@ -333,5 +334,766 @@ def test_cache_hit_rate_calculation(cache):
     assert abs(stats['hit_rate_percent'] - 66.67) < 0.1
 
 
+def test_memory_tier_serves_repeat_reads(cache, temp_cache_dir):
+    """Test repeat reads are served from memory without touching the file."""
+    cache.set("hot_key", {"data": "value"})
+
+    # Remove the file behind the cache's back - memory tier still answers
+    for cache_file in Path(temp_cache_dir).rglob("*.json"):
+        cache_file.unlink()
+
+    assert cache.get("hot_key") == {"data": "value"}
+
+    tiers = cache.stats()['tiers']
+    assert tiers['memory']['hits'] == 1
+    assert tiers['disk']['hits'] == 0
+
+
+def test_memory_tier_read_through(temp_cache_dir):
+    """Test disk hits populate the memory tier."""
+    writer = CacheService(base_dir=temp_cache_dir)
+    writer.set("shared", [1, 2, 3])
+
+    reader = CacheService(base_dir=temp_cache_dir)
+    assert reader.get("shared") == [1, 2, 3]  # Disk hit, fills memory
+    assert reader.get("shared") == [1, 2, 3]  # Memory hit
+
+    tiers = reader.stats()['tiers']
+    assert tiers['disk']['hits'] == 1
+    assert tiers['memory']['hits'] == 1
+    assert tiers['memory']['misses'] == 1
+
+
+def test_memory_tier_returns_copies(cache):
+    """Test callers cannot mutate the cached value through a hit."""
+    cache.set("mutable", {"items": [1]})
+
+    first = cache.get("mutable")
+    first["items"].append(2)
+
+    assert cache.get("mutable") == {"items": [1]}
+
+
+def test_memory_tier_entry_cap_evicts_lru():
+    """Test the entry cap evicts the least recently used key."""
+    tier = MemoryTier(max_entries=2, max_bytes=1024)
+    expires_at = time.time() + 60
+
+    tier.put("a", "A", expires_at)
+    tier.put("b", "B", expires_at)
+    tier.get("a")  # "b" is now least recently used
+    tier.put("c", "C", expires_at)
+
+    assert tier.get("a") == "A"
+    assert tier.get("b") is None
+    assert tier.get("c") == "C"
+    assert tier.stats()['evictions'] == 1
+
+
+def test_memory_tier_byte_cap_prefers_expired():
+    """Test eviction drops expired entries before live ones."""
+    tier = MemoryTier(max_entries=10, max_bytes=10)
+
+    tier.put("stale", "x" * 4, time.time() - 1)
+    tier.put("live", "y" * 4, time.time() + 60)
+    tier.put("new", "z" * 4, time.time() + 60)
+
+    stats = tier.stats()
+    assert stats['bytes'] <= 10
+    assert tier.get("live") == "y" * 4
+    assert tier.get("new") == "z" * 4
+
+
+def test_memory_tier_invalidated_on_delete_and_clear(cache):
+    """Test delete and clear also drop memory copies."""
+    cache.set("key1", "value1")
+    cache.set("key2", "value2")
+
+    cache.delete("key1")
+    assert cache.get("key1") is None
+
+    cache.clear()
+    assert cache.get("key2") is None
+    assert cache.stats()['tiers']['memory']['entries'] == 0
+
+
+def test_get_or_fetch_caches_result(cache):
+    """Test get_or_fetch fetches on a miss and caches the result."""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return ["result"]
+
+    assert cache.get_or_fetch("key", fetch, domain="restaurants") == ["result"]
+    assert cache.get_or_fetch("key", fetch, domain="restaurants") == ["result"]
+    assert len(calls) == 1
+
+
+def test_get_or_fetch_coalesces_concurrent_misses(cache):
+    """Test concurrent misses for one key trigger a single fetch."""
+    import threading
+
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["result"]
+
+    def worker():
+        barrier.wait()
+        assert cache.get_or_fetch("popular", fetch, domain="restaurants") == ["result"]
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(calls) == 1
+    stats = cache.stats()['single_flight']['restaurants']
+    assert stats['executions'] == 1
+    assert stats['coalesced'] == 7
+
+
+def test_get_or_fetch_does_not_cache_empty_results(cache):
+    """Test empty results are returned but not cached as values."""
+    assert cache.get_or_fetch("empty", lambda: [], domain="restaurants") == []
+    assert cache.get("empty", domain="restaurants") is None
+
+
+def wait_for_refreshes(cache, timeout=2.0):
+    """Wait until background refreshes have finished."""
+    deadline = time.time() + timeout
+    while cache.stats()['stale_while_revalidate']['refreshing'] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_stale_entry_served_and_refreshed(temp_cache_dir):
+    """Test entries between soft and hard TTL are served stale and refreshed."""
+    cache = CacheService(base_dir=temp_cache_dir, stale_ttls={'restaurants': (1, 60)})
+    versions = iter(["v1", "v2"])
+
+    assert cache.get_or_fetch("key", lambda: next(versions), domain="restaurants") == "v1"
+
+    time.sleep(1.1)  # Past soft TTL, well within hard TTL
+
+    # Stale value comes back immediately while v2 loads in the background
+    assert cache.get_or_fetch("key", lambda: next(versions), domain="restaurants") == "v1"
+    wait_for_refreshes(cache)
+
+    assert cache.get("key", domain="restaurants") == "v2"
+    swr = cache.stats()['stale_while_revalidate']
+    assert swr['stale_hits'] == 1
+    assert swr['refreshes_started'] == 1
+    assert swr['refreshes_completed'] == 1
+
+
+
+def test_stale_refresh_keeps_entry_when_providers_fail(temp_cache_dir):
+    """Test a refresh degraded by provider failures leaves the stale entry in place."""
+    cache = CacheService(base_dir=temp_cache_dir, stale_ttls={'restaurants': (1, 60)})
+    cache.get_or_fetch("key", lambda: ["yelp", "google"], domain="restaurants")
+    time.sleep(1.1)
+
+    failures = []
+
+    def partial_fetch():
+        failures.append("google_places")
+        return ["yelp"]
+
+    cache.get_or_fetch("key", partial_fetch, domain="restaurants", complete=lambda: not failures)
+    wait_for_refreshes(cache)
+    assert cache.get("key", domain="restaurants") == ["yelp", "google"]
+
+    failures.clear()
+    cache.get_or_fetch("key", lambda: [], domain="restaurants", cache_empty=lambda: False)
+    wait_for_refreshes(cache)
+    assert cache.get("key", domain="restaurants") == ["yelp", "google"]
+
+    swr = cache.stats()['stale_while_revalidate']
+    assert swr['refreshes_failed'] == 2
+    assert swr['refreshes_completed'] == 0
+
+def test_stale_refresh_respects_rate_limiter(temp_cache_dir):
+    """Test background refreshes are skipped when the rate limiter is empty."""
+    from core.rate_limiter import RateLimiter
+
+    limiter = RateLimiter()
+    limiter.add_limit('google_places', max_requests=1, time_window=3600)
+    limiter.try_acquire('google_places')  # Drain the bucket
+
+    cache = CacheService(base_dir=temp_cache_dir, stale_ttls={'restaurants': (1, 60)})
+    cache.get_or_fetch("key", lambda: "v1", domain="restaurants")
+    time.sleep(1.1)
+
+    value = cache.get_or_fetch(
+        "key", lambda: "v2", domain="restaurants",
+        rate_limiter=limiter, api_name='google_places'
+    )
+
+    assert value == "v1"
+    swr = cache.stats()['stale_while_revalidate']
+    assert swr['refreshes_throttled'] == 1
+    assert swr['refreshes_started'] == 0
+
+
+def test_stale_refresh_charged_once_in_background_lane(temp_cache_dir):
+    """Test the budget check leaves the token to fetch(), which runs in the warm-up lane."""
+    from core.rate_limiter import RateLimiter, current_lane
+
+    limiter = RateLimiter()
+    limiter.add_limit('google_places', max_requests=10, time_window=3600)
+
+    lanes = []
+
+    def fetch():
+        lanes.append(current_lane())
+        limiter.try_acquire('google_places')  # As the API client does
+        return "v2"
+
+    cache = CacheService(base_dir=temp_cache_dir, stale_ttls={'restaurants': (1, 60)})
+    cache.get_or_fetch("key", lambda: "v1", domain="restaurants")
+    time.sleep(1.1)
+
+    cache.get_or_fetch("key", fetch, domain="restaurants", rate_limiter=limiter, api_name='google_places')
+    wait_for_refreshes(cache)
+
+    assert lanes == ['background-warmup']
+    assert limiter.stats('google_places')['total_requests'] == 1
+    assert cache.get("key", domain="restaurants") == "v2"
+
+
+def test_stale_refresh_concurrency_bounded(temp_cache_dir):
+    """Test no more than max_background_refreshes run at once."""
+    import threading
+
+    cache = CacheService(
+        base_dir=temp_cache_dir,
+        stale_ttls={'restaurants': (1, 60)},
+        max_background_refreshes=1
+    )
+    release = threading.Event()
+
+    cache.get_or_fetch("a", lambda: "a1", domain="restaurants")
+    cache.get_or_fetch("b", lambda: "b1", domain="restaurants")
+    time.sleep(1.1)
+
+    def blocked_fetch():
+        release.wait(timeout=2)
+        return "fresh"
+
+    assert cache.get_or_fetch("a", blocked_fetch, domain="restaurants") == "a1"
+    assert cache.get_or_fetch("b", blocked_fetch, domain="restaurants") == "b1"
+
+    swr = cache.stats()['stale_while_revalidate']
+    assert swr['refreshes_started'] == 1
+    assert swr['refreshes_skipped'] == 1
+
+    release.set()
+    wait_for_refreshes(cache)
+
+
+def test_stale_entry_expires_at_hard_ttl(temp_cache_dir):
+    """Test entries past the hard TTL are fetched in the foreground."""
+    cache = CacheService(base_dir=temp_cache_dir, stale_ttls={'restaurants': (0, 1)})
+    cache.get_or_fetch("key", lambda: "v1", domain="restaurants")
+
+    time.sleep(1.1)
+
+    assert cache.get_or_fetch("key", lambda: "v2", domain="restaurants") == "v2"
+    assert cache.stats()['stale_while_revalidate']['stale_hits'] == 0
+
+
+def test_stale_ttls_for_domain(cache):
+    """Test default stale-while-revalidate configuration."""
+    assert cache.get_stale_ttls_for_domain('restaurants') == (3600, 21600)
+    assert cache.get_stale_ttls_for_domain('rideshare') is None
+
+
+def test_cache_files_are_compact(cache, temp_cache_dir):
+    """Test entries are written without indentation."""
+    cache.set("compact", {"a": [1, 2, 3]})
+
+    cache_file = next(Path(temp_cache_dir).rglob("*.json"))
+    assert "\n" not in cache_file.read_text()
+
+
+def test_cache_write_leaves_no_temp_files(cache, temp_cache_dir):
+    """Test atomic writes clean up their temp files."""
+    for i in range(10):
+        cache.set(f"key{i}", i)
+    cache.set("key0", "overwritten")
+
+    files = [p for p in Path(temp_cache_dir).rglob("*") if p.is_file()]
+    assert len(files) == 10
+    assert all(p.suffix == ".json" for p in files)
+    assert cache.get("key0") == "overwritten"
+
+
+def test_legacy_flat_layout_migrated_on_read(temp_cache_dir):
+    """Test entries from the old flat layout are read and moved into shards."""
+    import hashlib
+    import json
+
+    key_hash = hashlib.md5("legacy_key".encode()).hexdigest()
+    legacy_file = Path(temp_cache_dir) / f"{key_hash}.json"
+    legacy_file.write_text(json.dumps({
+        "key": "legacy_key",
+        "value": {"data": "old"},
+        "created_at": time.time(),
+        "ttl": 300
+    }, indent=2))
+
+    cache = CacheService(base_dir=temp_cache_dir)
+    assert cache.get("legacy_key") == {"data": "old"}
+
+    assert not legacy_file.exists()
+    assert (Path(temp_cache_dir) / key_hash[:2] / f"{key_hash}.json").exists()
+
+
+def test_legacy_flat_layout_included_in_cleanup(temp_cache_dir):
+    """Test sweeping and clearing still see flat-layout entries."""
+    import hashlib
+    import json
+
+    key_hash = hashlib.md5("old_expired".encode()).hexdigest()
+    (Path(temp_cache_dir) / f"{key_hash}.json").write_text(json.dumps({
+        "key": "old_expired", "value": 1, "created_at": time.time() - 10, "ttl": 1
+    }))
+
+    cache = CacheService(base_dir=temp_cache_dir)
+    cache.set("fresh", "value")
+
+    assert cache.cleanup_expired() == 1
+    assert cache.clear() == 1
+
+
+def test_concurrent_writers_never_expose_torn_entries(temp_cache_dir):
+    """Test readers racing writers see a whole old or new value, never a torn file."""
+    import threading
+
+    writer = CacheService(base_dir=temp_cache_dir, memory_max_entries=0)
+    reader = CacheService(base_dir=temp_cache_dir, memory_max_entries=0)
+    payloads = [["a" * 5000], ["b" * 5000]]
+    writer.set("contended", payloads[0])
+    stop = threading.Event()
+    bad_reads = []
+
+    def write_loop(value):
+        while not stop.is_set():
+            writer.set("contended", value)
+
+    def read_loop():
+        for _ in range(300):
+            value = reader.get("contended")
+            if value not in payloads:
+                bad_reads.append(value)
+
+    writers = [threading.Thread(target=write_loop, args=(p,)) for p in payloads]
+    for t in writers:
+        t.start()
+    read_loop()
+    stop.set()
+    for t in writers:
+        t.join(timeout=5)
+
+    assert bad_reads == []
+
+
+def test_orphaned_temp_files_removed(cache, temp_cache_dir):
+    """Test cleanup removes temp files left by crashed writers."""
+    import os
+
+    shard = Path(temp_cache_dir) / "ab"
+    shard.mkdir()
+    orphan = shard / ".tmp-crashed"
+    orphan.write_text("{\"key\": \"torn")
+    old = time.time() - 3600
+    os.utime(orphan, (old, old))
+
+    cache.cleanup_expired()
+    assert not orphan.exists()
+
+
+def test_stats_sizes_tracked_incrementally(cache, temp_cache_dir):
+    """Test entry count and bytes follow set, overwrite, delete and expire."""
+    cache.set("a", "x" * 100)
+    cache.set("b", "y" * 100, ttl=1)
+    cache.set("a", "x" * 10)  # Overwrite shrinks the entry
+
+    on_disk = sum(p.stat().st_size for p in Path(temp_cache_dir).rglob("*.json"))
+    stats = cache.stats()
+    assert stats['cache_files'] == 2
+    assert stats['total_size_bytes'] == on_disk
+
+    cache.delete("a")
+    time.sleep(1.1)
+    assert cache.get("b") is None  # Expired on read
+
+    stats = cache.stats()
+    assert stats['cache_files'] == 0
+    assert stats['total_size_bytes'] == 0
+
+
+def test_stats_does_not_walk_cache_dir(cache, monkeypatch):
+    """Test stats() reads the index instead of listing files."""
+    cache.set("key", "value")
+
+    def fail():
+        raise AssertionError("stats() walked the cache directory")
+
+    monkeypatch.setattr(cache.backend, 'iter_files', fail)
+
+    assert cache.stats()['cache_files'] == 1
+
+
+def test_reconcile_picks_up_external_writes(temp_cache_dir):
+    """Test reconciliation corrects drift from other processes."""
+    cache = CacheService(base_dir=temp_cache_dir)
+    other_process = CacheService(base_dir=temp_cache_dir)
+
+    other_process.set("k1", "v1")
+    other_process.set("k2", "v2")
+    assert cache.stats()['cache_files'] == 0
+
+    result = cache.reconcile_stats()
+    assert result['drift_entries'] == 2
+    assert cache.stats()['cache_files'] == 2
+
+
+def test_startup_reconcile_counts_existing_entries(temp_cache_dir):
+    """Test a new instance starts with an accurate index."""
+    CacheService(base_dir=temp_cache_dir).set("k1", "v1")
+
+    assert CacheService(base_dir=temp_cache_dir).stats()['cache_files'] == 1
+
+
+def test_background_reconcile_when_due(temp_cache_dir):
+    """Test stats() schedules a reconcile once the interval has passed."""
+    cache = CacheService(base_dir=temp_cache_dir, reconcile_interval=0)
+    CacheService(base_dir=temp_cache_dir).set("k1", "v1")
+
+    cache.stats()
+    deadline = time.time() + 2
+    while cache.stats()['cache_files'] != 1 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert cache.stats()['cache_files'] == 1
+
+
+def test_sweep_removes_only_due_entries(cache, temp_cache_dir):
+    """Test the sweeper deletes expired entries and reads nothing else."""
+    cache.set("short1", "v", ttl=1)
+    cache.set("short2", "v", ttl=1)
+    cache.set("long", "v", ttl=300)
+    time.sleep(1.1)
+
+    read = []
+    original_read = cache.backend.read
+    cache.backend.read = lambda key_hash: read.append(key_hash) or original_read(key_hash)
+
+    assert cache.sweep_expired() == 2
+    assert len(read) == 2
+    assert cache.get("long") == "v"
+    assert cache.stats()['cache_files'] == 1
+
+
+def test_sweep_work_bounded_per_tick(cache):
+    """Test each sweep checks at most max_entries and reports the backlog."""
+    for i in range(5):
+        cache.set(f"k{i}", "v", ttl=1)
+    time.sleep(1.1)
+
+    assert cache.sweep_expired(max_entries=2) == 2
+    assert cache.stats()['sweeper']['backlog'] is True
+    assert cache.sweep_expired(max_entries=10) == 3
+    assert cache.stats()['sweeper']['backlog'] is False
+
+
+def test_sweep_keeps_entry_rewritten_by_other_process(temp_cache_dir):
+    """Test an entry refreshed elsewhere is re-indexed, not deleted."""
+    cache = CacheService(base_dir=temp_cache_dir)
+    cache.set("shared", "old", ttl=1)
+    time.sleep(1.1)
+    CacheService(base_dir=temp_cache_dir).set("shared", "new", ttl=300)
+
+    assert cache.sweep_expired() == 0
+    assert cache.get("shared") == "new"
+    assert cache.sweep_expired() == 0  # Not due again yet
+
+
+def test_sweep_checks_entries_found_at_startup(temp_cache_dir):
+    """Test entries written before startup are indexed and swept."""
+    old = CacheService(base_dir=temp_cache_dir)
+    old.set("expired", "v", ttl=1)
+    old.set("fresh", "v", ttl=300)
+    time.sleep(1.1)
+
+    cache = CacheService(base_dir=temp_cache_dir)
+    assert cache.sweep_expired() == 1
+    assert cache.stats()['sweeper']['indexed_entries'] == 1
+    assert cache.get("fresh") == "v"
+
+
+def test_background_sweeper_thread(cache):
+    """Test the sweeper thread runs, reports stats and stops."""
+    cache.set("short", "v", ttl=1)
+    assert cache.start_sweeper(interval=0.05, max_per_tick=10)
+    assert not cache.start_sweeper(interval=0.05)  # Already running
+
+    deadline = time.time() + 3
+    while cache.stats()['sweeper']['removed'] == 0 and time.time() < deadline:
+        time.sleep(0.05)
+
+    sweeper = cache.stats()['sweeper']
+    assert sweeper['running'] is True
+    assert sweeper['removed'] == 1
+    assert sweeper['ticks'] >= 1
+
+    cache.stop_sweeper(timeout=1)
+    assert cache.stats()['sweeper']['running'] is False
+
+
+def test_domains_are_separate_namespaces(cache, temp_cache_dir):
+    """Test the same key in different domains holds different values."""
+    cache.set("nyc", "rides", domain="rideshare")
+    cache.set("nyc", "food", domain="restaurants")
+
+    assert cache.get("nyc", domain="rideshare") == "rides"
+    assert cache.get("nyc", domain="restaurants") == "food"
+    assert cache.get("nyc") is None
+    assert list((Path(temp_cache_dir) / "restaurants").rglob("*.json"))
+
+
+def test_domain_set_uses_domain_ttl(cache):
+    """Test set() without a ttl uses the domain's TTL."""
+    import json
+
+    cache.set("nyc", "coords", domain="geocoding")
+    entry = json.loads(cache._get_cache_path("nyc", domain="geocoding").read_text())
+
+    assert entry['ttl'] == cache.get_ttl_for_domain('geocoding')
+
+
+def test_clear_domain_only_clears_that_namespace(cache):
+    """Test clear(domain=...) leaves other domains (and the memory tier) intact."""
+    cache.set("a", 1, domain="restaurants")
+    cache.set("b", 2, domain="restaurants")
+    cache.set("a", 3, domain="geocoding")
+    cache.set("plain", 4)
+
+    assert cache.clear(domain="restaurants") == 2
+
+    assert cache.get("a", domain="restaurants") is None
+    assert cache.get("a", domain="geocoding") == 3
+    assert cache.get("plain") == 4
+    assert cache.stats()['cache_files'] == 2
+    assert cache.stats()['namespaces']['restaurants']['entries'] == 0
+
+
+def test_invalid_domain_rejected(cache):
+    """Test namespace names that could clash with the layout are rejected."""
+    for domain in ("ab", "../etc", "Rideshare", "default"):
+        with pytest.raises(ValueError):
+            cache.set("key", "value", domain=domain)
+
+
+def test_domain_quota_evicts_least_recently_used(temp_cache_dir):
+    """Test a domain over its entry quota evicts its own LRU entries only."""
+    cache = CacheService(base_dir=temp_cache_dir, quotas={'restaurants': (3, None)})
+    cache.set("geo", "kept", domain="geocoding")
+    for i in range(3):
+        cache.set(f"r{i}", i, domain="restaurants")
+
+    cache.get("r0", domain="restaurants")  # r1 is now least recently used
+    cache.set("r3", 3, domain="restaurants")
+
+    assert cache.get("r1", domain="restaurants") is None
+    assert cache.get("r0", domain="restaurants") == 0
+    assert cache.get("r3", domain="restaurants") == 3
+    assert cache.get("geo", domain="geocoding") == "kept"
+    assert cache.stats()['namespaces']['restaurants']['evictions'] == 1
+
+
+def test_domain_byte_quota(temp_cache_dir):
+    """Test a domain's on-disk bytes stay within its byte quota."""
+    cache = CacheService(base_dir=temp_cache_dir, quotas={'restaurants': (None, 1000)})
+    for i in range(10):
+        cache.set(f"r{i}", "x" * 200, domain="restaurants")
+
+    restaurants = cache.stats()['namespaces']['restaurants']
+    assert 0 < restaurants['bytes'] <= 1000
+    assert restaurants['entries'] < 10
+    assert cache.get("r9", domain="restaurants") == "x" * 200
+
+
+def test_memory_tier_evicts_from_largest_namespace():
+    """Test a busy namespace cannot push another namespace's entries out."""
+    tier = MemoryTier(max_entries=4)
+    expires = time.time() + 60
+    tier.put("geocoding/hot", "g", expires)
+    for i in range(10):
+        tier.put(f"restaurants/{i}", "r", expires)
+
+    assert tier.get("geocoding/hot") == "g"
+    assert tier.namespace_stats()['restaurants']['entries'] == 3
+
+
+def test_namespace_hit_rate_stats(cache):
+    """Test hits and misses are reported per domain."""
+    cache.set("k", "v", domain="rideshare")
+    cache.get("k", domain="rideshare")
+    cache.get("k", domain="rideshare")
+    cache.get("missing", domain="restaurants")
+
+    namespaces = cache.stats()['namespaces']
+    assert namespaces['rideshare']['hits'] == 2
+    assert namespaces['rideshare']['hit_rate_percent'] == 100
+    assert namespaces['restaurants']['misses'] == 1
+    assert namespaces['restaurants']['hit_rate_percent'] == 0
+
+
+def test_namespaced_entries_survive_restart(temp_cache_dir):
+    """Test reconcile indexes namespaced entries per domain."""
+    CacheService(base_dir=temp_cache_dir).set("k", "v", domain="restaurants")
+
+    cache = CacheService(base_dir=temp_cache_dir)
+    assert cache.stats()['namespaces']['restaurants']['entries'] == 1
+    assert cache.get("k", domain="restaurants") == "v"
+
+
+def test_negative_entry_round_trip(cache):
+    """Test negative entries carry their reason and read as misses via get()."""
+    assert cache.set_negative("geocode:atlantis", "Location not found: atlantis", domain="geocoding")
+
+    assert cache.get_negative("geocode:atlantis", domain="geocoding") == "Location not found: atlantis"
+    assert cache.get("geocode:atlantis", domain="geocoding") is None
+    assert cache.get_negative("geocode:paris", domain="geocoding") is None
+
+    cache.set("geocode:paris", (48.85, 2.35), domain="geocoding")
+    assert cache.get_negative("geocode:paris", domain="geocoding") is None
+
+
+def test_negative_entries_use_short_ttl(cache):
+    """Test negative entries default to the domain's negative TTL."""
+    import json
+
+    cache.set_negative("missing", "empty result", domain="restaurants")
+    entry = json.loads(cache._get_cache_path("missing", domain="restaurants").read_text())
+
+    assert entry['ttl'] == CacheService.DEFAULT_NEGATIVE_TTLS['restaurants']
+    assert entry['negative'] == "empty result"
+
+
+def test_negative_hits_reported_separately(cache):
+    """Test negative hits are not counted as hits (or in the hit rate)."""
+    cache.set_negative("missing", "empty result", domain="restaurants")
+    cache.get_negative("missing", domain="restaurants")
+    cache.get_negative("missing", domain="restaurants")
+
+    stats = cache.stats()
+    assert stats['negative'] == {'hits': 2, 'sets': 1}
+    assert stats['hits'] == 0
+    assert stats['sets'] == 0
+    assert stats['namespaces']['restaurants']['negative_hits'] == 2
+
+
+def test_get_or_fetch_negative_caches_empty_results(cache):
+    """Test an empty result short-circuits later fetches until it expires."""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return []
+
+    assert cache.get_or_fetch("nothing", fetch, domain="restaurants") == []
+    assert cache.get_or_fetch("nothing", fetch, domain="restaurants") == []
+
+    assert len(calls) == 1
+    assert cache.get_negative("nothing", domain="restaurants") == "empty result"
+
+
+def test_get_or_fetch_skips_negative_cache_when_told(cache):
+    """Test cache_empty=False (e.g. provider failures) leaves no entry."""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return []
+
+    cache.get_or_fetch("down", fetch, domain="restaurants", cache_empty=lambda: False)
+    cache.get_or_fetch("down", fetch, domain="restaurants", cache_empty=False)
+
+    assert len(calls) == 2
+    assert cache.stats()['negative']['sets'] == 0
+
+
+def test_get_or_fetch_skips_partial_results(cache):
+    """Test complete=False (some providers failed) returns the value without caching it."""
+    assert cache.get_or_fetch("partial", lambda: ["yelp"], domain="restaurants", complete=lambda: False) == ["yelp"]
+    assert cache.get("partial", domain="restaurants") is None
+
+    assert cache.get_or_fetch("partial", lambda: ["yelp", "google"], domain="restaurants", complete=lambda: True) == ["yelp", "google"]
+    assert cache.get("partial", domain="restaurants") == ["yelp", "google"]
+
+
+def test_negative_entry_expires(cache):
+    """Test negative entries disappear after their TTL."""
+    cache.set_negative("typo", "Location not found: typo", ttl=1)
+    time.sleep(1.1)
+
+    assert cache.get_negative("typo") is None
+
+
+def test_get_many_mixes_memory_and_backend(cache, monkeypatch):
+    """Test get_many() serves memory hits and reads the rest in one batch."""
+    cache.set("a", 1, domain="rideshare")
+    cache.set("b", 2, domain="rideshare")
+    cache.memory.clear()
+    cache.set("c", 3, domain="rideshare")
+
+    batches = []
+    read_many = cache.backend.read_many
+    monkeypatch.setattr(cache.backend, 'read_many', lambda keys: batches.append(keys) or read_many(keys))
+
+    assert cache.get_many(["a", "b", "c", "missing"], domain="rideshare") == {"a": 1, "b": 2, "c": 3}
+    assert len(batches) == 1
+    assert len(batches[0]) == 3  # "c" came from the memory tier
+
+    stats = cache.stats()
+    assert stats['tiers']['disk']['hits'] == 2
+    assert stats['misses'] == 1
+
+
+def test_get_many_reports_negatives(cache):
+    """Test negative entries are left out of get_many() but can be collected."""
+    cache.set("found", "yes")
+    cache.set_negative("typo", "Location not found: typo")
+
+    negatives = {}
+    assert cache.get_many(["found", "typo"], negatives=negatives) == {"found": "yes"}
+    assert negatives == {"typo": "Location not found: typo"}
+
+
+def test_set_many_uses_domain_ttl_and_skips_unserializable(cache):
+    """Test set_many() applies the domain TTL and skips values it cannot store."""
+    assert cache.set_many({"ok": [1, 2], "bad": object()}, domain="restaurants") == 1
+
+    assert cache.get("ok", domain="restaurants") == [1, 2]
+    assert cache.get("bad", domain="restaurants") is None
+    assert cache.stats()['sets'] == 1
+
+
+def test_set_many_enforces_quota(temp_cache_dir):
+    """Test the domain quota is applied after a batch write."""
+    cache = CacheService(base_dir=temp_cache_dir, quotas={'rideshare': (3, None)})
+    cache.set_many({f"k{i}": i for i in range(5)}, domain="rideshare")
+
+    assert cache.namespace_stats()['rideshare']['entries'] == 3
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,163 @@
+"""tests/test_cache_warmup.py
+
+Unit tests for cache warm-up from a recorded query log.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import json
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from core.cache_keys import load_query_log
+from core.cache_service import CacheService
+from core.rate_limiter import RateLimiter
+from domains.restaurants.handler import RestaurantHandler
+from domains.restaurants.models import Restaurant, RestaurantQuery
+from orchestration.cache_warmup import CacheWarmer
+
+
+TIMES_SQUARE = (40.7580, -73.9855)
+
+
+def _record(ts, location="Times Square", cuisine="Italian", point=TIMES_SQUARE):
+    return {
+        'ts': ts,
+        'domain': 'restaurants',
+        'points': [point],
+        'fields': {'cuisine': cuisine, 'price_range': None, 'rating_min': 0.0},
+        'query': {'cuisine': cuisine, 'location': location, 'price_range': None,
+                  'rating_min': 0.0, 'distance_miles': 5.0, 'party_size': None,
+                  'dietary_restrictions': [], 'open_now': False, 'filter_category': 'Food'},
+    }
+
+
+class FakeHandler:
+    """Handler double recording replayed queries."""
+
+    query_type = RestaurantQuery
+
+    def __init__(self, clients=()):
+        self.clients = {name: None for name in clients}
+        self.queries = []
+
+    def fetch_options(self, query):
+        self.queries.append(query)
+        return []
+
+
+def test_select_ranks_by_popularity_and_groups_equivalent_queries():
+    """Test near-identical queries count together and the newest is replayed."""
+    now = time.time()
+    records = [
+        _record(now - 30, cuisine="Thai"),
+        _record(now - 20, cuisine="Italian"),
+        _record(now - 10, cuisine="italian ", location="times square"),
+        _record(now - 5, cuisine="Sushi"),
+    ]
+
+    warmer = CacheWarmer({'restaurants': FakeHandler()})
+    selected = warmer.select(records, top_n=2, now=now)
+
+    assert [r['query']['cuisine'] for r in selected] == ["italian ", "Sushi"]
+
+
+def test_select_skips_old_unknown_and_unreplayable_records():
+    """Test records outside the window, for other domains or without a query are ignored."""
+    now = time.time()
+    old = _record(now - 10 * 86400)
+    other_domain = dict(_record(now), domain='hotels')
+    no_query = _record(now)
+    del no_query['query']
+
+    warmer = CacheWarmer({'restaurants': FakeHandler()})
+    assert warmer.select([old, other_domain, no_query], now=now) == []
+    assert len(warmer.select([old], max_age_seconds=None, now=now)) == 1
+
+
+def test_warm_replays_through_handler_within_budget():
+    """Test replays stop when the warm-up bucket cannot supply a token in time."""
+    handler = FakeHandler()
+    limiter = RateLimiter()
+    warmer = CacheWarmer({'restaurants': handler}, rate_limiter=limiter, budget=(2, 3600))
+
+    records = [_record(time.time(), cuisine=c) for c in ("A", "B", "C")]
+    stats = warmer.warm(records, deadline_seconds=0.3)
+
+    assert stats['warmed'] == 2
+    assert stats['stopped'] == 'budget'
+    assert [q.cuisine for q in handler.queries] == ["A", "B"]
+    assert isinstance(handler.queries[0], RestaurantQuery)
+
+
+def test_warm_leaves_provider_reserve_for_live_traffic():
+    """Test a domain is skipped while its provider bucket is below the reserve."""
+    handler = FakeHandler(clients=['yelp'])
+    limiter = RateLimiter()
+    limiter.add_limit('yelp', max_requests=10, time_window=3600)
+    for _ in range(9):
+        limiter.try_acquire('yelp')
+
+    warmer = CacheWarmer({'restaurants': handler}, rate_limiter=limiter, reserve=0.2)
+    stats = warmer.warm([_record(time.time())])
+
+    assert stats['skipped_reserve'] == 1
+    assert handler.queries == []
+
+
+def test_warm_counts_failures_and_continues():
+    """Test a failing replay does not stop the rest."""
+    handler = FakeHandler()
+    handler.fetch_options = Mock(side_effect=[ValueError("Location not found"), []])
+
+    stats = CacheWarmer({'restaurants': handler}).warm([_record(1), _record(2)])
+
+    assert stats['failed'] == 1
+    assert stats['warmed'] == 1
+
+
+def test_warm_from_log_fills_cache_without_logging_replays(tmp_path, monkeypatch):
+    """Test an end-to-end warm-up leaves the cache hot and the log unchanged."""
+    # The handler's clients and parser need keys to construct; no API is called
+    monkeypatch.setenv('GOOGLE_PLACES_API_KEY', 'test-key')
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    log = tmp_path / "queries.jsonl"
+    log.write_text("\n".join(json.dumps(_record(time.time() - i)) for i in range(3)) + "\n")
+
+    cache = CacheService(base_dir=str(tmp_path / "cache"), query_log=str(log))
+    geocoder = Mock()
+    geocoder.geocode.return_value = (*TIMES_SQUARE, "Times Square, New York")
+
+    handler = RestaurantHandler(cache_service=cache, geocoding_service=geocoder)
+    restaurant = Restaurant(provider="yelp", name="Trattoria", cuisine="Italian", rating=4.5)
+    for client in handler.clients.values():
+        client.search = Mock(return_value=[restaurant])
+
+    stats = CacheWarmer({'restaurants': handler}).warm_from_log(str(log))
+
+    assert stats['selected'] == 1
+    assert stats['warmed'] == 1
+    assert len(list(load_query_log(str(log)))) == 3
+
+    # Live traffic for the same query is now a cache hit
+    calls = sum(client.search.call_count for client in handler.clients.values())
+    handler.fetch_options(RestaurantQuery(cuisine="Italian", location="Times Square"))
+    assert sum(client.search.call_count for client in handler.clients.values()) == calls
+
+    # ...and is recorded with its full query, ready for the next warm-up
+    logged = list(load_query_log(str(log)))
+    assert len(logged) == 4
+    assert logged[-1]['query']['location'] == "Times Square"
+
+
+def test_warm_from_missing_log(tmp_path):
+    """Test a missing log warms nothing instead of raising."""
+    stats = CacheWarmer({'restaurants': FakeHandler()}).warm_from_log(str(tmp_path / "missing.jsonl"))
+    assert stats['selected'] == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
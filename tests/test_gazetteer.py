@@ -0,0 +1,103 @@
+"""tests/test_gazetteer.py
+
+Tests for the offline gazetteer and its use by GeocodingService.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import random
+from unittest.mock import Mock
+
+import pytest
+
+from core.gazetteer import Gazetteer, Place, default_gazetteer, haversine_km
+from core.geocoding_service import GeocodingService, LocationNotFoundError
+
+
+def make_gazetteer() -> Gazetteer:
+    return Gazetteer([
+        Place("Times Square", 40.7580, -73.9855, "Times Square, New York", ("Times Sq",)),
+        Place("Grand Central Terminal", 40.7527, -73.9772, "Grand Central, New York", ("Grand Central",)),
+        Place("Central Park", 40.7829, -73.9654, "Central Park, New York"),
+        Place("St. Patrick's Cathedral", 40.7585, -73.9760, "5th Ave, New York"),
+    ])
+
+
+def test_lookup_by_name_and_alias():
+    """Test exact names and aliases resolve, in any case or punctuation."""
+    gazetteer = make_gazetteer()
+
+    assert gazetteer.lookup("TIMES SQUARE").name == "Times Square"
+    assert gazetteer.lookup("times sq.").name == "Times Square"
+    assert gazetteer.lookup("St Patricks Cathedral, NYC").name == "St. Patrick's Cathedral"
+    assert gazetteer.lookup("Grand Central").name == "Grand Central Terminal"
+
+    # Prefixes are suggestions only, never a resolved location
+    assert gazetteer.lookup("Grand Centr") is None
+    assert gazetteer.lookup("Times") is None
+    assert gazetteer.lookup("Atlantis") is None
+
+
+def test_suggest_returns_distinct_places():
+    """Test prefix suggestions list each place once."""
+    gazetteer = make_gazetteer()
+
+    assert [place.name for place in gazetteer.suggest("grand")] == ["Grand Central Terminal"]
+    assert [place.name for place in gazetteer.suggest("central")] == ["Central Park"]
+    assert len(gazetteer.suggest("", limit=3)) == 3
+
+
+def test_nearest_matches_linear_scan():
+    """Test the k-d tree finds the same place as checking every place."""
+    gazetteer = default_gazetteer()
+    random.seed(1)
+
+    for _ in range(200):
+        lat, lon = random.uniform(40.55, 40.90), random.uniform(-74.15, -73.75)
+        place, km = gazetteer.nearest(lat, lon)
+        expected = min(gazetteer.places, key=lambda p: haversine_km(lat, lon, p.lat, p.lon))
+        assert km == pytest.approx(haversine_km(lat, lon, expected.lat, expected.lon), rel=0.01)
+
+    assert gazetteer.nearest(40.7581, -73.9854)[0].name == "Times Square"
+    assert gazetteer.nearest(41.5, -73.0, max_distance_km=5) is None
+
+
+def test_bundled_gazetteer_covers_common_landmarks():
+    """Test the bundled data resolves the landmarks most queries name."""
+    gazetteer = default_gazetteer()
+
+    for name in ("Times Square", "JFK", "Central Park", "LaGuardia", "Empire State Building"):
+        assert gazetteer.lookup(name) is not None, name
+
+
+def test_bundled_gazetteer_does_not_resolve_bare_prefixes():
+    """Test city and neighborhood names are not mistaken for the landmark they prefix."""
+    gazetteer = default_gazetteer()
+
+    for name in ("Washington", "Newark", "Columbia", "Chelsea"):
+        assert gazetteer.lookup(name) is None, name
+        assert gazetteer.suggest(name), name
+
+
+def test_geocoding_service_consults_gazetteer_first():
+    """Test known places skip the network and unknown ones still reach it."""
+    geocoder = GeocodingService(gazetteer=make_gazetteer())
+    geocoder._geocode_nominatim = Mock(return_value=(48.8584, 2.2945, "Eiffel Tower, Paris"))
+
+    assert geocoder.geocode("Times Square") == (40.7580, -73.9855, "Times Square, New York")
+    assert geocoder.geocode("Eiffel Tower") == (48.8584, 2.2945, "Eiffel Tower, Paris")
+
+    geocoder._geocode_nominatim.assert_called_once_with("Eiffel Tower")
+    assert geocoder.stats()['gazetteer_hits'] == 1
+
+
+def test_reverse_geocode():
+    """Test reverse lookups return the nearest known place within range."""
+    geocoder = GeocodingService(gazetteer=make_gazetteer())
+
+    assert geocoder.reverse_geocode(40.7579, -73.9856)[2] == "Times Square, New York"
+    with pytest.raises(LocationNotFoundError):
+        geocoder.reverse_geocode(48.8584, 2.2945)
+    with pytest.raises(LocationNotFoundError):
+        GeocodingService().reverse_geocode(40.7580, -73.9855)
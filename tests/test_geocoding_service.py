@@ -0,0 +1,186 @@
+"""tests/test_geocoding_service.py
+
+Tests for GeocodingService caching (Nominatim calls are mocked).
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from core.cache_service import CacheService
+from core.geocoding_service import GeocodingService, LocationNotFoundError, geocode_cache_key
+from core.rate_limiter import RateLimiter
+
+TIMES_SQUARE = (40.758, -73.9855, "Times Square, New York")
+
+
+def make_geocoder(cache=None, **kwargs) -> GeocodingService:
+    """Geocoder whose Nominatim call is a Mock returning Times Square."""
+    geocoder = GeocodingService(cache=cache, **kwargs)
+    geocoder._geocode_nominatim = Mock(return_value=TIMES_SQUARE)
+    return geocoder
+
+
+def test_geocode_cache_key_normalizes_case_and_spaces():
+    """Test spelling variants in case and spacing share a key."""
+    assert geocode_cache_key("  Times   SQUARE ") == geocode_cache_key("times square")
+
+
+def test_memory_tier_serves_repeats():
+    """Test repeat lookups skip the API without a persistent cache."""
+    geocoder = make_geocoder()
+
+    assert geocoder.geocode("Times Square") == TIMES_SQUARE
+    assert geocoder.geocode("times square") == TIMES_SQUARE
+
+    assert geocoder._geocode_nominatim.call_count == 1
+    assert geocoder.stats()['memory_hits'] == 1
+
+
+def test_results_persist_across_instances(tmp_path):
+    """Test a new service (e.g. after a restart) is served from the cache."""
+    geocoder = make_geocoder(CacheService(base_dir=str(tmp_path)))
+    geocoder.geocode("Times Square")
+
+    restarted = make_geocoder(CacheService(base_dir=str(tmp_path)))
+
+    assert restarted.geocode("Times Square") == TIMES_SQUARE
+    restarted._geocode_nominatim.assert_not_called()
+    assert restarted.stats()['cache_hits'] == 1
+
+    # Now held in the restarted service's memory tier
+    restarted.geocode("Times Square")
+    assert restarted.stats()['memory_hits'] == 1
+
+
+def test_memory_tier_expires_and_evicts():
+    """Test the memory tier honours the TTL and its entry cap."""
+    geocoder = make_geocoder(memory_max_entries=1, ttl=0.05)
+
+    geocoder.geocode("a")
+    geocoder.geocode("b")   # Evicts "a"
+    geocoder.geocode("a")
+    assert geocoder._geocode_nominatim.call_count == 3
+
+    time.sleep(0.1)
+    geocoder.geocode("a")
+    assert geocoder._geocode_nominatim.call_count == 4
+
+
+def test_not_found_is_negative_cached(tmp_path):
+    """Test unknown places are remembered; API errors are not."""
+    geocoder = GeocodingService(cache=CacheService(base_dir=str(tmp_path)))
+    geocoder._geocode_nominatim = Mock(side_effect=LocationNotFoundError("Location not found: Atlantis"))
+
+    for _ in range(2):
+        with pytest.raises(LocationNotFoundError, match="Atlantis"):
+            geocoder.geocode("Atlantis")
+    assert geocoder._geocode_nominatim.call_count == 1
+
+    geocoder._geocode_nominatim = Mock(side_effect=ValueError("Geocoding API error"))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            geocoder.geocode("Paris")
+    assert geocoder._geocode_nominatim.call_count == 2
+
+
+def test_concurrent_lookups_share_one_call():
+    """Test simultaneous lookups of a new place make one API call."""
+    geocoder = GeocodingService()
+    geocoder._geocode_nominatim = Mock(side_effect=lambda location: time.sleep(0.1) or TIMES_SQUARE)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(geocoder.geocode("Times Square"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [TIMES_SQUARE] * 5
+    assert geocoder._geocode_nominatim.call_count == 1
+
+
+def test_geocode_many_dedupes_and_keeps_order(tmp_path):
+    """Test spellings of one place are fetched once and results follow input order."""
+    cache = CacheService(base_dir=str(tmp_path))
+    cache.set(geocode_cache_key("Central Park"), [40.7829, -73.9654, "Central Park"], domain='geocoding')
+    cache.set_negative(geocode_cache_key("Atlantis"), "Location not found: Atlantis", domain='geocoding')
+
+    geocoder = make_geocoder(cache)
+    results = geocoder.geocode_many(["Times Square", "central park", "times  square", "Atlantis"])
+
+    assert [result.location for result in results] == ["Times Square", "central park", "times  square", "Atlantis"]
+    assert results[0].coordinates == TIMES_SQUARE
+    assert results[1].coordinates == (40.7829, -73.9654, "Central Park")
+    assert results[2].coordinates == TIMES_SQUARE
+    assert not results[3].ok and isinstance(results[3].error, LocationNotFoundError)
+
+    geocoder._geocode_nominatim.assert_called_once_with("Times Square")
+    assert geocoder.stats()['cache_hits'] == 1
+    assert geocoder.stats()['negative_hits'] == 1
+
+
+def test_geocode_many_reports_errors_per_item():
+    """Test one failing location does not fail the batch."""
+    def nominatim(location):
+        if location == "Paris":
+            raise ValueError("Geocoding API error for Paris")
+        return TIMES_SQUARE
+
+    geocoder = GeocodingService()
+    geocoder._geocode_nominatim = Mock(side_effect=nominatim)
+
+    results = geocoder.geocode_many(["Paris", "Times Square"])
+
+    assert isinstance(results[0].error, ValueError)
+    assert results[0].coordinates is None
+    assert results[1].ok and results[1].coordinates == TIMES_SQUARE
+
+
+def test_geocode_many_paced_by_rate_limiter():
+    """Test cold lookups wait for the nominatim bucket, even from worker threads."""
+    limiter = RateLimiter()
+    limiter.add_limit('nominatim', max_requests=1, time_window=0.1)
+    geocoder = make_geocoder(rate_limiter=limiter)
+
+    start = time.time()
+    results = geocoder.geocode_many(["a", "b", "c", "d"], max_workers=4)
+
+    assert all(result.ok for result in results)
+    assert time.time() - start >= 0.25
+    assert limiter.stats('nominatim')['total_requests'] == 4
+
+
+def test_equivalent_spellings_share_one_entry(tmp_path):
+    """Test spelling variants hit the entry the first spelling created."""
+    cache = CacheService(base_dir=str(tmp_path))
+    geocoder = make_geocoder(cache)
+
+    for spelling in ("Times Square, NYC", "times square nyc", "Times Sq"):
+        assert geocoder.geocode(spelling) == TIMES_SQUARE
+
+    geocoder._geocode_nominatim.assert_called_once_with("Times Square, NYC")
+    assert cache.namespace_stats()['geocoding']['entries'] == 1
+
+    stats = geocoder.stats()
+    assert stats['hit_rate'] == pytest.approx(2 / 3, abs=0.001)
+    assert stats['normalizer']['rewritten'] == 3
+
+
+def test_learned_alias_shares_entry(tmp_path):
+    """Test names resolving to a cached place reuse its entry afterwards."""
+    geocoder = make_geocoder(CacheService(base_dir=str(tmp_path)))
+
+    geocoder.geocode("Times Square")
+    geocoder.geocode("Crossroads of the World")   # Same result: learned alias
+    assert geocoder.cache_key("Crossroads of the World") == geocoder.cache_key("Times Square")
+
+    geocoder.clear_memory()
+    assert geocoder.geocode("Crossroads of the World") == TIMES_SQUARE
+    assert geocoder._geocode_nominatim.call_count == 2
+    assert geocoder.stats()['cache_hits'] == 1
@@ -0,0 +1,78 @@
+"""tests/test_location_normalizer.py
+
+Tests for location name normalization and learned aliases.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import json
+
+import pytest
+
+from core.location_normalizer import LocationNormalizer, normalize_location
+
+JFK = (40.6413, -73.7781, "JFK Airport, Queens, New York")
+
+
+@pytest.mark.parametrize("spelling", [
+    "Times Square",
+    "Times Square, NYC",
+    "times square nyc",
+    "Times Sq",
+    "TIMES SQ.",
+    "Times Square, New York, NY, USA",
+])
+def test_spellings_share_canonical_form(spelling):
+    """Test common spellings of one place normalize identically."""
+    assert normalize_location(spelling) == "times square"
+
+
+def test_normalization_rules():
+    """Test accents, punctuation, abbreviations and directions."""
+    assert normalize_location("Café Lalo") == "cafe lalo"
+    assert normalize_location("St. Patrick's Cathedral") == "saint patricks cathedral"
+    assert normalize_location("W 42nd St & 8th Ave") == "west 42nd street and 8th avenue"
+    assert normalize_location("JFK Intl Arpt") == "jfk international airport"
+    assert normalize_location("350 W 42nd St Apt 5") == "350 west 42nd street apt 5"
+    assert normalize_location("W Village") == "w village"
+
+
+def test_region_qualifier_kept_when_alone():
+    """Test a bare region name is not stripped to nothing."""
+    assert normalize_location("New York") == "new york"
+    assert normalize_location("NYC") == "nyc"
+    assert normalize_location("New York, NY") == "new york"
+
+
+def test_learned_alias_and_stats():
+    """Test a name with an already-seen result becomes an alias."""
+    normalizer = LocationNormalizer()
+
+    assert normalizer.learn_result("jfk", JFK) is None
+    assert normalizer.learn_result("kennedy airport", JFK) == "jfk"
+    assert normalizer.learn_result("jfk", JFK) is None
+
+    assert normalizer.resolve("Kennedy Airport") == "jfk"
+    assert normalizer.resolve("Times Sq") == "times square"
+
+    stats = normalizer.stats()
+    assert stats['lookups'] == 2
+    assert stats['alias_hits'] == 1
+    assert stats['rewritten'] == 1     # "Times Sq"; the alias only differs in case
+    assert stats['aliases_learned'] == 1
+
+
+def test_alias_table_persists(tmp_path):
+    """Test learned aliases are saved and loaded by the next process."""
+    path = tmp_path / "aliases.json"
+
+    normalizer = LocationNormalizer(alias_path=str(path))
+    normalizer.learn_result("jfk", JFK)
+    normalizer.learn_result("kennedy airport", JFK)
+
+    assert json.loads(path.read_text()) == {"kennedy airport": "jfk"}
+    assert LocationNormalizer(alias_path=str(path)).resolve("kennedy airport") == "jfk"
+
+    path.write_text("not json")
+    assert LocationNormalizer(alias_path=str(path)).aliases == {}
@@ -0,0 +1,74 @@
+"""tests/test_rate_limit_metrics.py
+
+Tests for the Prometheus export of rate limiter metrics.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import re
+
+from core.rate_limit_metrics import Histogram
+from core.rate_limiter import RateLimiter
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of one sample in exposition text."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$', text, re.MULTILINE)
+    assert match, f"{name}{{{label_text}}} not in output"
+    return float(match.group(1))
+
+
+def test_histogram_cumulative_buckets():
+    """Test observations land in cumulative buckets with sum and count."""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot['buckets'] == [(0.1, 2), (1.0, 3), (float('inf'), 4)]
+    assert snapshot['count'] == 4
+    assert abs(snapshot['sum'] - 3.65) < 1e-9
+
+
+def test_prometheus_export_counts_outcomes():
+    """Test granted, rejected and timed-out requests show up per API."""
+    limiter = RateLimiter()
+    limiter.add_limit('places', max_requests=2, time_window=60)
+
+    assert limiter.acquire('places', timeout=1.0) is True
+    assert limiter.try_acquire('places') is True
+    assert limiter.try_acquire('places') is False
+    assert limiter.acquire('places', timeout=0.05) is False
+
+    text = limiter.prometheus_metrics()
+
+    assert '# TYPE rate_limiter_wait_seconds histogram' in text
+    assert '# TYPE rate_limiter_requests_total counter' in text
+    assert sample(text, 'rate_limiter_requests_total', api='places') == 2
+    assert sample(text, 'rate_limiter_rejected_total', api='places') == 1
+    assert sample(text, 'rate_limiter_timeouts_total', api='places') == 1
+    assert sample(text, 'rate_limiter_wait_seconds_bucket', api='places', le='0.005') == 1
+    assert sample(text, 'rate_limiter_wait_seconds_bucket', api='places', le='+Inf') == 1
+    assert sample(text, 'rate_limiter_wait_seconds_count', api='places') == 1
+    assert sample(text, 'rate_limiter_tokens', api='places') < 1
+    assert sample(text, 'rate_limiter_waiting', api='places') == 0
+    assert text.endswith('\n')
+
+
+def test_prometheus_export_quota_and_shed():
+    """Test quota gauges and per-lane shed counters are exported."""
+    limiter = RateLimiter()
+    limiter.add_limit('places', max_requests=10, time_window=60)
+    limiter.add_quota('places', 50, period='day')
+
+    limiter.try_acquire('places')
+    limiter.try_acquire('places', tokens=10, lane='background-warmup')
+    limiter.acquire('places', tokens=10, timeout=1.0, lane='background-warmup')
+
+    text = limiter.prometheus_metrics()
+
+    assert sample(text, 'rate_limiter_quota_remaining', api='places', period='day') == 49
+    assert sample(text, 'rate_limiter_shed_total', api='places', lane='background-warmup') == 1
@@ -0,0 +1,179 @@
+"""tests/test_rate_limit_stores.py
+
+Contract tests for shared rate limit bucket stores.
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import multiprocessing
+import time
+
+import pytest
+
+from core.cache_backends import LocalRedis
+from core.rate_limit_stores import (
+    FileLockBucketStore,
+    RedisBucketStore,
+    create_bucket_store,
+)
+from core.rate_limiter import RateLimiter
+
+
+@pytest.fixture(params=['file', 'redis'])
+def store(request, tmp_path):
+    """Each store implementation, empty."""
+    if request.param == 'file':
+        return FileLockBucketStore(str(tmp_path / "buckets.json"))
+    return RedisBucketStore(LocalRedis())
+
+
+def test_new_bucket_starts_full(store):
+    """Test an unseen bucket holds its full capacity."""
+    assert store.peek('api', capacity=5, rate=1) == 5
+
+
+def test_take_until_empty(store):
+    """Test tokens are taken atomically and refused once exhausted."""
+    assert store.take('api', 3, capacity=5, rate=0.001) == (True, 5)
+    acquired, available = store.take('api', 3, capacity=5, rate=0.001)
+
+    assert acquired is False
+    assert available == pytest.approx(2, abs=0.01)
+
+
+def test_refill_over_time(store):
+    """Test buckets refill at the given rate, capped at capacity."""
+    store.take('api', 10, capacity=10, rate=20)
+    time.sleep(0.2)
+
+    assert store.peek('api', capacity=10, rate=20) == pytest.approx(4, abs=1)
+    time.sleep(0.5)
+    assert store.peek('api', capacity=10, rate=20) == 10
+
+
+def test_reset_and_independent_buckets(store):
+    """Test reset refills one bucket and leaves others alone."""
+    store.take('a', 5, capacity=5, rate=0.001)
+    store.take('b', 5, capacity=5, rate=0.001)
+    store.reset('a')
+
+    assert store.peek('a', capacity=5, rate=0.001) == 5
+    assert store.peek('b', capacity=5, rate=0.001) == pytest.approx(0, abs=0.01)
+
+
+def test_limiters_sharing_store_share_budget(store):
+    """Test two RateLimiters (e.g. two workers) draw from one bucket."""
+    worker_a = RateLimiter(store=store)
+    worker_b = RateLimiter(store=store)
+    worker_a.add_limit('test', max_requests=4, time_window=3600)
+    worker_b.add_limit('test', max_requests=4, time_window=3600)
+
+    granted = []
+    for _ in range(3):
+        granted.append(worker_a.try_acquire('test'))
+        granted.append(worker_b.try_acquire('test'))
+
+    assert granted.count(True) == 4
+    assert worker_b.stats('test')['store'] == store.name
+    assert worker_a.available_tokens('test') == pytest.approx(0, abs=0.01)
+
+
+def _file_store_worker(path, attempts, results):
+    limiter = RateLimiter(store=FileLockBucketStore(path))
+    limiter.add_limit('shared', max_requests=20, time_window=86400)
+    results.put(sum(limiter.try_acquire('shared') for _ in range(attempts)))
+
+
+def test_file_store_shared_between_processes(tmp_path):
+    """Test worker processes never exceed the shared budget together."""
+    path = str(tmp_path / "buckets.json")
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_file_store_worker, args=(path, 15, results)) for _ in range(4)]
+
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    assert sum(results.get(timeout=5) for _ in workers) == 20
+
+
+def test_waiting_on_shared_bucket(tmp_path):
+    """Test blocking acquire works against a store-backed bucket."""
+    limiter = RateLimiter(store=FileLockBucketStore(str(tmp_path / "buckets.json")))
+    limiter.add_limit('test', max_requests=1, time_window=0.2)
+    limiter.try_acquire('test')
+
+    start = time.time()
+    assert limiter.acquire('test', timeout=2.0) is True
+    assert 0.15 <= time.time() - start <= 0.4
+
+
+def test_file_store_survives_restart(tmp_path):
+    """Test a restarted process resumes from the saved bucket and quota state."""
+    path = str(tmp_path / "buckets.json")
+
+    before = RateLimiter(store=FileLockBucketStore(path))
+    before.add_quota('monthly', 5)
+    for _ in range(1000):
+        before.try_acquire('google_places')
+    for _ in range(5):
+        before.try_acquire('monthly')
+
+    after = RateLimiter(store=FileLockBucketStore(path))
+    after.add_quota('monthly', 5)
+
+    assert after.try_acquire('google_places') is False
+    assert after.available_tokens('google_places') < 1
+    assert after.try_acquire('monthly') is False
+    assert after.stats('monthly')['quota']['used'] == 5
+
+
+def test_file_store_crash_mid_write_keeps_state(tmp_path, monkeypatch):
+    """Test a write that dies before committing leaves the saved state intact."""
+    path = str(tmp_path / "buckets.json")
+    store = FileLockBucketStore(path)
+    store.take('api', 5, capacity=5, rate=0.001)
+
+    def crash(src, dst):
+        raise KeyboardInterrupt
+    monkeypatch.setattr('core.rate_limit_stores.os.replace', crash)
+    with pytest.raises(KeyboardInterrupt):
+        store.take('api', 0, capacity=5, rate=0.001)
+    monkeypatch.undo()
+
+    assert FileLockBucketStore(path).peek('api', capacity=5, rate=0.001) == pytest.approx(0, abs=0.01)
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith('.tmp-')] == []
+
+
+def test_file_store_peek_does_not_write(tmp_path):
+    """Test reading a bucket leaves the state file untouched."""
+    path = tmp_path / "buckets.json"
+    store = FileLockBucketStore(str(path))
+    store.take('api', 1, capacity=5, rate=1)
+    saved = path.read_text()
+    mtime = path.stat().st_mtime_ns
+
+    time.sleep(0.01)
+    assert store.peek('api', capacity=5, rate=1) >= 4
+    assert store.peek('unseen', capacity=5, rate=1) == 5
+
+    assert path.read_text() == saved
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_create_bucket_store(tmp_path):
+    """Test store specs."""
+    assert create_bucket_store('memory') is None
+    assert isinstance(create_bucket_store('file', base_dir=str(tmp_path)), FileLockBucketStore)
+    assert isinstance(create_bucket_store(f'file:{tmp_path}/x.json'), FileLockBucketStore)
+    assert isinstance(create_bucket_store('local-redis'), RedisBucketStore)
+
+    with pytest.raises(ValueError):
+        create_bucket_store('bogus')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -7,13 +7,22 @@ import sys
 sys.path.insert(0, 'src')
 
 import pytest
+import asyncio
 import time
 import threading
+from datetime import datetime, timezone
 from core.rate_limiter import (
+    AdaptiveConfig,
+    CalendarQuota,
+    PriorityLane,
+    QuotaExceededError,
     RateLimitConfig,
+    RateLimitShedError,
     TokenBucket,
     RateLimiter,
-    create_rate_limiter
+    create_rate_limiter,
+    parse_retry_after,
+    priority_lane
 )
 
 
@@ -116,6 +125,242 @@ def test_token_bucket_wait_timeout():
     assert 0.2 <= elapsed <= 0.4
 
 
+def test_token_bucket_waiters_served_in_arrival_order():
+    """Test queued waiters acquire first-come, first-served."""
+    config = RateLimitConfig(max_requests=2, time_window=0.1, name="test")  # 20 tokens/sec
+    bucket = TokenBucket(config)
+    bucket.acquire(2)
+
+    order = []
+
+    def wait(i):
+        bucket.wait_and_acquire(1, timeout=5.0)
+        order.append(i)
+
+    threads = []
+    for i in range(8):
+        thread = threading.Thread(target=wait, args=(i,))
+        thread.start()
+        threads.append(thread)
+        while bucket.stats()['waiting'] < i + 1:  # Queue them in a known order
+            time.sleep(0.001)
+
+    for thread in threads:
+        thread.join()
+
+    assert order == list(range(8))
+
+
+def test_token_bucket_wakes_when_tokens_accrue():
+    """Test a waiter is woken when its tokens are due, not on a polling tick."""
+    config = RateLimitConfig(max_requests=1, time_window=0.25, name="test")
+    bucket = TokenBucket(config)
+    bucket.acquire(1)
+
+    start = time.time()
+    assert bucket.wait_and_acquire(1, timeout=2.0) is True
+    assert 0.24 <= time.time() - start <= 0.3
+
+
+def test_token_bucket_acquire_does_not_jump_queue():
+    """Test non-blocking acquire fails while others are waiting."""
+    config = RateLimitConfig(max_requests=2, time_window=1, name="test")
+    bucket = TokenBucket(config)
+    bucket.acquire(2)
+
+    waiter = threading.Thread(target=bucket.wait_and_acquire, args=(2, 5.0))
+    waiter.start()
+    while bucket.stats()['waiting'] == 0:
+        time.sleep(0.001)
+
+    time.sleep(0.6)  # A token has accrued, but the waiter needs two
+    assert bucket.acquire(1) is False
+
+    waiter.join()
+    assert bucket.stats()['waiting'] == 0
+
+
+def test_token_bucket_timed_out_head_passes_turn():
+    """Test the next waiter takes over when the head of the queue times out."""
+    config = RateLimitConfig(max_requests=5, time_window=1, name="test")  # 5 tokens/sec
+    bucket = TokenBucket(config)
+    bucket.acquire(5)
+
+    results = {}
+    big = threading.Thread(target=lambda: results.update(big=bucket.wait_and_acquire(5, timeout=0.1)))
+    big.start()
+    while bucket.stats()['waiting'] == 0:
+        time.sleep(0.001)
+    small = threading.Thread(target=lambda: results.update(small=bucket.wait_and_acquire(1, timeout=1.0)))
+    small.start()
+
+    big.join()
+    small.join()
+    assert results == {'big': False, 'small': True}
+
+
+def test_token_bucket_reset_wakes_waiter():
+    """Test reset() hands the refilled bucket to a waiter immediately."""
+    config = RateLimitConfig(max_requests=10, time_window=3600, name="test")
+    bucket = TokenBucket(config)
+    bucket.acquire(10)
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(bucket.wait_and_acquire(1, timeout=5.0)))
+    waiter.start()
+    while bucket.stats()['waiting'] == 0:
+        time.sleep(0.001)
+
+    start = time.time()
+    bucket.reset()
+    waiter.join()
+
+    assert result == [True]
+    assert time.time() - start < 0.1
+
+
+def test_token_bucket_request_larger_than_capacity():
+    """Test asking for more tokens than the bucket holds fails immediately."""
+    bucket = TokenBucket(RateLimitConfig(max_requests=2, time_window=1, name="test"))
+    assert bucket.wait_and_acquire(3, timeout=5.0) is False
+
+
+def test_token_bucket_async_wait_does_not_block_loop():
+    """Test async waiting suspends only the waiting coroutine."""
+    config = RateLimitConfig(max_requests=1, time_window=0.2, name="test")
+    bucket = TokenBucket(config)
+    bucket.acquire(1)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        start = time.time()
+        acquired = await bucket.wait_and_acquire_async(1, timeout=2.0)
+        elapsed = time.time() - start
+        task.cancel()
+        return acquired, elapsed, ticks
+
+    acquired, elapsed, ticks = asyncio.run(main())
+    assert acquired is True
+    assert 0.18 <= elapsed <= 0.3
+    assert ticks >= 10
+
+
+def test_async_acquire_does_not_block_loop_on_held_lock():
+    """Test a bucket lock held elsewhere (e.g. during store I/O) does not stall the loop."""
+    limiter = RateLimiter()
+    limiter.add_limit('api', max_requests=10, time_window=1)
+    bucket = limiter.buckets['api']
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        holder = threading.Thread(target=lambda: bucket.lock.acquire() and (time.sleep(0.3), bucket.lock.release()))
+        holder.start()
+        time.sleep(0.01)  # Let the holder take the lock
+
+        task = asyncio.ensure_future(ticker())
+        results = await asyncio.gather(
+            limiter.acquire_async('api', timeout=2.0),
+            limiter.try_acquire_async('api'),
+            bucket.acquire_async(1)
+        )
+        task.cancel()
+        holder.join()
+        return results, ticks
+
+    results, ticks = asyncio.run(main())
+    assert results == [True, True, True]
+    assert ticks >= 10
+
+def test_token_bucket_async_timeout_and_capacity():
+    """Test async waits time out and oversized requests fail at once."""
+    config = RateLimitConfig(max_requests=2, time_window=3600, name="test")
+    bucket = TokenBucket(config)
+    bucket.acquire(2)
+
+    async def main():
+        start = time.time()
+        result = await bucket.wait_and_acquire_async(1, timeout=0.2)
+        return result, time.time() - start, await bucket.wait_and_acquire_async(3)
+
+    result, elapsed, oversized = asyncio.run(main())
+    assert result is False
+    assert 0.2 <= elapsed <= 0.4
+    assert oversized is False
+    assert bucket.stats()['waiting'] == 0
+
+
+def test_token_bucket_async_cancel_leaves_queue():
+    """Test a cancelled coroutine hands its turn to the next waiter."""
+    config = RateLimitConfig(max_requests=1, time_window=0.1, name="test")
+    bucket = TokenBucket(config)
+    bucket.acquire(1)
+
+    async def main():
+        first = asyncio.ensure_future(bucket.wait_and_acquire_async(1))
+        second = asyncio.ensure_future(bucket.wait_and_acquire_async(1, timeout=1.0))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) is True
+    assert bucket.stats()['waiting'] == 0
+
+
+def test_sync_and_async_waiters_share_queue():
+    """Test threads and coroutines are served from one queue in arrival order."""
+    config = RateLimitConfig(max_requests=1, time_window=0.05, name="test")  # 20 tokens/sec
+    bucket = TokenBucket(config)
+    bucket.acquire(1)
+
+    order = []
+
+    def thread_waiter(name):
+        bucket.wait_and_acquire(1, timeout=5.0)
+        order.append(name)
+
+    async def main():
+        async def coroutine_waiter(name):
+            await bucket.wait_and_acquire_async(1, timeout=5.0)
+            order.append(name)
+
+        thread_a = threading.Thread(target=thread_waiter, args=("thread-a",))
+        thread_a.start()
+        while bucket.stats()['waiting'] < 1:
+            await asyncio.sleep(0.001)
+
+        task_b = asyncio.ensure_future(coroutine_waiter("async-b"))
+        while bucket.stats()['waiting'] < 2:
+            await asyncio.sleep(0.001)
+
+        thread_c = threading.Thread(target=thread_waiter, args=("thread-c",))
+        thread_c.start()
+        while bucket.stats()['waiting'] < 3:
+            await asyncio.sleep(0.001)
+
+        task_d = asyncio.ensure_future(coroutine_waiter("async-d"))
+        await asyncio.gather(task_b, task_d)
+        await asyncio.get_running_loop().run_in_executor(None, thread_a.join)
+        await asyncio.get_running_loop().run_in_executor(None, thread_c.join)
+
+    asyncio.run(main())
+    assert order == ["thread-a", "async-b", "thread-c", "async-d"]
+
+
 def test_token_bucket_reset():
     """Test bucket reset."""
     config = RateLimitConfig(max_requests=10, time_window=60, name="test")
@@ -148,6 +393,286 @@ def test_token_bucket_stats():
     assert stats['available_tokens'] <= 5.0
 
 
+def test_token_bucket_throttling_cuts_rate_and_drains():
+    """Test a throttling report halves the refill rate and empties the bucket."""
+    config = RateLimitConfig(max_requests=10, time_window=1, name="test")
+    bucket = TokenBucket(config, adaptive=AdaptiveConfig(decrease=0.5, increase_per_minute=0))
+
+    bucket.report_throttled()
+
+    stats = bucket.stats()
+    assert stats['effective_rate'] == pytest.approx(5.0)
+    assert stats['rate_fraction'] == 0.5
+    assert stats['throttled'] == 1
+    assert bucket.acquire() is False
+
+    # Refills at the reduced rate: one token every 0.2s
+    start = time.time()
+    assert bucket.wait_and_acquire(1, timeout=1.0) is True
+    assert 0.15 <= time.time() - start <= 0.3
+
+
+def test_token_bucket_throttling_within_cooldown_counts_once():
+    """Test a burst of 429s from one overload only decreases once, down to the floor."""
+    config = RateLimitConfig(max_requests=10, time_window=1, name="test")
+    bucket = TokenBucket(config, adaptive=AdaptiveConfig(decrease=0.5, min_fraction=0.2, cooldown=0.05))
+
+    for _ in range(5):
+        bucket.report_throttled()
+    assert bucket.stats()['rate_fraction'] == 0.5
+    assert bucket.stats()['throttled'] == 5
+
+    for _ in range(3):
+        time.sleep(0.06)
+        bucket.report_throttled()
+    assert bucket.stats()['rate_fraction'] == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_rate_recovers_additively():
+    """Test the refill rate climbs back linearly and caps at the configured rate."""
+    config = RateLimitConfig(max_requests=10, time_window=1, name="test")
+    # Regains 10% of the configured rate every 100ms
+    bucket = TokenBucket(config, adaptive=AdaptiveConfig(decrease=0.5, increase_per_minute=60.0))
+
+    bucket.report_throttled()
+    time.sleep(0.2)
+    assert 0.65 <= bucket.stats()['rate_fraction'] < 0.95
+
+    time.sleep(0.4)
+    assert bucket.effective_rate() == pytest.approx(10.0)
+
+
+def test_token_bucket_retry_after_pauses_grants():
+    """Test nothing is granted until Retry-After has passed."""
+    config = RateLimitConfig(max_requests=100, time_window=1, name="test")
+    bucket = TokenBucket(config)
+
+    bucket.report_throttled(retry_after=0.3)
+    assert bucket.stats()['paused_for'] > 0
+
+    start = time.time()
+    assert bucket.wait_and_acquire(1, timeout=1.0) is True
+    assert 0.28 <= time.time() - start <= 0.5
+
+
+def test_token_bucket_reset_restores_rate():
+    """Test reset clears the adaptive state."""
+    bucket = TokenBucket(RateLimitConfig(max_requests=10, time_window=1, name="test"))
+    bucket.report_throttled(retry_after=60)
+
+    bucket.reset()
+
+    assert bucket.acquire() is True
+    assert bucket.stats()['rate_fraction'] == 1.0
+
+
+def test_parse_retry_after():
+    """Test delay-seconds and HTTP-date forms."""
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+    now = 1445412480.0  # Wed, 21 Oct 2015 07:28:00 GMT
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=now) == 30.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:27:00 GMT", now=now) == 0.0
+
+
+def test_rate_limiter_report_response():
+    """Test only throttling responses slow a bucket down."""
+    limiter = RateLimiter()
+    limiter.add_limit('test', max_requests=10, time_window=1)
+
+    assert limiter.report_response('test', 200) is False
+    assert limiter.report_response('test', 503) is False
+    assert limiter.stats('test')['throttled'] == 0
+
+    assert limiter.report_response('test', 429, {'retry-after': '2'}) is True
+    stats = limiter.stats('test')
+    assert stats['throttled'] == 1
+    assert stats['effective_rate'] < stats['refill_rate']
+    assert 1.5 < stats['paused_for'] <= 2.0
+    assert limiter.try_acquire('test') is False
+
+    # Unknown APIs are ignored
+    assert limiter.report_response('unknown', 429) is True
+
+
+def test_token_bucket_higher_lane_served_first():
+    """Test a higher-priority waiter overtakes lower-priority waiters."""
+    config = RateLimitConfig(max_requests=1, time_window=0.1, name="test")
+    bucket = TokenBucket(config)
+    low = PriorityLane('low', priority=1)
+    high = PriorityLane('high', priority=0)
+    bucket.acquire(1)
+
+    order = []
+
+    def worker(name, lane):
+        bucket.wait_and_acquire(1, timeout=2.0, lane=lane)
+        order.append(name)
+
+    threads = []
+    for name, lane in (("low-1", low), ("low-2", low), ("high", high)):
+        thread = threading.Thread(target=worker, args=(name, lane))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+
+    for thread in threads:
+        thread.join()
+
+    assert order == ["high", "low-1", "low-2"]
+
+
+def test_token_bucket_lane_reserve():
+    """Test lower lanes leave their reserve for higher ones."""
+    config = RateLimitConfig(max_requests=10, time_window=3600, name="test")
+    bucket = TokenBucket(config)
+    guest = PriorityLane('guest', priority=1, reserve=0.2)
+
+    assert bucket.acquire(7) is True
+    assert bucket.acquire(1, lane=guest) is True
+    assert bucket.acquire(1, lane=guest) is False  # Would leave fewer than 2
+    assert bucket.acquire(1) is True
+
+
+def test_token_bucket_sheds_instead_of_waiting():
+    """Test a lane fails at once when its estimated wait exceeds max_wait."""
+    config = RateLimitConfig(max_requests=10, time_window=3600, name="test")
+    bucket = TokenBucket(config)
+    guest = PriorityLane('guest', priority=1, max_wait=5.0)
+    bucket.acquire(10)
+
+    start = time.time()
+    assert bucket.wait_and_acquire(1, timeout=60.0, lane=guest) is False
+    with pytest.raises(RateLimitShedError):
+        bucket.wait_and_acquire(1, timeout=60.0, lane=guest, raise_on_shed=True)
+    assert time.time() - start < 0.1
+
+    assert bucket.stats()['shed'] == {'guest': 2}
+
+
+def test_token_bucket_lane_waits_within_max_wait():
+    """Test a lane still queues when its wait is short enough."""
+    config = RateLimitConfig(max_requests=1, time_window=0.2, name="test")
+    bucket = TokenBucket(config)
+    guest = PriorityLane('guest', priority=1, max_wait=0.5)
+    bucket.acquire(1)
+
+    assert bucket.wait_and_acquire(1, timeout=60.0, lane=guest) is True
+    assert bucket.stats()['shed'] == {}
+
+
+def test_rate_limiter_priority_lane_context():
+    """Test calls inside priority_lane() are charged to that lane."""
+    limiter = RateLimiter()
+    limiter.add_limit('places', max_requests=10, time_window=86400)
+    for _ in range(9):
+        limiter.try_acquire('places')
+
+    # Warm-up keeps 20% back, guests 10%: neither may take the last token
+    with priority_lane('background-warmup'):
+        assert limiter.try_acquire('places') is False
+        with pytest.raises(RateLimitShedError):
+            limiter.wait_if_needed('places')
+
+    start = time.time()
+    with pytest.raises(RateLimitShedError):
+        limiter.wait_if_needed('places', lane='interactive-guest')
+    assert time.time() - start < 0.1
+
+    assert limiter.try_acquire('places') is True
+    assert limiter.stats('places')['shed'] == {'background-warmup': 1, 'interactive-guest': 1}
+
+    with pytest.raises(ValueError):
+        limiter.try_acquire('places', lane='vip')
+
+
+def test_calendar_quota_windows_follow_timezone():
+    """Test windows start at local midnight (on the 1st for monthly quotas)."""
+    # 07:30 UTC on 1 March is still 29 February in California
+    now = datetime(2024, 3, 1, 7, 30, tzinfo=timezone.utc)
+
+    start, end = CalendarQuota('test', 10, period='month').window(now)
+    assert (start.isoformat(), end.isoformat()) == (
+        '2024-02-01T00:00:00-08:00', '2024-03-01T00:00:00-08:00'
+    )
+
+    start, end = CalendarQuota('test', 10, period='day', tz='UTC').window(now)
+    assert (start.isoformat(), end.isoformat()) == (
+        '2024-03-01T00:00:00+00:00', '2024-03-02T00:00:00+00:00'
+    )
+
+    with pytest.raises(ValueError):
+        CalendarQuota('test', 10, period='week')
+
+
+def test_calendar_quota_counts_external_usage():
+    """Test calls recorded elsewhere (e.g. by the cost tracker) use up the quota."""
+    used = {'count': 7}
+    quota = CalendarQuota('test', 10, usage=lambda: used['count'])
+
+    assert quota.remaining() == 3
+    assert quota.take(3) is True
+    used['count'] = 10
+    assert quota.take() is False
+    assert quota.stats()['rejected'] == 1
+
+
+def test_rate_limiter_quota_on_top_of_bucket():
+    """Test a used-up quota refuses requests at once while the bucket has tokens."""
+    limiter = RateLimiter()
+    limiter.add_limit('places', max_requests=100, time_window=86400)
+    limiter.add_quota('places', 3, period='month')
+
+    assert [limiter.try_acquire('places') for _ in range(4)] == [True, True, True, False]
+    assert limiter.available_tokens('places') == 0
+
+    start = time.time()
+    with pytest.raises(QuotaExceededError):
+        limiter.wait_if_needed('places')
+    assert limiter.acquire('places', timeout=5.0) is False
+    assert time.time() - start < 0.1
+
+    stats = limiter.stats('places')
+    assert stats['total_requests'] == 3
+    assert stats['quota']['used'] == 3
+    assert stats['quota']['remaining'] == 0
+    assert stats['quota']['resets_at'].endswith(('-07:00', '-08:00'))
+
+
+@pytest.mark.parametrize('store_spec', ['memory', 'file', 'local-redis'])
+def test_quota_refusal_gives_bucket_tokens_back(store_spec, tmp_path):
+    """Test a request the quota refuses after the bucket granted it leaves the bucket as it was."""
+    from core.rate_limit_stores import create_bucket_store
+
+    # Another worker uses up the quota between the check and the charge
+    calls = []
+    def usage():
+        calls.append(1)
+        return 0 if len(calls) == 1 else 5
+
+    limiter = RateLimiter(store=create_bucket_store(store_spec, base_dir=str(tmp_path)))
+    limiter.add_limit('places', max_requests=2, time_window=86400)
+    limiter.add_quota('places', 5, usage=usage)
+
+    assert limiter.try_acquire('places') is False
+    assert limiter.available_tokens('places') == 0   # Quota is used up
+    assert limiter.buckets['places'].available_tokens() == pytest.approx(2, abs=0.01)
+    assert limiter.stats('places')['total_requests'] == 0
+
+
+def test_rate_limiter_quota_without_bucket():
+    """Test a quota alone limits an API with no token bucket."""
+    limiter = RateLimiter()
+    limiter.add_quota('daily_only', 1, period='day')
+
+    assert limiter.try_acquire('daily_only') is True
+    assert limiter.try_acquire('daily_only') is False
+    assert 'daily_only' in limiter.stats()
+
+
 def test_rate_limiter_initialization():
     """Test rate limiter initialization."""
     limiter = RateLimiter(enabled=True)
@@ -209,6 +734,23 @@ def test_rate_limiter_acquire_with_wait():
     assert 0.3 <= elapsed <= 1.0  # Should wait for refill
 
 
+def test_rate_limiter_async_shares_budget_with_sync():
+    """Test async and sync callers draw on the same bucket."""
+    limiter = RateLimiter()
+    limiter.add_limit('test', max_requests=3, time_window=3600)
+
+    async def main():
+        assert await limiter.try_acquire_async('test') is True
+        assert limiter.try_acquire('test') is True
+        assert await limiter.acquire_async('test', timeout=0.1) is True
+        assert await limiter.try_acquire_async('test') is False
+        assert await limiter.acquire_async('test', timeout=0.1) is False
+        assert await limiter.acquire_async('unknown_api') is True
+
+    asyncio.run(main())
+    assert limiter.stats('test')['total_requests'] == 3
+
+
 def test_rate_limiter_unknown_api():
     """Test rate limiter with unknown API (should allow)."""
     limiter = RateLimiter()
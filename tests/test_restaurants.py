@@ -256,6 +256,25 @@ def test_mock_google_places_client():
     assert all(r.provider == "google_places" for r in results)
 
 
+def test_google_places_client_raises_when_refused():
+    """Test a refused google_places call raises instead of looking like no results."""
+    from domains.restaurants.api_clients.google_places_client import GooglePlacesClient
+    from core.rate_limiter import QuotaExceededError, RateLimitShedError
+
+    limiter = RateLimiter()
+    limiter.add_limit('google_places', max_requests=1, time_window=3600)
+    limiter.try_acquire('google_places')
+    client = GooglePlacesClient(api_key="test-key", rate_limiter=limiter)
+
+    with pytest.raises(RateLimitShedError):
+        client.search(cuisine="Thai", latitude=40.7580, longitude=-73.9855)
+
+    limiter.reset('google_places')
+    limiter.add_quota('google_places', 0)
+    with pytest.raises(QuotaExceededError):
+        client.search(cuisine="Thai", latitude=40.7580, longitude=-73.9855)
+
+
 def test_different_providers_return_different_results():
     """Test that Yelp and Google return different restaurants."""
     yelp = MockYelpClient()
@@ -442,6 +461,32 @@ def test_handler_with_cache():
     assert results1['total_results'] == results2['total_results']
 
 
+def test_handler_does_not_cache_results_missing_a_refused_provider(tmp_path, monkeypatch):
+    """Test Yelp-only results are not cached when Google Places was rate limited."""
+    from unittest.mock import Mock
+
+    monkeypatch.setenv('GOOGLE_PLACES_API_KEY', 'test-key')
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    limiter = RateLimiter()
+    limiter.add_limit('google_places', max_requests=1, time_window=3600)
+    limiter.try_acquire('google_places')
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(return_value=(40.7580, -73.9855, "Times Square, New York"))
+    handler = RestaurantHandler(
+        geocoding_service=geocoder,
+        cache_service=CacheService(base_dir=str(tmp_path)),
+        rate_limiter=limiter
+    )
+    handler.clients['yelp'].search = Mock(wraps=handler.clients['yelp'].search)
+    query = RestaurantQuery(cuisine="Italian", location="Times Square")
+
+    for _ in range(2):
+        results = handler.fetch_options(query)
+        assert results and all(r.provider == "yelp" for r in results)
+    assert handler.clients['yelp'].search.call_count == 2
+
+
 # ============================================================================
 # RUN TESTS
 # ============================================================================
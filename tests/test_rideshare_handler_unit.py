@@ -328,6 +328,14 @@ def test_generate_cache_key(handler):
     assert len(key1) == 16
 
 
+def test_generate_cache_key_buckets_nearby_points(handler):
+    """Test pickups a few meters apart share a cache key."""
+    key1 = handler._generate_cache_key(40.7580, -73.9855, 40.6413, -73.7781)
+    key2 = handler._generate_cache_key(40.75805, -73.98545, 40.64132, -73.77808)
+
+    assert key1 == key2
+
+
 def test_handler_repr(handler):
     """Test handler string representation."""
     repr_str = repr(handler)
@@ -338,5 +346,164 @@ def test_handler_repr(handler):
     assert 'uber' in repr_str or 'lyft' in repr_str
 
 
+def test_concurrent_misses_share_one_provider_call(tmp_path, sample_estimates):
+    """Test concurrent identical requests make a single provider call."""
+    import threading
+    import time
+    from core.cache_service import CacheService
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(side_effect=lambda location: (
+        (40.7580, -73.9855, "Times Square, NYC") if location == "Times Square"
+        else (40.6413, -73.7781, "JFK Airport, NYC")
+    ))
+
+    handler = RideShareHandler(
+        cache_service=CacheService(base_dir=str(tmp_path)),
+        geocoding_service=geocoder
+    )
+
+    def slow_estimates(**kwargs):
+        time.sleep(0.2)
+        return [RideEstimate(**{**e.__dict__}) for e in sample_estimates]
+
+    uber = Mock()
+    uber.get_price_estimates = Mock(side_effect=slow_estimates)
+    handler.clients = {'uber': uber}
+
+    query = RideQuery(origin="Times Square", destination="JFK Airport", providers=["uber"])
+    barrier = threading.Barrier(6)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(handler.fetch_options(query))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(results) == 6
+    assert uber.get_price_estimates.call_count == 1
+    assert handler.cache.stats()['single_flight']['rideshare']['coalesced'] == 5
+
+
+def test_unknown_location_negative_cached(tmp_path):
+    """Test a location the geocoder cannot find is not looked up again."""
+    from core.cache_service import CacheService
+    from core.geocoding_service import LocationNotFoundError
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(side_effect=LocationNotFoundError("Location not found: Tims Sqare"))
+    cache = CacheService(base_dir=str(tmp_path))
+    handler = RideShareHandler(cache_service=cache, geocoding_service=geocoder)
+    query = RideQuery(origin="Tims Sqare", destination="JFK Airport", providers=["uber"])
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match="Location not found"):
+            handler.fetch_options(query)
+
+    assert geocoder.geocode.call_count == 1
+    assert cache.stats()['negative']['hits'] == 2
+
+
+def test_geocoding_api_errors_not_negative_cached(tmp_path):
+    """Test transient geocoding failures are retried."""
+    from core.cache_service import CacheService
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(side_effect=ValueError("Geocoding request timed out for: JFK"))
+    handler = RideShareHandler(
+        cache_service=CacheService(base_dir=str(tmp_path)),
+        geocoding_service=geocoder
+    )
+    query = RideQuery(origin="JFK", destination="LGA", providers=["uber"])
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            handler.fetch_options(query)
+
+    assert geocoder.geocode.call_count == 2
+
+
+def test_empty_estimates_negative_cached_but_not_failures(tmp_path):
+    """Test "no estimates" short-circuits, while provider errors are retried."""
+    from core.cache_service import CacheService
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(side_effect=lambda location: (40.0, -73.0, location))
+    handler = RideShareHandler(
+        cache_service=CacheService(base_dir=str(tmp_path)),
+        geocoding_service=geocoder
+    )
+    uber = Mock()
+    handler.clients = {'uber': uber}
+
+    uber.get_price_estimates = Mock(side_effect=RuntimeError("503"))
+    failing = RideQuery(origin="A", destination="B", providers=["uber"])
+    for _ in range(2):
+        with pytest.raises(Exception, match="No estimates"):
+            handler.fetch_options(failing)
+    assert uber.get_price_estimates.call_count == 2
+
+    uber.get_price_estimates = Mock(return_value=[])
+    empty = RideQuery(origin="C", destination="D", providers=["uber"])
+    for _ in range(2):
+        with pytest.raises(Exception, match="No estimates"):
+            handler.fetch_options(empty)
+    assert uber.get_price_estimates.call_count == 1
+
+
+
+def test_provider_without_client_not_negative_cached(tmp_path, sample_estimates):
+    """Test an empty result for a provider with no client does not block later requests."""
+    from core.cache_service import CacheService
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(side_effect=lambda location: (40.0, -73.0, location))
+    handler = RideShareHandler(
+        cache_service=CacheService(base_dir=str(tmp_path)),
+        geocoding_service=geocoder
+    )
+    uber = Mock()
+    uber.get_price_estimates = Mock(return_value=[sample_estimates[0]])
+    handler.clients = {'uber': uber}
+
+    with pytest.raises(Exception, match="No estimates"):
+        handler.fetch_options(RideQuery(origin="A", destination="B", providers=["via"]))
+
+    estimates = handler.fetch_options(RideQuery(origin="A", destination="B", providers=["uber"]))
+    assert [estimate.provider for estimate in estimates] == ["Uber"]
+    assert handler.cache.stats()['negative']['sets'] == 0
+
+
+def test_provider_sets_do_not_share_route_entry(tmp_path, sample_estimates):
+    """Test uber-only and lyft-only queries on one route are cached separately."""
+    from core.cache_service import CacheService
+
+    geocoder = Mock()
+    geocoder.geocode = Mock(side_effect=lambda location: (40.0, -73.0, location))
+    handler = RideShareHandler(
+        cache_service=CacheService(base_dir=str(tmp_path)),
+        geocoding_service=geocoder
+    )
+    uber, lyft = Mock(), Mock()
+    uber.get_price_estimates = Mock(return_value=[sample_estimates[0]])
+    lyft.get_price_estimates = Mock(return_value=[sample_estimates[1]])
+    handler.clients = {'uber': uber, 'lyft': lyft}
+
+    def providers(names):
+        query = RideQuery(origin="A", destination="B", providers=names)
+        return {estimate.provider for estimate in handler.fetch_options(query)}
+
+    assert providers(["uber"]) == {"Uber"}
+    assert providers(["lyft"]) == {"Lyft"}
+    assert providers(["Lyft", "uber"]) == {"Uber", "Lyft"}
+    assert providers(["uber", "lyft"]) == {"Uber", "Lyft"}   # Same set: cache hit
+    assert uber.get_price_estimates.call_count == 2
+    assert lyft.get_price_estimates.call_count == 2
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,107 @@
+"""tests/test_single_flight.py
+
+Unit tests for request coalescing (single-flight).
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+import pytest
+import threading
+import time
+from core.single_flight import SingleFlight
+
+
+def run_concurrently(count, target):
+    """Start count threads on target and wait for them all."""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+
+def test_single_call_passthrough():
+    """Test a lone caller simply runs the function."""
+    flight = SingleFlight()
+
+    assert flight.do("key", lambda: 42, domain="restaurants") == 42
+
+    stats = flight.stats()
+    assert stats['restaurants']['executions'] == 1
+    assert stats['restaurants']['coalesced'] == 0
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test concurrent callers with the same key share one upstream call."""
+    flight = SingleFlight()
+    calls = []
+    results = []
+    barrier = threading.Barrier(10)
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["pizza"]
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do("pizza_times_square", slow_fetch, domain="restaurants"))
+
+    run_concurrently(10, worker)
+
+    assert len(calls) == 1
+    assert results == [["pizza"]] * 10
+
+    stats = flight.stats()['restaurants']
+    assert stats['executions'] == 1
+    assert stats['coalesced'] == 9
+    assert stats['in_flight'] == 0
+
+
+def test_different_keys_not_coalesced():
+    """Test distinct keys each run their own call."""
+    flight = SingleFlight()
+
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()['default']['executions'] == 2
+
+
+def test_leader_error_propagates_to_followers():
+    """Test every waiting caller sees the leader's exception."""
+    flight = SingleFlight()
+    errors = []
+    barrier = threading.Barrier(5)
+
+    def failing_fetch():
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    def worker():
+        barrier.wait()
+        try:
+            flight.do("key", failing_fetch)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    run_concurrently(5, worker)
+
+    assert errors == ["upstream down"] * 5
+
+    # The key is released, so the next call runs again
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_stats_per_domain():
+    """Test statistics are kept separately per domain."""
+    flight = SingleFlight()
+    flight.do("r1", lambda: 1, domain="rideshare")
+    flight.do("p1", lambda: 1, domain="restaurants")
+
+    stats = flight.stats()
+    assert set(stats.keys()) == {"rideshare", "restaurants"}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])